@@ -0,0 +1,32 @@
+import time
+
+from django.core.cache import cache
+
+
+def get_versions(keys):
+    """
+    Read the version counters stored under `keys` in one round trip and
+    return them as a dict, seeding any that are missing. Versions start from
+    a nanosecond timestamp so an evicted counter can never roll back onto
+    data that is still cached under an old version.
+    """
+    versions = cache.get_many(keys)
+
+    for key in keys:
+        if versions.get(key) is None:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+
+    return versions
+
+
+def get_version(key):
+    return get_versions([key])[key]
+
+
+def bump_version(key):
+    """Move a version counter on, invalidating whatever is cached under it."""
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
@@ -0,0 +1,128 @@
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Opaque cursor pagination over a unique, indexed ordering (the primary key
+    by default), so every page is a `WHERE key < cursor LIMIT n` lookup
+    instead of an OFFSET scan. Subclasses can switch `ordering` to another
+    unique column, or to a non-unique column followed by a unique tie-breaker
+    such as ("-created_at", "id"). The cursor then holds every column and a
+    page starts right after the last row of the one before, ties included.
+    Ordering columns must not be NULL.
+    """
+
+    ordering = "-id"
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            reverse, current_position = False, None
+        else:
+            reverse, current_position = self.cursor.reverse, self.cursor.position
+
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(
+                order[1:] if order.startswith("-") else f"-{order}"
+                for order in ordering
+            )
+        queryset = queryset.order_by(*ordering)
+
+        if current_position is not None:
+            queryset = queryset.filter(
+                self._after_position(queryset, ordering, current_position)
+            )
+
+        # One extra row tells whether a page follows this one.
+        results = list(queryset[: self.page_size + 1])
+        self.page = results[: self.page_size]
+
+        has_following_position = len(results) > len(self.page)
+        following_position = None
+        if has_following_position:
+            following_position = self._get_position_from_instance(
+                results[-1], self.ordering
+            )
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = current_position is not None
+            self.has_previous = has_following_position
+            self.next_position = current_position
+            self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = current_position is not None
+            self.next_position = following_position
+            self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+
+        # Positions are unique, so the offset DRF uses to step over ties is
+        # never needed.
+        if cursor is not None:
+            cursor = cursor._replace(offset=0)
+
+        return cursor
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for order in ordering:
+            field_name = order.lstrip("-")
+            if isinstance(instance, dict):
+                values.append(str(instance[field_name]))
+            else:
+                values.append(str(getattr(instance, field_name)))
+
+        return json.dumps(values)
+
+    def _after_position(self, queryset, ordering, position):
+        """
+        Rows strictly past `position` in `ordering`, as
+        `a > x OR (a = x AND b > y)`. The leading `a >= x` lets the database
+        start its index scan at the cursor.
+        """
+        try:
+            values = json.loads(position)
+            if not isinstance(values, list) or len(values) != len(ordering):
+                raise ValueError
+
+            fields = [
+                queryset.model._meta.get_field(order.lstrip("-")) for order in ordering
+            ]
+            values = [field.to_python(value) for field, value in zip(fields, values)]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        after = Q()
+        equal = {}
+        for order, field, value in zip(ordering, fields, values):
+            lookup = "lt" if order.startswith("-") else "gt"
+            after |= Q(**equal, **{f"{field.attname}__{lookup}": value})
+            equal[field.attname] = value
+
+        lookup = "lte" if ordering[0].startswith("-") else "gte"
+        return Q(**{f"{fields[0].attname}__{lookup}": values[0]}) & after
@@ -43,6 +43,20 @@ if not PHONE_HASH_SALT:
 
 ADMIN_URL = os.environ.get("ADMIN_URL", "admin")
 
+# Comma separated phonenumbers regions to load when a worker starts (e.g. "IN,AE").
+PHONE_METADATA_PRELOAD_REGIONS = [
+    region
+    for region in os.environ.get("PHONE_METADATA_PRELOAD_REGIONS", "").split(",")
+    if region.strip()
+]
+
+# Defaults for a user's invoice numbers, e.g. "INV-" and 4 give INV-0001.
+INVOICE_NUMBER_PREFIX = os.environ.get("INVOICE_NUMBER_PREFIX", "INV-")
+INVOICE_NUMBER_PADDING = int(os.environ.get("INVOICE_NUMBER_PADDING", 4))
+
+# Background threads per worker process that render invoice PDFs.
+INVOICE_PDF_WORKERS = int(os.environ.get("INVOICE_PDF_WORKERS", 2))
+
 
 # --- COOKIE SETTINGS ---
 COOKIE_DOMAIN = os.environ.get("COOKIE_DOMAIN", None)
@@ -85,6 +99,7 @@ INSTALLED_APPS = [
     "clients",
     "catalog",
     "demo",
+    "search.apps.SearchConfig",
     "django_cleanup.apps.CleanupConfig",
 ]
 
@@ -128,6 +143,11 @@ DATABASES = {
     )
 }
 
+# SQLite test databases are in memory by default, where the threaded
+# concurrency tests cannot run; keep the test database in a file instead.
+if DATABASES["default"]["ENGINE"] == "django.db.backends.sqlite3":
+    DATABASES["default"]["TEST"] = {"NAME": BASE_DIR / "test_db.sqlite3"}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -271,6 +291,17 @@ SIMPLE_JWT = {
     "BLACKLIST_AFTER_ROTATION": True,
 }
 
+# Seconds an authenticated user's row stays cached between requests (0 turns
+# the cache off). Saving or deleting a user drops its entry. A request that
+# read the row just before such a save can still write the old row back after
+# the entry was dropped, so a change can take up to this long to apply.
+JWT_USER_CACHE_TIMEOUT = int(os.environ.get("JWT_USER_CACHE_TIMEOUT", 60))
+
+# Build request.user from the access token's claims and only load the row when
+# a view needs more than the id. A deactivated or deleted account keeps that
+# id-only access until its access token expires.
+JWT_STATELESS_USER = os.environ.get("JWT_STATELESS_USER", "False") == "True"
+
 
 SPECTACULAR_SETTINGS = {
     "TITLE": "Cashevide API",
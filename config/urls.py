@@ -25,7 +25,9 @@ urlpatterns = [
     path(f"{settings.ADMIN_URL}/", admin.site.urls),
     path("api/users/", include("users.urls")),
     path("api/", include("reviews.urls")),
+    path("api/", include("invoices.urls")),
     path("api/", include("demo.urls")),
+    path("api/", include("search.urls")),
     # Swagger UI
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
     path(
@@ -1,6 +1,15 @@
 from django.contrib import admin
 
-from .models import Invoice, InvoiceItem, PaymentRecord
+from .financials import deferred_financials
+from .models import (
+    Invoice,
+    InvoiceItem,
+    InvoiceNumberSequence,
+    PaymentRecord,
+    RecurringInvoice,
+    RecurringInvoiceItem,
+    UserFinancialSummary,
+)
 
 
 class InvoiceItemInline(admin.TabularInline):
@@ -33,3 +42,38 @@ class InvoiceAdmin(admin.ModelAdmin):
     readonly_fields = ("subtotal", "total_amount", "amount_paid", "status")
 
     inlines = [InvoiceItemInline, PaymentRecordInline]
+
+    def save_related(self, request, form, formsets, change):
+        # Recompute the totals once for all inline rows, not once per row.
+        with deferred_financials():
+            super().save_related(request, form, formsets, change)
+
+
+@admin.register(InvoiceNumberSequence)
+class InvoiceNumberSequenceAdmin(admin.ModelAdmin):
+    list_display = ("user", "prefix", "padding", "last_number")
+
+    search_fields = ("user__email",)
+
+
+@admin.register(UserFinancialSummary)
+class UserFinancialSummaryAdmin(admin.ModelAdmin):
+    list_display = ("user", "total_billed", "total_received", "outstanding")
+
+    search_fields = ("user__email",)
+
+
+class RecurringInvoiceItemInline(admin.TabularInline):
+    model = RecurringInvoiceItem
+    extra = 1
+
+
+@admin.register(RecurringInvoice)
+class RecurringInvoiceAdmin(admin.ModelAdmin):
+    list_display = ("__str__", "user", "cadence", "next_run_date", "is_active")
+
+    list_filter = ("cadence", "is_active")
+
+    search_fields = ("name", "client__name", "user__email")
+
+    inlines = [RecurringInvoiceItemInline]
@@ -0,0 +1,117 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import models
+from django.db.models import Count, F, Q
+from django.db.models.functions import TruncMonth
+
+from .models import Invoice
+
+TOP_CLIENTS_LIMIT = 10
+REVENUE_MONTHS = 12
+
+MONEY_FIELD = models.DecimalField(max_digits=12, decimal_places=2)
+
+AGING_BUCKETS = [
+    ("days_1_30", 1, 30),
+    ("days_31_60", 31, 60),
+    ("days_61_90", 61, 90),
+    ("days_over_90", 91, None),
+]
+
+
+def _money_sum(expression, **kwargs):
+    return models.Sum(
+        expression, default=Decimal("0.00"), output_field=MONEY_FIELD, **kwargs
+    )
+
+
+def _billed_invoices(user_id):
+    return Invoice.objects.filter(user_id=user_id).exclude(
+        status=Invoice.InvoiceStatus.DRAFT
+    )
+
+
+def get_receivables_aging(user_id, as_of):
+    """Outstanding balances per currency, bucketed by days past the due date."""
+    outstanding = F("total_amount") - F("amount_paid")
+
+    buckets = {
+        "current": _money_sum(
+            outstanding, filter=Q(due_date__isnull=True) | Q(due_date__gte=as_of)
+        )
+    }
+    for name, first_day, last_day in AGING_BUCKETS:
+        due = Q(due_date__lte=as_of - timedelta(days=first_day))
+        if last_day is not None:
+            due &= Q(due_date__gte=as_of - timedelta(days=last_day))
+        buckets[name] = _money_sum(outstanding, filter=due)
+
+    rows = (
+        Invoice.objects.filter(
+            user_id=user_id,
+            status__in=Invoice.OPEN_STATUSES,
+        )
+        .values("currency")
+        .annotate(total=_money_sum(outstanding), **buckets)
+        .order_by("currency")
+    )
+
+    return list(rows)
+
+
+def get_monthly_revenue(user_id, as_of, months=REVENUE_MONTHS):
+    """Billed and collected amounts per issue month for the last `months` months."""
+    first_month = as_of.year * 12 + as_of.month - months
+    start = date(first_month // 12, first_month % 12 + 1, 1)
+
+    rows = (
+        _billed_invoices(user_id)
+        .filter(issue_date__gte=start, issue_date__lte=as_of)
+        .annotate(month=TruncMonth("issue_date"))
+        .values("month", "currency")
+        .annotate(
+            invoices=Count("id"),
+            billed=_money_sum("total_amount"),
+            collected=_money_sum("amount_paid"),
+        )
+        .order_by("month", "currency")
+    )
+
+    return list(rows)
+
+
+def get_top_clients(user_id, limit=TOP_CLIENTS_LIMIT):
+    rows = (
+        _billed_invoices(user_id)
+        .filter(client__isnull=False)
+        .values("client", "client__name", "currency")
+        .annotate(
+            invoices=Count("id"),
+            billed=_money_sum("total_amount"),
+            outstanding=_money_sum(F("total_amount") - F("amount_paid")),
+        )
+        .order_by("-billed", "client")[:limit]
+    )
+
+    return [
+        {
+            "client": row["client"],
+            "name": row["client__name"],
+            "currency": row["currency"],
+            "invoices": row["invoices"],
+            "billed": row["billed"],
+            "outstanding": row["outstanding"],
+        }
+        for row in rows
+    ]
+
+
+def get_invoice_analytics(user_id, as_of):
+    """Build every dashboard widget, each with a single aggregate query."""
+    return {
+        "as_of": as_of,
+        "aging": get_receivables_aging(user_id, as_of),
+        "monthly_revenue": get_monthly_revenue(user_id, as_of),
+        "top_clients": get_top_clients(user_id),
+    }
@@ -0,0 +1,37 @@
+from django.core.cache import cache
+from django.db import transaction
+
+from config.cache import bump_version, get_version
+
+ANALYTICS_CACHE_TIMEOUT = 60 * 60
+
+
+def _version_key(user_id):
+    return f"invoice_analytics_version_{user_id}"
+
+
+def get_analytics_version(user_id):
+    return get_version(_version_key(user_id))
+
+
+def bump_analytics_version(user_id):
+    bump_version(_version_key(user_id))
+
+
+def bump_analytics_version_on_commit(user_id):
+    transaction.on_commit(lambda: bump_analytics_version(user_id))
+
+
+def get_cached_analytics(user_id, as_of, compute):
+    """
+    Cache a user's analytics under their current version and the day they
+    were computed for, since aging buckets move as days pass.
+    """
+    key = f"invoice_analytics_{user_id}_{get_analytics_version(user_id)}_{as_of}"
+    data = cache.get(key)
+
+    if data is None:
+        data = compute(user_id, as_of)
+        cache.set(key, data, timeout=ANALYTICS_CACHE_TIMEOUT)
+
+    return data
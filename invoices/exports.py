@@ -0,0 +1,112 @@
+import csv
+import io
+import json
+from itertools import chain
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import InvoiceItem
+
+EXPORT_FORMATS = ["csv", "jsonl"]
+EXPORT_ROWS = ["invoices", "items"]
+
+# Rows fetched per database round trip, and bytes buffered per chunk sent.
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_BUFFER_SIZE = 64 * 1024
+
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "jsonl": "application/x-ndjson",
+}
+
+INVOICE_COLUMNS = [
+    ("id", "id"),
+    ("invoice_number", "invoice_number"),
+    ("status", "status"),
+    ("client_id", "client_id"),
+    ("name", "name"),
+    ("email", "email"),
+    ("currency", "currency"),
+    ("issue_date", "issue_date"),
+    ("due_date", "due_date"),
+    ("subtotal", "subtotal"),
+    ("discount", "discount"),
+    ("total_amount", "total_amount"),
+    ("amount_paid", "amount_paid"),
+]
+
+ITEM_COLUMNS = [
+    ("invoice_id", "invoice_id"),
+    ("invoice_number", "invoice__invoice_number"),
+    ("status", "invoice__status"),
+    ("currency", "invoice__currency"),
+    ("issue_date", "invoice__issue_date"),
+    ("item_id", "id"),
+    ("product_id", "product_id"),
+    ("title", "title"),
+    ("description", "description"),
+    ("unit_type", "unit_type"),
+    ("quantity", "quantity"),
+    ("unit_price", "unit_price"),
+    ("total", "total"),
+]
+
+
+def _buffered(lines):
+    """Join small encoded lines into chunks of roughly EXPORT_BUFFER_SIZE bytes."""
+    buffer = []
+    size = 0
+
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+
+        if size >= EXPORT_BUFFER_SIZE:
+            yield b"".join(buffer)
+            buffer = []
+            size = 0
+
+    if buffer:
+        yield b"".join(buffer)
+
+
+def _csv_lines(header, rows):
+    stream = io.StringIO()
+    writer = csv.writer(stream)
+
+    for values in chain([header], rows):
+        writer.writerow(values)
+        yield stream.getvalue().encode()
+        stream.seek(0)
+        stream.truncate()
+
+
+def _jsonl_lines(header, rows):
+    for values in rows:
+        line = json.dumps(dict(zip(header, values)), cls=DjangoJSONEncoder)
+        yield f"{line}\n".encode()
+
+
+def export_invoices(invoices, file_format="csv", rows="invoices"):
+    """
+    Return (content_type, chunks) streaming the given invoices as CSV or JSONL,
+    one line per invoice or, with rows="items", one line per line item. Rows
+    are read as tuples through a chunked iterator, which uses a server-side
+    cursor where the database supports one, so memory stays flat however many
+    invoices are exported.
+    """
+    if rows == "items":
+        columns = ITEM_COLUMNS
+        queryset = InvoiceItem.objects.filter(invoice__in=invoices.values("id"))
+        queryset = queryset.order_by("invoice_id", "id")
+    else:
+        columns = INVOICE_COLUMNS
+        queryset = invoices.order_by("id")
+
+    header = [name for name, _ in columns]
+    values = queryset.values_list(*[lookup for _, lookup in columns]).iterator(
+        chunk_size=EXPORT_CHUNK_SIZE
+    )
+
+    lines = _csv_lines if file_format == "csv" else _jsonl_lines
+    return CONTENT_TYPES[file_format], _buffered(lines(header, values))
@@ -0,0 +1,52 @@
+import threading
+from contextlib import contextmanager
+
+from django.db import transaction
+
+_state = threading.local()
+
+
+def _pending():
+    return getattr(_state, "pending", None)
+
+
+@contextmanager
+def deferred_financials():
+    """
+    Run the block in a transaction and recompute every invoice whose items or
+    payments changed inside it once, right before the transaction commits.
+    Nested blocks join the outermost one.
+    """
+    if _pending() is not None:
+        yield
+        return
+
+    _state.pending = {}
+    try:
+        with transaction.atomic():
+            yield
+
+            invoices = list(_state.pending.values())
+            if invoices:
+                model = type(invoices[0])
+                existing = set(
+                    model.objects.filter(
+                        pk__in=[invoice.pk for invoice in invoices]
+                    ).values_list("pk", flat=True)
+                )
+
+                for invoice in invoices:
+                    if invoice.pk in existing:
+                        invoice.update_financials()
+    finally:
+        _state.pending = None
+
+
+def financials_changed(invoice):
+    """Recompute the invoice now, or once on exit from `deferred_financials`."""
+    pending = _pending()
+
+    if pending is None:
+        invoice.update_financials()
+    else:
+        pending.setdefault(invoice.pk, invoice)
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from invoices.recurring import generate_recurring_invoices
+
+
+class Command(BaseCommand):
+    help = (
+        "Issue every recurring invoice that is due, for all users. Safe to re-run; "
+        "meant to be run daily (e.g. from cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        if batch_size < 1:
+            raise CommandError("--batch-size must be a positive number.")
+
+        created = generate_recurring_invoices(batch_size=batch_size)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Generated {created} recurring invoices.")
+        )
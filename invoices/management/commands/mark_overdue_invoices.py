@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from invoices.services import sweep_overdue_invoices
+
+
+class Command(BaseCommand):
+    help = (
+        "Mark unpaid invoices past their due date as OVERDUE and reopen overdue "
+        "invoices whose due date moved. Meant to be run periodically (e.g. from cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        if batch_size < 1:
+            raise CommandError("--batch-size must be a positive number.")
+
+        marked, reopened = sweep_overdue_invoices(batch_size=batch_size)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Marked {marked} invoices overdue and reopened {reopened}."
+            )
+        )
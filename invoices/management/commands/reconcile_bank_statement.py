@@ -0,0 +1,62 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from invoices.statements import (
+    STATEMENT_FORMATS,
+    detect_format,
+    read_statement_lines,
+    reconcile_statement,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Apply the credits in a bank statement (CSV or OFX) to a user's open "
+        "invoices as payments and report the lines that matched nothing."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--user", required=True, help="The invoice owner's email.")
+        parser.add_argument("--format", choices=STATEMENT_FORMATS)
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["format"] or detect_format(path)
+
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be a positive number.")
+
+        user = get_user_model().objects.filter(email=options["user"]).first()
+        if user is None:
+            raise CommandError(f"Unknown user: {options['user']}")
+
+        try:
+            with open(path, encoding="utf-8", newline="") as stream:
+                report = reconcile_statement(
+                    user.id,
+                    read_statement_lines(stream, file_format),
+                    batch_size=options["batch_size"],
+                )
+        except OSError as e:
+            raise CommandError(f"Could not read {path}: {e}")
+
+        for error in report["errors"]:
+            self.stderr.write(f"Line {error['line']}: {error['error']}")
+
+        for line in report["unmatched"]:
+            self.stdout.write(
+                f"Line {line['line']}: {line['amount']} on {line['date']} "
+                f"unmatched - {line['reason']}"
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Matched {report['matched']} payments "
+                f"({len(report['unmatched'])} unmatched, "
+                f"{report['duplicates']} already imported, "
+                f"{report['ignored']} debits ignored, "
+                f"{len(report['errors'])} rows rejected)."
+            )
+        )
@@ -0,0 +1,68 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from invoices.services import (
+    find_drifted_financial_summaries,
+    repair_financial_summaries,
+)
+
+
+class Command(BaseCommand):
+    help = "Find (and repair) per-user financial summaries that drifted from invoices."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Only report users whose stored summary has drifted.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        verify = options["verify"]
+
+        if batch_size < 1:
+            raise CommandError("--batch-size must be a positive number.")
+
+        processed = 0
+        drifted = []
+        last_id = None
+
+        while True:
+            queryset = get_user_model().objects.order_by("id")
+            if last_id is not None:
+                queryset = queryset.filter(id__gt=last_id)
+
+            user_ids = list(queryset.values_list("id", flat=True)[:batch_size])
+            if not user_ids:
+                break
+
+            batch_drifted = find_drifted_financial_summaries(user_ids)
+            if batch_drifted and not verify:
+                repair_financial_summaries(batch_drifted)
+
+            drifted.extend(batch_drifted)
+            processed += len(user_ids)
+            last_id = user_ids[-1]
+
+        for user_id in drifted:
+            self.stdout.write(f"Drifted summary: user {user_id}")
+
+        if verify and drifted:
+            raise CommandError(
+                f"{len(drifted)} of {processed} users have drifted financial summaries."
+            )
+
+        if drifted:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Repaired {len(drifted)} of {processed} financial summaries."
+                )
+            )
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Financial summaries verified for {processed} users."
+                )
+            )
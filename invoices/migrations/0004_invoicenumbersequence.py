@@ -0,0 +1,60 @@
+# Generated by Django 6.0.1 on 2026-10-17 17:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def seed_invoice_sequences(apps, schema_editor):
+    """Start every user's sequence after the highest INV-NNNN number they hold."""
+    Invoice = apps.get_model("invoices", "Invoice")
+    InvoiceNumberSequence = apps.get_model("invoices", "InvoiceNumberSequence")
+
+    last_numbers = {}
+    invoice_numbers = Invoice.objects.filter(
+        invoice_number__startswith="INV-"
+    ).values_list("user_id", "invoice_number")
+
+    for user_id, invoice_number in invoice_numbers.iterator():
+        suffix = invoice_number.split("-")[1]
+        if not suffix.isdigit():
+            continue
+
+        last_numbers[user_id] = max(last_numbers.get(user_id, 0), int(suffix))
+
+    InvoiceNumberSequence.objects.bulk_create(
+        [
+            InvoiceNumberSequence(user_id=user_id, last_number=last_number)
+            for user_id, last_number in last_numbers.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("invoices", "0003_invoiceitem_unit_type"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="InvoiceNumberSequence",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="invoice_sequence",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("prefix", models.CharField(blank=True, default="INV-", max_length=20)),
+                ("padding", models.PositiveSmallIntegerField(default=4)),
+                ("last_number", models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_invoice_sequences, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 6.0.1 on 2026-10-17 19:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, Q, Sum
+
+
+def backfill_financial_summaries(apps, schema_editor):
+    Invoice = apps.get_model("invoices", "Invoice")
+    UserFinancialSummary = apps.get_model("invoices", "UserFinancialSummary")
+
+    billed = ~Q(status="DRAFT")
+    open_invoices = Q(status__in=["UNPAID", "PARTIALLY_PAID"])
+
+    rows = (
+        Invoice.objects.values("user_id")
+        .annotate(
+            total_billed=Sum("total_amount", filter=billed, default=0),
+            total_received=Sum("amount_paid", filter=billed, default=0),
+            outstanding=Sum(
+                F("total_amount") - F("amount_paid"), filter=open_invoices, default=0
+            ),
+            draft_count=Count("id", filter=Q(status="DRAFT")),
+            unpaid_count=Count("id", filter=Q(status="UNPAID")),
+            partially_paid_count=Count("id", filter=Q(status="PARTIALLY_PAID")),
+            paid_count=Count("id", filter=Q(status="PAID")),
+        )
+        .order_by()
+    )
+
+    UserFinancialSummary.objects.bulk_create(
+        [UserFinancialSummary(**row) for row in rows], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('invoices', '0005_invoice_analytics_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserFinancialSummary',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='financial_summary', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total_billed', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('total_received', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('outstanding', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('draft_count', models.PositiveIntegerField(default=0)),
+                ('unpaid_count', models.PositiveIntegerField(default=0)),
+                ('partially_paid_count', models.PositiveIntegerField(default=0)),
+                ('paid_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'user financial summaries',
+            },
+        ),
+        migrations.RunPython(backfill_financial_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-17 21:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('invoices', '0008_recurringinvoice'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paymentrecord',
+            name='bank_reference',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=100),
+        ),
+    ]
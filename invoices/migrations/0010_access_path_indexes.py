@@ -0,0 +1,57 @@
+# Generated by Django 6.0.1 on 2026-10-17 18:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0002_product_description'),
+        ('clients', '0001_initial'),
+        ('invoices', '0009_paymentrecord_bank_reference'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['user', 'id'], name='invoice_user_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['user', 'status', 'id'], name='invoice_user_status_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invoiceitem',
+            index=models.Index(fields=['invoice', 'id'], name='invoice_item_invoice_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='paymentrecord',
+            index=models.Index(fields=['invoice', 'payment_date'], name='payment_invoice_date_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='invoice',
+            name='invoice_user_client_idx',
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['user', 'client', 'id'], name='invoice_user_client_idx'),
+        ),
+        migrations.AlterField(
+            model_name='invoice',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='invoices', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='invoiceitem',
+            name='invoice',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='items', to='invoices.invoice'),
+        ),
+        migrations.AlterField(
+            model_name='paymentrecord',
+            name='invoice',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='payments', to='invoices.invoice'),
+        ),
+    ]
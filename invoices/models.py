@@ -1,11 +1,102 @@
+import calendar
+from datetime import date, timedelta
+from decimal import Decimal
+
 from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db import models
-from django.db.models import F, GeneratedField, Sum
+from django.db import IntegrityError, models, transaction
+from django.db.models import (
+    Case,
+    F,
+    GeneratedField,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import GreaterThan, GreaterThanOrEqual
+from django.utils import timezone
 
 from catalog.models import Product
 from clients.models import Client
 
+from .cache import bump_analytics_version_on_commit
+from .financials import financials_changed
+
+FINANCIAL_FIELDS = ["subtotal", "total_amount", "amount_paid", "status"]
+# The invoice fields UserFinancialSummary is derived from.
+SUMMARY_SOURCE_FIELDS = ["total_amount", "amount_paid", "status"]
+
+
+def _sum_for_invoice(model, field):
+    """Correlated `SUM(field)` of an invoice's related rows, 0 when there are none."""
+    total = (
+        model.objects.filter(invoice=OuterRef("pk"))
+        .order_by()
+        .values("invoice")
+        .annotate(total=Sum(field))
+        .values("total")
+    )
+    return Coalesce(
+        Subquery(total),
+        Value(Decimal("0.00")),
+        output_field=models.DecimalField(max_digits=12, decimal_places=2),
+    )
+
+
+class InvoiceNumberSequence(models.Model):
+    """
+    Hands out a user's invoice numbers. Allocation is a single
+    `last_number = last_number + n` UPDATE, so the row lock serializes
+    concurrent allocations and no invoices are scanned.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="invoice_sequence",
+    )
+    prefix = models.CharField(max_length=20, default="INV-", blank=True)
+    padding = models.PositiveSmallIntegerField(default=4)
+    last_number = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user} - {self.format(self.last_number)}"
+
+    def format(self, number):
+        return f"{self.prefix}{number:0{self.padding}d}"
+
+    @classmethod
+    def reserve(cls, user_id, count=1):
+        """Reserve the next `count` numbers for a user and return them formatted."""
+        if count < 1:
+            raise ValueError("count must be a positive number.")
+
+        with transaction.atomic():
+            sequences = cls.objects.filter(user_id=user_id)
+
+            if not sequences.update(last_number=F("last_number") + count):
+                try:
+                    with transaction.atomic():
+                        cls.objects.create(
+                            user_id=user_id,
+                            prefix=settings.INVOICE_NUMBER_PREFIX,
+                            padding=settings.INVOICE_NUMBER_PADDING,
+                            last_number=count,
+                        )
+                except IntegrityError:
+                    # Another transaction created the row first.
+                    sequences.update(last_number=F("last_number") + count)
+
+            sequence = sequences.get()
+
+        first = sequence.last_number - count + 1
+        return [sequence.format(number) for number in range(first, first + count)]
+
 
 class Invoice(models.Model):
     class InvoiceStatus(models.TextChoices):
@@ -13,9 +104,21 @@ class Invoice(models.Model):
         UNPAID = "UNPAID", "Unpaid"
         PARTIALLY_PAID = "PARTIALLY_PAID", "Partially Paid"
         PAID = "PAID", "Paid"
+        OVERDUE = "OVERDUE", "Overdue"
 
+    # Statuses with a balance still to collect.
+    OPEN_STATUSES = [
+        InvoiceStatus.UNPAID,
+        InvoiceStatus.PARTIALLY_PAID,
+        InvoiceStatus.OVERDUE,
+    ]
+
+    # Indexed by the composite indexes in Meta, which all lead with user.
     user = models.ForeignKey(
-        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="invoices"
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="invoices",
+        db_index=False,
     )
 
     client = models.ForeignKey(
@@ -47,23 +150,62 @@ class Invoice(models.Model):
 
     amount_paid = models.DecimalField(max_digits=12, decimal_places=2, default=0.00)
 
+    recurring_invoice = models.ForeignKey(
+        "RecurringInvoice",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="invoices",
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        constraints = [
+            # One generated invoice per template and run date, so the
+            # generator can be re-run safely.
+            models.UniqueConstraint(
+                fields=["recurring_invoice", "issue_date"],
+                name="invoice_recurring_issue_date_uniq",
+            ),
+        ]
+        indexes = [
+            # Invoice list: a user's invoices, paged by id.
+            models.Index(fields=["user", "id"], name="invoice_user_id_idx"),
+            # Invoice list filtered by status.
+            models.Index(
+                fields=["user", "status", "id"], name="invoice_user_status_id_idx"
+            ),
+            # Receivables aging: a user's open invoices by due date.
+            models.Index(
+                fields=["user", "status", "due_date"],
+                name="invoice_user_status_due_idx",
+            ),
+            # Monthly revenue: a user's invoices by issue date.
+            models.Index(
+                fields=["user", "issue_date"], name="invoice_user_issue_date_idx"
+            ),
+            # Top clients and the invoice list filtered by client.
+            models.Index(
+                fields=["user", "client", "id"], name="invoice_user_client_idx"
+            ),
+            # Overdue sweep: open invoices across all users by due date.
+            models.Index(fields=["status", "due_date"], name="invoice_status_due_idx"),
+        ]
+
     def __str__(self):
         return f"{self.invoice_number} - {self.name or 'Draft'}"
 
     def save(self, *args, **kwargs):
         self.clean()
         if not self.invoice_number:
-            last_invoice = Invoice.objects.filter(user=self.user).order_by("id").last()
-            if not last_invoice or not last_invoice.invoice_number.startswith("INV-"):
-                self.invoice_number = "INV-0001"
-            else:
-                last_number_str = last_invoice.invoice_number.split("-")[1]
-                new_number = int(last_number_str) + 1
-                self.invoice_number = f"INV-{new_number:04d}"
+            self.invoice_number = InvoiceNumberSequence.reserve(self.user_id)[0]
+
+        self.apply_client_defaults()
+        super().save(*args, **kwargs)
 
+    def apply_client_defaults(self):
         if self.client:
             if not self.name:
                 self.name = self.client.name
@@ -76,45 +218,123 @@ class Invoice(models.Model):
 
             if not self.address:
                 self.address = self.client.address
-        super().save(*args, **kwargs)
 
     def clean(self):
         if not self.client and not self.name:
             raise ValidationError("Please select a client or provide a client name.")
 
     def update_financials(self):
-        items_sum = self.items.aggregate(total_sum=Sum("total"))["total_sum"] or 0.00
-        self.subtotal = items_sum
-
-        self.total_amount = self.subtotal - self.discount
-
-        payments_sum = (
-            self.payments.aggregate(paid_sum=Sum("amount"))["paid_sum"] or 0.00
+        """
+        Recompute subtotal, total, amount paid and status in one UPDATE whose
+        sums are correlated subqueries, so concurrent payments cannot
+        overwrite each other's totals. The status rules match the old Python
+        version: PAID once fully paid, PARTIALLY_PAID while anything is paid,
+        and a paid invoice falls back to UNPAID when its payments go away.
+        Any of those unpaid outcomes becomes OVERDUE once the due date has
+        passed, matching what sweep_overdue_invoices maintains.
+        """
+        values = self.recompute_financials(self.user_id, [self.pk]).get(self.pk)
+
+        for field, value in (values or {}).items():
+            setattr(self, field, value)
+
+    @classmethod
+    def recompute_financials(cls, user_id, invoice_ids):
+        """
+        update_financials for many of one user's invoices at once: a single
+        UPDATE and a single summary delta. Returns {id: FINANCIAL_FIELDS
+        values} for the invoices that still exist.
+        """
+        subtotal = _sum_for_invoice(InvoiceItem, "total")
+        total_amount = subtotal - F("discount")
+        amount_paid = _sum_for_invoice(PaymentRecord, "amount")
+
+        invoices = cls.objects.filter(user_id=user_id, pk__in=invoice_ids)
+
+        with transaction.atomic():
+            bump_analytics_version_on_commit(user_id)
+            # Taking the user's summary row lock first serializes recomputes,
+            # so the UPDATE below starts from a snapshot that already includes
+            # the payments committed by any recompute we waited for.
+            UserFinancialSummary.lock(user_id)
+
+            previous = list(invoices.values(*SUMMARY_SOURCE_FIELDS))
+            if not previous:
+                return {}
+
+            invoices.update(
+                subtotal=subtotal,
+                total_amount=total_amount,
+                amount_paid=amount_paid,
+                status=Case(
+                    When(
+                        GreaterThanOrEqual(amount_paid, total_amount)
+                        & GreaterThan(total_amount, 0),
+                        then=Value(cls.InvoiceStatus.PAID),
+                    ),
+                    When(
+                        Q(due_date__lt=timezone.localdate())
+                        & (
+                            GreaterThan(amount_paid, 0)
+                            | ~Q(status=cls.InvoiceStatus.DRAFT)
+                        ),
+                        then=Value(cls.InvoiceStatus.OVERDUE),
+                    ),
+                    When(
+                        GreaterThan(amount_paid, 0),
+                        then=Value(cls.InvoiceStatus.PARTIALLY_PAID),
+                    ),
+                    When(
+                        status__in=[
+                            cls.InvoiceStatus.PAID,
+                            cls.InvoiceStatus.PARTIALLY_PAID,
+                            cls.InvoiceStatus.OVERDUE,
+                        ],
+                        then=Value(cls.InvoiceStatus.UNPAID),
+                    ),
+                    default=F("status"),
+                ),
+            )
+
+            current = {
+                row.pop("id"): row for row in invoices.values("id", *FINANCIAL_FIELDS)
+            }
+
+            delta = {}
+            for state in previous:
+                UserFinancialSummary.change_delta(state, None, delta)
+            for values in current.values():
+                state = {field: values[field] for field in SUMMARY_SOURCE_FIELDS}
+                UserFinancialSummary.change_delta(None, state, delta)
+
+            UserFinancialSummary.apply_delta(user_id, delta)
+
+        return current
+
+    def summary_state(self):
+        return {field: getattr(self, field) for field in SUMMARY_SOURCE_FIELDS}
+
+    @classmethod
+    def recompute_totals(cls, invoice_ids):
+        """
+        Set subtotal and total_amount for many invoices from their items in a
+        single UPDATE. Unlike update_financials this leaves payments, status
+        and summaries alone, so it suits invoices that were just bulk created.
+        """
+        subtotal = _sum_for_invoice(InvoiceItem, "total")
+        cls.objects.filter(pk__in=invoice_ids).update(
+            subtotal=subtotal, total_amount=subtotal - F("discount")
         )
-        self.amount_paid = payments_sum
 
-        if self.amount_paid >= self.total_amount and self.total_amount > 0:
-            self.status = self.InvoiceStatus.PAID
-        elif self.amount_paid > 0:
-            self.status = self.InvoiceStatus.PARTIALLY_PAID
-        else:
-            if self.status in [
-                self.InvoiceStatus.PAID,
-                self.InvoiceStatus.PARTIALLY_PAID,
-            ]:
-                self.status = self.InvoiceStatus.UNPAID
 
-        self.save(update_fields=["subtotal", "total_amount", "amount_paid", "status"])
+class LineItem(models.Model):
+    """Fields and product defaults shared by invoice and template line items."""
 
-
-class InvoiceItem(models.Model):
     class UnitType(models.TextChoices):
         QUANTITY = "QTY", "Quantity"
         HOURS = "HRS", "Hours"
         DAYS = "DAYS", "Days"
 
-    invoice = models.ForeignKey(Invoice, on_delete=models.CASCADE, related_name="items")
-
     product = models.ForeignKey(
         Product, on_delete=models.SET_NULL, null=True, blank=True
     )
@@ -131,18 +351,13 @@ class InvoiceItem(models.Model):
         max_digits=12, decimal_places=2, blank=True, null=True
     )
 
-    total = GeneratedField(
-        expression=F("quantity") * F("unit_price"),
-        output_field=models.DecimalField(max_digits=12, decimal_places=2),
-        db_persist=True,
-    )
+    class Meta:
+        abstract = True
 
     def __str__(self):
         return f"{self.title} (x{self.quantity})"
 
-    def save(self, *args, **kwargs):
-        self.clean()
-
+    def apply_product_defaults(self):
         if self.product:
             if not self.title:
                 self.title = self.product.title
@@ -153,15 +368,6 @@ class InvoiceItem(models.Model):
             if self.unit_price is None:
                 self.unit_price = self.product.unit_price
 
-        super().save(*args, **kwargs)
-        self.invoice.update_financials()
-
-    def delete(self, *args, **kwargs):
-        invoice = self.invoice
-        result = super().delete(*args, **kwargs)
-        invoice.update_financials()
-        return result
-
     def clean(self):
         if not self.product and not self.title:
             raise ValidationError("Please select a product or provide a title.")
@@ -170,9 +376,40 @@ class InvoiceItem(models.Model):
             raise ValidationError("Please select a product or provide a unit price.")
 
 
+class InvoiceItem(LineItem):
+    invoice = models.ForeignKey(
+        Invoice, on_delete=models.CASCADE, related_name="items", db_index=False
+    )
+
+    total = GeneratedField(
+        expression=F("quantity") * F("unit_price"),
+        output_field=models.DecimalField(max_digits=12, decimal_places=2),
+        db_persist=True,
+    )
+
+    class Meta:
+        indexes = [
+            # An invoice's items in entry order, for detail pages and exports.
+            models.Index(fields=["invoice", "id"], name="invoice_item_invoice_id_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.clean()
+        self.apply_product_defaults()
+
+        super().save(*args, **kwargs)
+        financials_changed(self.invoice)
+
+    def delete(self, *args, **kwargs):
+        invoice = self.invoice
+        result = super().delete(*args, **kwargs)
+        financials_changed(invoice)
+        return result
+
+
 class PaymentRecord(models.Model):
     invoice = models.ForeignKey(
-        Invoice, on_delete=models.CASCADE, related_name="payments"
+        Invoice, on_delete=models.CASCADE, related_name="payments", db_index=False
     )
 
     amount = models.DecimalField(max_digits=12, decimal_places=2)
@@ -183,17 +420,239 @@ class PaymentRecord(models.Model):
 
     note = models.CharField(max_length=255, blank=True, default="")
 
+    # The bank's transaction id for imported payments, or a fingerprint of
+    # the statement line when it has none, so a statement can be imported
+    # again without paying anything twice.
+    bank_reference = models.CharField(
+        max_length=100, blank=True, default="", db_index=True
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # An invoice's payments by date.
+            models.Index(
+                fields=["invoice", "payment_date"], name="payment_invoice_date_idx"
+            ),
+        ]
+
     def __str__(self):
         return f"{self.invoice.invoice_number} - {self.amount} on {self.payment_date}"
 
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
-        self.invoice.update_financials()
+        financials_changed(self.invoice)
 
     def delete(self, *args, **kwargs):
         invoice = self.invoice
         result = super().delete(*args, **kwargs)
-        invoice.update_financials()
+        financials_changed(invoice)
         return result
+
+
+class UserFinancialSummary(models.Model):
+    """
+    Per-user invoice totals, kept current by applying deltas from
+    Invoice.update_financials and the invoice signals. The
+    reconcile_financial_summaries command repairs any drift.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="financial_summary",
+    )
+    total_billed = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_received = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    outstanding = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    draft_count = models.PositiveIntegerField(default=0)
+    unpaid_count = models.PositiveIntegerField(default=0)
+    partially_paid_count = models.PositiveIntegerField(default=0)
+    paid_count = models.PositiveIntegerField(default=0)
+    overdue_count = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "user financial summaries"
+
+    def __str__(self):
+        return f"{self.user} - {self.outstanding} outstanding"
+
+    @staticmethod
+    def contribution(state):
+        """What one invoice's SUMMARY_SOURCE_FIELDS values add to the totals."""
+        if state is None:
+            return {}
+
+        status = state["status"]
+        total_amount = Decimal(str(state["total_amount"]))
+        amount_paid = Decimal(str(state["amount_paid"]))
+
+        values = {f"{status.lower()}_count": 1}
+
+        if status != Invoice.InvoiceStatus.DRAFT:
+            values["total_billed"] = total_amount
+            values["total_received"] = amount_paid
+
+        if status in Invoice.OPEN_STATUSES:
+            values["outstanding"] = total_amount - amount_paid
+
+        return values
+
+    @classmethod
+    def _update(cls, user_id, changes, create):
+        summaries = cls.objects.filter(user_id=user_id)
+        changes = {**changes, "updated_at": timezone.now()}
+
+        with transaction.atomic():
+            if summaries.update(**changes) or not create:
+                return
+
+            try:
+                with transaction.atomic():
+                    cls.objects.create(user_id=user_id)
+            except IntegrityError:
+                # Another transaction created the row first.
+                pass
+
+            summaries.update(**changes)
+
+    @classmethod
+    def lock(cls, user_id):
+        """Lock (creating if needed) the user's row for the current transaction."""
+        cls._update(user_id, {}, create=True)
+
+    @classmethod
+    def change_delta(cls, previous, current, delta=None):
+        """Add the move from `previous` to `current` state to a delta dict."""
+        delta = {} if delta is None else delta
+        for field, value in cls.contribution(current).items():
+            delta[field] = delta.get(field, 0) + value
+        for field, value in cls.contribution(previous).items():
+            delta[field] = delta.get(field, 0) - value
+
+        return delta
+
+    @classmethod
+    def apply_delta(cls, user_id, delta, create=True):
+        changes = {field: F(field) + value for field, value in delta.items() if value}
+        if changes:
+            cls._update(user_id, changes, create)
+
+    @classmethod
+    def apply_change(cls, user_id, previous, current, create=True):
+        """Move one invoice's contribution from `previous` to `current` state."""
+        cls.apply_delta(user_id, cls.change_delta(previous, current), create)
+
+
+class RecurringInvoice(models.Model):
+    """
+    A template that generate_recurring_invoices turns into an issued invoice
+    on every `next_run_date`, which then moves forward by one cadence period.
+    """
+
+    class Cadence(models.TextChoices):
+        WEEKLY = "WEEKLY", "Weekly"
+        MONTHLY = "MONTHLY", "Monthly"
+        QUARTERLY = "QUARTERLY", "Quarterly"
+        YEARLY = "YEARLY", "Yearly"
+
+    CADENCE_MONTHS = {
+        Cadence.MONTHLY: 1,
+        Cadence.QUARTERLY: 3,
+        Cadence.YEARLY: 12,
+    }
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="recurring_invoices",
+    )
+
+    client = models.ForeignKey(
+        Client,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="recurring_invoices",
+    )
+
+    name = models.CharField(max_length=255, blank=True)
+    email = models.EmailField(blank=True, default="")
+    phone = models.CharField(max_length=20, blank=True)
+    address = models.TextField(blank=True, default="")
+
+    currency = models.CharField(max_length=3, default="INR")
+    discount = models.DecimalField(max_digits=12, decimal_places=2, default=0.00)
+
+    cadence = models.CharField(
+        max_length=10, choices=Cadence.choices, default=Cadence.MONTHLY
+    )
+    days_until_due = models.PositiveSmallIntegerField(default=15)
+
+    start_date = models.DateField()
+    end_date = models.DateField(null=True, blank=True)
+    next_run_date = models.DateField(blank=True)
+
+    is_active = models.BooleanField(default=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # The generator's scan: active templates that are due.
+            models.Index(
+                fields=["next_run_date"],
+                condition=Q(is_active=True),
+                name="recurring_invoice_due_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name or self.client} - {self.get_cadence_display()}"
+
+    def save(self, *args, **kwargs):
+        self.clean()
+        if self.next_run_date is None:
+            self.next_run_date = self.start_date
+
+        super().save(*args, **kwargs)
+
+    def clean(self):
+        if not self.client and not self.name:
+            raise ValidationError("Please select a client or provide a client name.")
+
+        if self.end_date and self.start_date and self.end_date < self.start_date:
+            raise ValidationError("The end date cannot be before the start date.")
+
+    def run_date_after(self, run_date):
+        """
+        The run after `run_date`. Month-based cadences keep the start date's
+        day of month, clamped to shorter months (Jan 31 -> Feb 28 -> Mar 31).
+        """
+        if self.cadence == self.Cadence.WEEKLY:
+            return run_date + timedelta(weeks=1)
+
+        month = run_date.year * 12 + run_date.month - 1
+        month += self.CADENCE_MONTHS[self.cadence]
+        year, month = divmod(month, 12)
+        day = min(self.start_date.day, calendar.monthrange(year, month + 1)[1])
+
+        return date(year, month + 1, day)
+
+
+class RecurringInvoiceItem(LineItem):
+    recurring_invoice = models.ForeignKey(
+        RecurringInvoice, on_delete=models.CASCADE, related_name="items"
+    )
+
+    def save(self, *args, **kwargs):
+        self.clean()
+        self.apply_product_defaults()
+
+        super().save(*args, **kwargs)
@@ -0,0 +1,5 @@
+from config.pagination import KeysetPagination
+
+
+class InvoicePagination(KeysetPagination):
+    """Newest invoices first, which is the inherited `-id` ordering."""
@@ -0,0 +1,151 @@
+import base64
+import hashlib
+import json
+import logging
+import mimetypes
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.template.loader import render_to_string
+
+from users.models import UserBusinessProfile
+
+logger = logging.getLogger(__name__)
+
+PDF_TEMPLATE = "invoices/invoice_pdf.html"
+# Part of every cache key; bump it when the template changes to re-render.
+PDF_TEMPLATE_VERSION = 1
+PDF_STORAGE_DIR = "invoices/pdf"
+PDF_RENDER_LOCK_TIMEOUT = 60 * 5
+
+INVOICE_FIELDS = [
+    "invoice_number",
+    "status",
+    "currency",
+    "issue_date",
+    "due_date",
+    "name",
+    "email",
+    "phone",
+    "address",
+    "subtotal",
+    "discount",
+    "total_amount",
+    "amount_paid",
+]
+ITEM_FIELDS = [
+    "title",
+    "description",
+    "unit_type",
+    "quantity",
+    "unit_price",
+    "total",
+]
+BUSINESS_FIELDS = [
+    "business_name",
+    "gst_number",
+    "vat_number",
+    "address",
+    "phone_number",
+    "website",
+]
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.INVOICE_PDF_WORKERS,
+                thread_name_prefix="invoice-pdf",
+            )
+
+    return _executor
+
+
+def _render_lock_key(path):
+    return f"invoice_pdf_rendering_{path}"
+
+
+def get_pdf_inputs(invoice):
+    """Collect everything the PDF shows, as plain data the worker can render."""
+    inputs = {
+        "version": PDF_TEMPLATE_VERSION,
+        "invoice": {field: getattr(invoice, field) for field in INVOICE_FIELDS},
+        "items": list(invoice.items.order_by("id").values(*ITEM_FIELDS)),
+        "business": UserBusinessProfile.objects.filter(user_id=invoice.user_id)
+        .values(*BUSINESS_FIELDS, "logo")
+        .first(),
+    }
+    inputs["invoice"]["balance_due"] = invoice.total_amount - invoice.amount_paid
+
+    return inputs
+
+
+def get_pdf_path(inputs):
+    digest = hashlib.sha256(
+        json.dumps(inputs, sort_keys=True, default=str).encode()
+    ).hexdigest()
+    return f"{PDF_STORAGE_DIR}/{digest}.pdf"
+
+
+def _logo_data_uri(name):
+    if not name:
+        return None
+
+    try:
+        with default_storage.open(name) as logo:
+            data = base64.b64encode(logo.read()).decode()
+    except OSError:
+        return None
+
+    content_type = mimetypes.guess_type(name)[0] or "image/png"
+    return f"data:{content_type};base64,{data}"
+
+
+def render_invoice_pdf(inputs):
+    # Imported here so the app runs without the Pango stack WeasyPrint needs.
+    from weasyprint import HTML
+
+    business = inputs["business"] or {}
+    html = render_to_string(
+        PDF_TEMPLATE, {**inputs, "logo": _logo_data_uri(business.get("logo"))}
+    )
+    return HTML(string=html).write_pdf()
+
+
+def _render_and_store(inputs, path):
+    try:
+        if not default_storage.exists(path):
+            default_storage.save(path, ContentFile(render_invoice_pdf(inputs)))
+    except Exception:
+        logger.exception("Failed to render invoice PDF %s", path)
+    finally:
+        cache.delete(_render_lock_key(path))
+
+
+def get_invoice_pdf(invoice):
+    """
+    Return (path, ready) for an invoice's PDF. PDFs are stored under a hash
+    of their inputs, so an unchanged invoice is always served from storage.
+    A missing PDF is queued on the worker pool (once across processes) and
+    the caller is expected to ask again later.
+    """
+    inputs = get_pdf_inputs(invoice)
+    path = get_pdf_path(inputs)
+
+    if default_storage.exists(path):
+        return path, True
+
+    if cache.add(_render_lock_key(path), True, timeout=PDF_RENDER_LOCK_TIMEOUT):
+        _get_executor().submit(_render_and_store, inputs, path)
+
+    return path, False
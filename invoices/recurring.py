@@ -0,0 +1,169 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from search.documents import index_objects
+from users.credits import record_credits
+from users.models import CreditTransaction
+
+from .cache import bump_analytics_version_on_commit
+from .models import (
+    SUMMARY_SOURCE_FIELDS,
+    Invoice,
+    InvoiceItem,
+    InvoiceNumberSequence,
+    RecurringInvoice,
+    RecurringInvoiceItem,
+    UserFinancialSummary,
+)
+
+
+def build_invoice(template, invoice_number, today):
+    """The unsaved invoice for a template's current run, filled like Invoice.save."""
+    issue_date = template.next_run_date
+    due_date = issue_date + timedelta(days=template.days_until_due)
+
+    invoice = Invoice(
+        user_id=template.user_id,
+        client=template.client,
+        recurring_invoice=template,
+        name=template.name,
+        email=template.email,
+        phone=template.phone,
+        address=template.address,
+        invoice_number=invoice_number,
+        status=(
+            Invoice.InvoiceStatus.OVERDUE
+            if due_date < today
+            else Invoice.InvoiceStatus.UNPAID
+        ),
+        currency=template.currency,
+        issue_date=issue_date,
+        due_date=due_date,
+        discount=template.discount,
+    )
+    invoice.apply_client_defaults()
+
+    return invoice
+
+
+def _generate_batch(templates, today):
+    """
+    Issue one invoice for each template's current run and move the templates
+    to their next run. Runs that already have an invoice are only advanced.
+    Returns the number of invoices created.
+    """
+    existing = set(
+        Invoice.objects.filter(
+            recurring_invoice__in=templates,
+            issue_date__in={template.next_run_date for template in templates},
+        ).values_list("recurring_invoice_id", "issue_date")
+    )
+
+    pending = []
+    for template in templates:
+        if template.end_date and template.next_run_date > template.end_date:
+            template.is_active = False
+        elif (template.id, template.next_run_date) not in existing:
+            pending.append(template)
+
+    counts = Counter(template.user_id for template in pending)
+    numbers = {
+        user_id: iter(InvoiceNumberSequence.reserve(user_id, count))
+        for user_id, count in counts.items()
+    }
+
+    invoices = Invoice.objects.bulk_create(
+        [
+            build_invoice(template, next(numbers[template.user_id]), today)
+            for template in pending
+        ]
+    )
+
+    InvoiceItem.objects.bulk_create(
+        [
+            InvoiceItem(
+                invoice=invoice,
+                product_id=item.product_id,
+                title=item.title,
+                description=item.description,
+                unit_type=item.unit_type,
+                quantity=item.quantity,
+                unit_price=item.unit_price,
+            )
+            for template, invoice in zip(pending, invoices)
+            for item in template.items.all()
+        ]
+    )
+
+    # bulk_create skips Invoice.save and its signals, so apply their effects
+    # once per batch: totals, summaries, analytics versions, credits and
+    # search documents.
+    Invoice.recompute_totals([invoice.id for invoice in invoices])
+
+    deltas = {}
+    for row in Invoice.objects.filter(
+        pk__in=[invoice.id for invoice in invoices]
+    ).values("user_id", *SUMMARY_SOURCE_FIELDS):
+        state = {field: row[field] for field in SUMMARY_SOURCE_FIELDS}
+        UserFinancialSummary.change_delta(
+            None, state, deltas.setdefault(row["user_id"], {})
+        )
+
+    for user_id, delta in deltas.items():
+        bump_analytics_version_on_commit(user_id)
+        UserFinancialSummary.apply_delta(user_id, delta)
+
+    record_credits(
+        (template.user_id, -1, CreditTransaction.Reason.INVOICE_CREATED)
+        for template in pending
+    )
+
+    index_objects(invoices)
+
+    now = timezone.now()
+    for template in templates:
+        if template.is_active:
+            template.next_run_date = template.run_date_after(template.next_run_date)
+        template.updated_at = now
+
+    RecurringInvoice.objects.bulk_update(
+        templates, ["next_run_date", "is_active", "updated_at"]
+    )
+
+    return len(invoices)
+
+
+def generate_recurring_invoices(today=None, batch_size=500):
+    """
+    Issue every recurring invoice due on or before `today` across all users
+    and return how many were created. Each batch of templates is locked
+    (skipping ones another run holds) and handled in one transaction with
+    bulk INSERTs, so a crash never leaves a run half done. A template that
+    is behind gets one invoice per missed run. Re-running is safe: runs that
+    already have an invoice are skipped, and the (recurring_invoice,
+    issue_date) constraint backs that up.
+    """
+    today = today or timezone.localdate()
+    due = RecurringInvoice.objects.filter(is_active=True, next_run_date__lte=today)
+
+    created = 0
+    while True:
+        with transaction.atomic():
+            templates = list(
+                due.select_for_update(skip_locked=True, of=("self",))
+                .select_related("client")
+                .prefetch_related(
+                    Prefetch(
+                        "items", queryset=RecurringInvoiceItem.objects.order_by("id")
+                    )
+                )
+                .order_by("next_run_date", "id")[:batch_size]
+            )
+            if not templates:
+                return created
+
+            created += _generate_batch(templates, today)
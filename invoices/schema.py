@@ -0,0 +1,155 @@
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import (
+    OpenApiParameter,
+    OpenApiResponse,
+    extend_schema,
+    extend_schema_view,
+    inline_serializer,
+)
+from rest_framework import serializers
+
+from .exports import EXPORT_FORMATS, EXPORT_ROWS
+from .models import Invoice
+from .serializers import (
+    BankStatementSerializer,
+    InvoiceAnalyticsSerializer,
+    InvoiceItemBulkCreateSerializer,
+    InvoiceItemSerializer,
+    MoneyField,
+    UserFinancialSummarySerializer,
+)
+
+INVOICE_FILTER_PARAMETERS = [
+    OpenApiParameter(
+        "status",
+        str,
+        enum=[choice for choice, _ in Invoice.InvoiceStatus.choices],
+    ),
+    OpenApiParameter("client", int, description="Only invoices for this client."),
+    OpenApiParameter(
+        "issued_from", OpenApiTypes.DATE, description="Issued on or after."
+    ),
+    OpenApiParameter(
+        "issued_to", OpenApiTypes.DATE, description="Issued on or before."
+    ),
+]
+
+INVOICE_VIEWSET_SCHEMA = extend_schema_view(
+    list=extend_schema(
+        tags=["Invoices"],
+        summary="List my invoices",
+        description="Your invoices, newest first. Results are cursor-paginated; follow the `next` link for more.",
+        parameters=INVOICE_FILTER_PARAMETERS,
+    ),
+    retrieve=extend_schema(
+        tags=["Invoices"],
+        summary="Get invoice details",
+        description="A single invoice with its client, line items and payments.",
+    ),
+    analytics=extend_schema(
+        tags=["Invoices"],
+        summary="Receivables and revenue dashboard",
+        description="Outstanding balances bucketed by days past due, billed and collected amounts per issue month "
+        "for the last 12 months, and the top clients by billed total. Drafts are excluded and amounts are grouped by currency. "
+        "Results are cached and refreshed whenever an invoice, line item or payment changes.",
+        responses=InvoiceAnalyticsSerializer,
+    ),
+    export=extend_schema(
+        tags=["Invoices"],
+        summary="Export my invoices",
+        description="Download your invoices as CSV or JSON Lines, streamed as they are read so any history size can be exported. "
+        "Accepts the same filters as the invoice list. With `rows=items` each line item becomes its own row, carrying its invoice's number, status, currency and issue date.",
+        parameters=[
+            *INVOICE_FILTER_PARAMETERS,
+            OpenApiParameter("output", str, enum=EXPORT_FORMATS, default="csv"),
+            OpenApiParameter("rows", str, enum=EXPORT_ROWS, default="invoices"),
+        ],
+        responses={(200, "text/csv"): OpenApiTypes.BINARY},
+    ),
+    reconcile=extend_schema(
+        tags=["Invoices"],
+        summary="Reconcile a bank statement",
+        description="Upload a bank statement as CSV (`date`, `amount`, `description` and optional `transaction_id` columns) or OFX. "
+        "Each credit is matched to one of your open invoices by an invoice number in its description, or else by exact balance due plus the client's name, and recorded as a payment. "
+        "Transactions imported before are skipped, recognized by `transaction_id` or else by their date, amount and description; debits are ignored, and lines that match nothing are listed with the reason. "
+        "A file that cannot be decoded as UTF-8 or parsed as CSV past some line is reported as an error on that line, with the lines before it applied.",
+        request={"multipart/form-data": BankStatementSerializer},
+        responses={
+            200: inline_serializer(
+                name="BankStatementReport",
+                fields={
+                    "matched": serializers.IntegerField(),
+                    "duplicates": serializers.IntegerField(),
+                    "ignored": serializers.IntegerField(),
+                    "unmatched": serializers.ListField(
+                        child=inline_serializer(
+                            name="BankStatementUnmatchedLine",
+                            fields={
+                                "line": serializers.IntegerField(),
+                                "date": serializers.DateField(),
+                                "amount": serializers.DecimalField(
+                                    max_digits=12, decimal_places=2
+                                ),
+                                "description": serializers.CharField(),
+                                "reason": serializers.CharField(),
+                            },
+                        )
+                    ),
+                    "errors": serializers.ListField(
+                        child=inline_serializer(
+                            name="BankStatementError",
+                            fields={
+                                "line": serializers.IntegerField(),
+                                "error": serializers.CharField(),
+                            },
+                        )
+                    ),
+                },
+            )
+        },
+    ),
+    summary=extend_schema(
+        tags=["Invoices"],
+        summary="My invoice totals",
+        description="Total billed, received and outstanding across your invoices, plus the number of invoices in each status. "
+        "Read from a maintained per-user row, so it costs a single lookup.",
+        responses=UserFinancialSummarySerializer,
+    ),
+)
+
+INVOICE_ITEM_BULK_CREATE_SCHEMA = extend_schema_view(
+    post=extend_schema(
+        tags=["Invoices"],
+        summary="Add many line items to an invoice",
+        description="Insert up to 500 line items in one request. Items referencing a product take its title, description and unit price "
+        "unless given. The invoice totals and status are recalculated once for the whole batch.",
+        request=InvoiceItemBulkCreateSerializer,
+        responses={
+            201: inline_serializer(
+                name="InvoiceItemBulkCreateResponse",
+                fields={
+                    "items": InvoiceItemSerializer(many=True),
+                    "subtotal": MoneyField(),
+                    "total_amount": MoneyField(),
+                    "status": serializers.CharField(),
+                },
+            )
+        },
+    )
+)
+
+INVOICE_PDF_SCHEMA = extend_schema_view(
+    get=extend_schema(
+        tags=["Invoices"],
+        summary="Download an invoice as PDF",
+        description="Returns the PDF when it is already rendered for the invoice's current contents. "
+        "Otherwise rendering starts in the background and a 202 with a `Retry-After` header is returned; poll until the PDF is served.",
+        responses={
+            200: OpenApiResponse(OpenApiTypes.BINARY, description="The invoice PDF."),
+            202: inline_serializer(
+                name="InvoicePdfRenderingResponse",
+                fields={"status": serializers.CharField()},
+            ),
+        },
+    )
+)
@@ -0,0 +1,183 @@
+from rest_framework import serializers
+
+from clients.models import Client
+
+from .exports import EXPORT_FORMATS, EXPORT_ROWS
+from .models import Invoice, InvoiceItem, PaymentRecord, UserFinancialSummary
+from .statements import STATEMENT_FORMATS
+
+
+class InvoiceItemSerializer(serializers.ModelSerializer):
+    product = serializers.IntegerField(
+        source="product_id", required=False, allow_null=True
+    )
+
+    class Meta:
+        model = InvoiceItem
+        fields = [
+            "id",
+            "product",
+            "title",
+            "description",
+            "unit_type",
+            "quantity",
+            "unit_price",
+            "total",
+        ]
+        read_only_fields = ["id", "total"]
+
+
+class InvoiceItemBulkCreateSerializer(serializers.Serializer):
+    items = InvoiceItemSerializer(many=True, allow_empty=False, max_length=500)
+
+
+class InvoiceClientSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Client
+        fields = ["id", "name", "email", "phone", "address"]
+
+
+class PaymentRecordSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PaymentRecord
+        fields = [
+            "id",
+            "amount",
+            "payment_date",
+            "payment_method",
+            "note",
+            "created_at",
+        ]
+
+
+class InvoiceListSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Invoice
+        fields = [
+            "id",
+            "invoice_number",
+            "status",
+            "client",
+            "name",
+            "currency",
+            "issue_date",
+            "due_date",
+            "total_amount",
+            "amount_paid",
+            "created_at",
+        ]
+
+
+class InvoiceDetailSerializer(serializers.ModelSerializer):
+    client = InvoiceClientSerializer(read_only=True)
+    items = InvoiceItemSerializer(many=True, read_only=True)
+    payments = PaymentRecordSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Invoice
+        fields = [
+            "id",
+            "invoice_number",
+            "status",
+            "client",
+            "name",
+            "email",
+            "phone",
+            "address",
+            "currency",
+            "issue_date",
+            "due_date",
+            "subtotal",
+            "discount",
+            "total_amount",
+            "amount_paid",
+            "items",
+            "payments",
+            "created_at",
+            "updated_at",
+        ]
+
+
+class InvoiceFilterSerializer(serializers.Serializer):
+    status = serializers.ChoiceField(
+        choices=Invoice.InvoiceStatus.choices, required=False
+    )
+    client = serializers.IntegerField(required=False)
+    issued_from = serializers.DateField(required=False)
+    issued_to = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        issued_from = attrs.get("issued_from")
+        issued_to = attrs.get("issued_to")
+
+        if issued_from and issued_to and issued_from > issued_to:
+            raise serializers.ValidationError(
+                {"issued_to": "issued_to must not be before issued_from."}
+            )
+
+        return attrs
+
+
+class InvoiceExportSerializer(InvoiceFilterSerializer):
+    output = serializers.ChoiceField(choices=EXPORT_FORMATS, default="csv")
+    rows = serializers.ChoiceField(choices=EXPORT_ROWS, default="invoices")
+
+
+class BankStatementSerializer(serializers.Serializer):
+    file = serializers.FileField(required=True)
+    format = serializers.ChoiceField(choices=STATEMENT_FORMATS, required=False)
+
+
+class MoneyField(serializers.DecimalField):
+    def __init__(self, **kwargs):
+        super().__init__(max_digits=12, decimal_places=2, **kwargs)
+
+
+class InvoiceAgingSerializer(serializers.Serializer):
+    currency = serializers.CharField()
+    total = MoneyField()
+    current = MoneyField()
+    days_1_30 = MoneyField()
+    days_31_60 = MoneyField()
+    days_61_90 = MoneyField()
+    days_over_90 = MoneyField()
+
+
+class InvoiceMonthlyRevenueSerializer(serializers.Serializer):
+    month = serializers.DateField()
+    currency = serializers.CharField()
+    invoices = serializers.IntegerField()
+    billed = MoneyField()
+    collected = MoneyField()
+
+
+class InvoiceTopClientSerializer(serializers.Serializer):
+    client = serializers.IntegerField()
+    name = serializers.CharField()
+    currency = serializers.CharField()
+    invoices = serializers.IntegerField()
+    billed = MoneyField()
+    outstanding = MoneyField()
+
+
+class InvoiceAnalyticsSerializer(serializers.Serializer):
+    as_of = serializers.DateField()
+    aging = InvoiceAgingSerializer(many=True)
+    monthly_revenue = InvoiceMonthlyRevenueSerializer(many=True)
+    top_clients = InvoiceTopClientSerializer(many=True)
+
+
+class UserFinancialSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UserFinancialSummary
+        fields = [
+            "total_billed",
+            "total_received",
+            "outstanding",
+            "draft_count",
+            "unpaid_count",
+            "partially_paid_count",
+            "paid_count",
+            "overdue_count",
+            "updated_at",
+        ]
@@ -0,0 +1,231 @@
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Q, Sum
+from django.utils import timezone
+
+from catalog.models import Product
+
+from .cache import bump_analytics_version_on_commit
+from .models import SUMMARY_SOURCE_FIELDS, Invoice, InvoiceItem, UserFinancialSummary
+
+SUMMARY_FIELDS = [
+    "total_billed",
+    "total_received",
+    "outstanding",
+    *(f"{status.lower()}_count" for status in Invoice.InvoiceStatus.values),
+]
+
+
+def add_invoice_items(invoice, items):
+    """
+    Insert many line items with a single bulk INSERT and recompute the
+    invoice's financials once. `items` are validated InvoiceItem field dicts
+    whose `product_id` must belong to the invoice's user.
+    """
+    product_ids = {item["product_id"] for item in items if item.get("product_id")}
+    products = Product.objects.filter(user_id=invoice.user_id).in_bulk(product_ids)
+
+    missing = sorted(product_ids - products.keys())
+    if missing:
+        raise ValidationError(
+            f"Invalid product ids: {', '.join(str(pk) for pk in missing)}"
+        )
+
+    invoice_items = []
+    for index, item in enumerate(items, start=1):
+        invoice_item = InvoiceItem(**item, invoice=invoice)
+        if invoice_item.product_id:
+            invoice_item.product = products[invoice_item.product_id]
+
+        try:
+            invoice_item.clean()
+        except ValidationError as e:
+            raise ValidationError(f"Item {index}: {' '.join(e.messages)}")
+
+        invoice_item.apply_product_defaults()
+        invoice_items.append(invoice_item)
+
+    with transaction.atomic():
+        created = InvoiceItem.objects.bulk_create(invoice_items)
+        invoice.update_financials()
+
+    return created
+
+
+def compute_financial_summaries(user_ids):
+    """Build fresh, unsaved summaries for the given users with one GROUP BY."""
+    money = DecimalField(max_digits=14, decimal_places=2)
+    billed = ~Q(status=Invoice.InvoiceStatus.DRAFT)
+    open_invoices = Q(status__in=Invoice.OPEN_STATUSES)
+
+    rows = (
+        Invoice.objects.filter(user_id__in=user_ids)
+        .values("user_id")
+        .annotate(
+            total_billed=Sum(
+                "total_amount", filter=billed, default=0, output_field=money
+            ),
+            total_received=Sum(
+                "amount_paid", filter=billed, default=0, output_field=money
+            ),
+            outstanding=Sum(
+                F("total_amount") - F("amount_paid"),
+                filter=open_invoices,
+                default=0,
+                output_field=money,
+            ),
+            **{
+                f"{status.lower()}_count": Count("id", filter=Q(status=status))
+                for status in Invoice.InvoiceStatus.values
+            },
+        )
+        .order_by()
+    )
+
+    summaries = {user_id: UserFinancialSummary(user_id=user_id) for user_id in user_ids}
+    for row in rows:
+        summaries[row["user_id"]] = UserFinancialSummary(**row)
+
+    return summaries
+
+
+def _summary_snapshot(summary):
+    return tuple(getattr(summary, field) for field in SUMMARY_FIELDS)
+
+
+def find_drifted_financial_summaries(user_ids):
+    """Return the ids of users whose stored summary differs from a fresh one."""
+    expected = compute_financial_summaries(user_ids)
+    stored = UserFinancialSummary.objects.in_bulk(user_ids)
+
+    drifted = []
+    for user_id, fresh in expected.items():
+        current = stored.get(user_id)
+
+        if current is None:
+            if any(_summary_snapshot(fresh)):
+                drifted.append(user_id)
+        elif _summary_snapshot(current) != _summary_snapshot(fresh):
+            drifted.append(user_id)
+
+    return drifted
+
+
+def repair_financial_summaries(user_ids):
+    """
+    Rebuild the given users' summaries. Their rows are locked first, so no
+    delta from a concurrent invoice write is lost between the recount and
+    the write.
+    """
+    with transaction.atomic():
+        list(
+            UserFinancialSummary.objects.select_for_update()
+            .filter(user_id__in=user_ids)
+            .values_list("user_id", flat=True)
+        )
+
+        summaries = compute_financial_summaries(user_ids)
+        UserFinancialSummary.objects.bulk_create(
+            summaries.values(),
+            update_conflicts=True,
+            unique_fields=["user"],
+            update_fields=[*SUMMARY_FIELDS, "updated_at"],
+        )
+
+    return summaries
+
+
+def _sweep_batch(candidates, target_status, batch_size):
+    """
+    Move up to `batch_size` invoices matching `candidates` to the status
+    `target_status(state)` returns for each, in one short transaction. The
+    users' summary rows are locked before the invoices, in the same order
+    Invoice.update_financials takes them. Returns how many invoices moved.
+    """
+    with transaction.atomic():
+        batch = candidates.values("user_id").order_by()[:batch_size]
+        user_ids = sorted({row["user_id"] for row in batch})
+        if not user_ids:
+            return 0
+
+        list(
+            UserFinancialSummary.objects.select_for_update()
+            .filter(user_id__in=user_ids)
+            .order_by("user_id")
+            .values_list("user_id", flat=True)
+        )
+
+        rows = list(
+            candidates.select_for_update()
+            .filter(user_id__in=user_ids)
+            .values("id", "user_id", *SUMMARY_SOURCE_FIELDS)
+            .order_by()[:batch_size]
+        )
+
+        ids_by_status = {}
+        deltas = {}
+        for row in rows:
+            previous = {field: row[field] for field in SUMMARY_SOURCE_FIELDS}
+            current = {**previous, "status": target_status(previous)}
+
+            ids_by_status.setdefault(current["status"], []).append(row["id"])
+            UserFinancialSummary.change_delta(
+                previous, current, deltas.setdefault(row["user_id"], {})
+            )
+
+        for status, ids in ids_by_status.items():
+            Invoice.objects.filter(pk__in=ids).update(
+                status=status, updated_at=timezone.now()
+            )
+
+        for user_id, delta in deltas.items():
+            bump_analytics_version_on_commit(user_id)
+            UserFinancialSummary.apply_delta(user_id, delta)
+
+    return len(rows)
+
+
+def _sweep(candidates, target_status, batch_size):
+    moved = 0
+    while True:
+        count = _sweep_batch(candidates, target_status, batch_size)
+        if not count:
+            return moved
+
+        moved += count
+
+
+def _reopened_status(state):
+    if state["amount_paid"] > 0:
+        return Invoice.InvoiceStatus.PARTIALLY_PAID
+
+    return Invoice.InvoiceStatus.UNPAID
+
+
+def sweep_overdue_invoices(today=None, batch_size=500):
+    """
+    Mark UNPAID and PARTIALLY_PAID invoices past their due date OVERDUE, and
+    reopen OVERDUE invoices whose due date moved back or was cleared. Both
+    directions read through the (status, due_date) index and use plain bulk
+    UPDATEs in bounded batches, so Invoice.save and its signals never run;
+    summaries and analytics versions are updated here instead. Returns
+    (marked, reopened).
+    """
+    today = today or timezone.localdate()
+
+    past_due = Invoice.objects.filter(
+        status__in=[
+            Invoice.InvoiceStatus.UNPAID,
+            Invoice.InvoiceStatus.PARTIALLY_PAID,
+        ],
+        due_date__lt=today,
+    )
+    no_longer_due = Invoice.objects.filter(
+        Q(due_date__gte=today) | Q(due_date__isnull=True),
+        status=Invoice.InvoiceStatus.OVERDUE,
+    )
+
+    marked = _sweep(past_due, lambda state: Invoice.InvoiceStatus.OVERDUE, batch_size)
+    reopened = _sweep(no_longer_due, _reopened_status, batch_size)
+
+    return marked, reopened
@@ -1,15 +1,61 @@
-from django.db.models import F
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
-from .models import Invoice
+from users.credits import add_credits
+from users.models import CreditTransaction
+
+from .cache import bump_analytics_version_on_commit
+from .models import SUMMARY_SOURCE_FIELDS, Invoice, UserFinancialSummary
 
 
 @receiver(post_save, sender=Invoice)
 def deduct_credit_on_invoice_creation(sender, instance, created, **kwargs):
 
     if created:
-        if hasattr(instance.user, "profile"):
-            user_profile = instance.user.profile
-            user_profile.credit_points = F("credit_points") - 1
-            user_profile.save(update_fields=["credit_points"])
+        add_credits(instance.user_id, -1, CreditTransaction.Reason.INVOICE_CREATED)
+
+
+@receiver(post_save, sender=Invoice)
+@receiver(post_delete, sender=Invoice)
+def invalidate_invoice_analytics(sender, instance, **kwargs):
+    # Item and payment writes are covered by Invoice.update_financials.
+    bump_analytics_version_on_commit(instance.user_id)
+
+
+@receiver(pre_save, sender=Invoice)
+def remember_invoice_totals(sender, instance, update_fields=None, **kwargs):
+    if instance._state.adding:
+        return
+
+    if update_fields is not None and not set(update_fields) & set(
+        SUMMARY_SOURCE_FIELDS
+    ):
+        return
+
+    instance._summary_previous = (
+        Invoice.objects.filter(pk=instance.pk).values(*SUMMARY_SOURCE_FIELDS).first()
+    )
+
+
+@receiver(post_save, sender=Invoice)
+def update_summary_on_invoice_save(sender, instance, created, **kwargs):
+    if created:
+        UserFinancialSummary.apply_change(
+            instance.user_id, None, instance.summary_state()
+        )
+        return
+
+    if "_summary_previous" in instance.__dict__:
+        UserFinancialSummary.apply_change(
+            instance.user_id,
+            instance.__dict__.pop("_summary_previous"),
+            instance.summary_state(),
+        )
+
+
+@receiver(post_delete, sender=Invoice)
+def update_summary_on_invoice_delete(sender, instance, **kwargs):
+    # create=False keeps a cascading user delete from re-inserting the row.
+    UserFinancialSummary.apply_change(
+        instance.user_id, instance.summary_state(), None, create=False
+    )
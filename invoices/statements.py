@@ -0,0 +1,324 @@
+import csv
+import hashlib
+import re
+from collections import Counter, defaultdict
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+
+from .models import Invoice, PaymentRecord, UserFinancialSummary
+
+STATEMENT_FORMATS = ["csv", "ofx"]
+PAYMENT_METHOD = "Bank transfer"
+
+DATE_FORMATS = ["%Y-%m-%d", "%d/%m/%Y", "%Y%m%d"]
+
+OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+OFX_FIELDS = {
+    "DTPOSTED": "date",
+    "TRNAMT": "amount",
+    "FITID": "transaction_id",
+    "NAME": "name",
+    "MEMO": "memo",
+}
+
+TOKEN_SEPARATORS = re.compile(r"[\s,;:()]+")
+
+
+def detect_format(filename, default="csv"):
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    return extension if extension in STATEMENT_FORMATS else default
+
+
+def _read_csv(stream):
+    for line_number, row in enumerate(csv.DictReader(stream), start=2):
+        row = {key.strip().lower(): value for key, value in row.items() if key}
+        yield line_number, row
+
+
+def _read_ofx(stream):
+    """Yield each <STMTTRN> block of an SGML or XML OFX file as a row."""
+    current = None
+    for line_number, line in enumerate(stream, start=1):
+        for closing, tag, value in OFX_TAG.findall(line):
+            tag = tag.upper()
+
+            if tag == "STMTTRN":
+                if not closing:
+                    current, first_line = {}, line_number
+                elif current is not None:
+                    name, memo = current.pop("name", ""), current.pop("memo", "")
+                    # DTPOSTED is YYYYMMDD, optionally followed by a time.
+                    current["date"] = current.get("date", "")[:8]
+                    current["description"] = f"{name} {memo}".strip()
+
+                    yield first_line, current
+                    current = None
+
+            elif current is not None and not closing and tag in OFX_FIELDS:
+                current[OFX_FIELDS[tag]] = value.strip()
+
+
+def read_statement_lines(stream, file_format):
+    """
+    Yield (line_number, row) pairs from a bank statement text stream. CSV
+    files need date and amount columns and may have description and
+    transaction_id columns; OFX transactions map DTPOSTED, TRNAMT, FITID and
+    NAME/MEMO onto the same keys. A file that cannot be decoded or parsed
+    past some line yields one error row for it and stops there.
+    """
+    line_number = 0
+
+    try:
+        reader = _read_ofx(stream) if file_format == "ofx" else _read_csv(stream)
+        for line_number, row in reader:
+            yield line_number, row
+
+    except UnicodeDecodeError:
+        error = "The file must be UTF-8 encoded; the rest of it was not read."
+        yield line_number + 1, {"_error": error}
+
+    except csv.Error as e:
+        error = f"Malformed CSV ({e}); the rest of the file was not read."
+        yield line_number + 1, {"_error": error}
+
+
+def _parse_date(value):
+    value = (value or "").strip()
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value[:10], date_format).date()
+        except ValueError:
+            continue
+
+    raise ValueError(f"Invalid date: {value}")
+
+
+def _parse_amount(value):
+    try:
+        amount = Decimal((value or "").strip().replace(",", ""))
+        if not amount.is_finite():
+            raise InvalidOperation
+        return amount.quantize(Decimal("0.01"))
+    except InvalidOperation:
+        raise ValueError(f"Invalid amount: {value}")
+
+
+def _normalize_number(value):
+    return re.sub(r"[^0-9A-Z]", "", value.upper())
+
+
+def _line_fingerprint(payment_date, amount, description, occurrence):
+    """
+    A stable bank reference for a line without a transaction id, so the same
+    statement can still be imported again without paying anything twice.
+    The occurrence tells identical lines in one statement apart.
+    """
+    key = f"{payment_date.isoformat()}|{amount}|{description}|{occurrence}"
+    return f"line:{hashlib.sha256(key.encode()).hexdigest()}"
+
+
+def _normalize_name(value):
+    words = re.findall(r"[0-9a-z]+", (value or "").lower())
+    return f" {' '.join(words)} " if words else ""
+
+
+class OpenInvoiceIndex:
+    """
+    A user's open invoices, looked up by an invoice number mentioned in a
+    statement line or else by exact balance due plus client name. It is
+    built with one query per import and kept current as payments match.
+    """
+
+    def __init__(self, user_id):
+        self.balances = {}
+        self.numbers = {}
+        self.names = {}
+        self.by_number = {}
+        self.by_balance = defaultdict(set)
+
+        rows = Invoice.objects.filter(
+            user_id=user_id, status__in=Invoice.OPEN_STATUSES
+        ).values_list(
+            "id",
+            "invoice_number",
+            "total_amount",
+            "amount_paid",
+            "name",
+            "client__name",
+        )
+        for invoice_id, number, total_amount, amount_paid, name, client_name in rows:
+            balance = total_amount - amount_paid
+            if balance <= 0:
+                continue
+
+            self.balances[invoice_id] = balance
+            self.numbers[invoice_id] = number
+            self.names[invoice_id] = {
+                normalized
+                for normalized in (_normalize_name(name), _normalize_name(client_name))
+                if normalized
+            }
+            self.by_number[_normalize_number(number)] = invoice_id
+            self.by_balance[balance].add(invoice_id)
+
+    def match(self, description, amount):
+        """Return (invoice_id, None) or (None, the reason nothing matched)."""
+        tokens = {
+            _normalize_number(token) for token in TOKEN_SEPARATORS.split(description)
+        }
+        referenced = {
+            self.by_number[token] for token in tokens if token in self.by_number
+        }
+
+        if len(referenced) > 1:
+            return None, "References more than one open invoice."
+
+        if referenced:
+            invoice_id = referenced.pop()
+            if amount > self.balances[invoice_id]:
+                return None, (
+                    f"Amount exceeds the balance due on {self.numbers[invoice_id]}."
+                )
+            return invoice_id, None
+
+        name = _normalize_name(description)
+        candidates = [
+            invoice_id
+            for invoice_id in self.by_balance.get(amount, ())
+            if any(client_name in name for client_name in self.names[invoice_id])
+        ]
+
+        if len(candidates) > 1:
+            return None, "Matches more than one open invoice."
+
+        if candidates:
+            return candidates[0], None
+
+        return None, "No open invoice matches."
+
+    def apply(self, invoice_id, amount):
+        balance = self.balances[invoice_id]
+        self.by_balance[balance].discard(invoice_id)
+
+        balance -= amount
+        self.balances[invoice_id] = balance
+        if balance > 0:
+            self.by_balance[balance].add(invoice_id)
+
+
+def _reconcile_batch(user_id, rows, index, seen_ids, occurrences, report):
+    lines = []
+    for line_number, row in rows:
+        if "_error" in row:
+            report["errors"].append({"line": line_number, "error": row["_error"]})
+            continue
+
+        try:
+            payment_date = _parse_date(row.get("date"))
+            amount = _parse_amount(row.get("amount"))
+        except ValueError as e:
+            report["errors"].append({"line": line_number, "error": str(e)})
+            continue
+
+        # Debits and zero lines are not payments from clients.
+        if amount <= 0:
+            report["ignored"] += 1
+            continue
+
+        description = (row.get("description") or "").strip()
+        reference = (row.get("transaction_id") or "").strip()[:100]
+        if not reference:
+            key = (payment_date, amount, description)
+            occurrences[key] += 1
+            reference = _line_fingerprint(*key, occurrences[key])
+
+        lines.append((line_number, payment_date, amount, description, reference))
+
+    imported = set(
+        PaymentRecord.objects.filter(
+            invoice__user_id=user_id,
+            bank_reference__in={line[4] for line in lines},
+        ).values_list("bank_reference", flat=True)
+    )
+
+    payments = []
+    for line_number, payment_date, amount, description, reference in lines:
+        if reference in imported or reference in seen_ids:
+            report["duplicates"] += 1
+            continue
+
+        invoice_id, reason = index.match(description, amount)
+        if invoice_id is None:
+            report["unmatched"].append(
+                {
+                    "line": line_number,
+                    "date": payment_date.isoformat(),
+                    "amount": str(amount),
+                    "description": description,
+                    "reason": reason,
+                }
+            )
+            continue
+
+        index.apply(invoice_id, amount)
+        seen_ids.add(reference)
+
+        payments.append(
+            PaymentRecord(
+                invoice_id=invoice_id,
+                amount=amount,
+                payment_date=payment_date,
+                payment_method=PAYMENT_METHOD,
+                note=description[:255],
+                bank_reference=reference,
+            )
+        )
+
+    if not payments:
+        return
+
+    with transaction.atomic():
+        # Same lock order as update_financials: the summary row first.
+        UserFinancialSummary.lock(user_id)
+        PaymentRecord.objects.bulk_create(payments)
+        Invoice.recompute_financials(
+            user_id, {payment.invoice_id for payment in payments}
+        )
+
+    report["matched"] += len(payments)
+
+
+def reconcile_statement(user_id, rows, batch_size=5000):
+    """
+    Apply a bank statement's credits to a user's open invoices. Lines are
+    matched in memory against an OpenInvoiceIndex; each batch of matches is
+    bulk inserted as payments and every touched invoice recomputed once.
+    Lines already imported, by transaction id or else by a fingerprint of
+    their date, amount and description, are skipped, and lines that match
+    nothing are returned with the reason.
+    """
+    index = OpenInvoiceIndex(user_id)
+    report = {
+        "matched": 0,
+        "duplicates": 0,
+        "ignored": 0,
+        "unmatched": [],
+        "errors": [],
+    }
+    seen_ids = set()
+    occurrences = Counter()
+
+    batch = []
+    for line_number, row in rows:
+        batch.append((line_number, row))
+
+        if len(batch) >= batch_size:
+            _reconcile_batch(user_id, batch, index, seen_ids, occurrences, report)
+            batch = []
+
+    if batch:
+        _reconcile_batch(user_id, batch, index, seen_ids, occurrences, report)
+
+    return report
@@ -1,3 +1,1158 @@
-from django.test import TestCase
+import json
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.template.loader import render_to_string
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from catalog.models import Product
+from clients.models import Client
+from users.models import User, UserBusinessProfile
+
+from . import pdf
+from .cache import bump_analytics_version, get_analytics_version
+from .financials import deferred_financials
+from .models import (
+    Invoice,
+    InvoiceItem,
+    InvoiceNumberSequence,
+    PaymentRecord,
+    RecurringInvoice,
+    RecurringInvoiceItem,
+    UserFinancialSummary,
+)
+from .recurring import generate_recurring_invoices
+from .services import (
+    compute_financial_summaries,
+    find_drifted_financial_summaries,
+    sweep_overdue_invoices,
+)
+from .statements import read_statement_lines, reconcile_statement
+
+
+class InvoiceNumberSequenceTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="owner@example.com", username="owner", password="password"
+        )
+
+    def test_numbers_are_sequential_per_user(self):
+        other = User.objects.create_user(
+            email="other@example.com", username="other", password="password"
+        )
+
+        first = Invoice.objects.create(user=self.user, name="Acme")
+        second = Invoice.objects.create(user=self.user, name="Acme")
+        third = Invoice.objects.create(user=other, name="Acme")
+
+        self.assertEqual(first.invoice_number, "INV-0001")
+        self.assertEqual(second.invoice_number, "INV-0002")
+        self.assertEqual(third.invoice_number, "INV-0001")
+
+    def test_numbering_does_not_scan_invoices(self):
+        Invoice.objects.create(user=self.user, name="Acme")
+
+        with CaptureQueriesContext(connection) as context:
+            invoice = Invoice.objects.create(user=self.user, name="Acme")
+
+        self.assertEqual(invoice.invoice_number, "INV-0002")
+        self.assertFalse(
+            any(
+                query["sql"].startswith('SELECT "invoices_invoice".')
+                for query in context.captured_queries
+            )
+        )
+
+    def test_reserve_block(self):
+        numbers = InvoiceNumberSequence.reserve(self.user.id, count=3)
+        invoice = Invoice.objects.create(user=self.user, name="Acme")
+
+        self.assertEqual(numbers, ["INV-0001", "INV-0002", "INV-0003"])
+        self.assertEqual(invoice.invoice_number, "INV-0004")
+
+    @override_settings(INVOICE_NUMBER_PREFIX="ACME/", INVOICE_NUMBER_PADDING=6)
+    def test_prefix_and_padding(self):
+        self.assertEqual(InvoiceNumberSequence.reserve(self.user.id), ["ACME/000001"])
+
+        InvoiceNumberSequence.objects.filter(user=self.user).update(
+            prefix="2026-", padding=2
+        )
+        self.assertEqual(InvoiceNumberSequence.reserve(self.user.id), ["2026-02"])
+
+
+class ConcurrencyTestCase(TransactionTestCase):
+    workers = 8
+
+    def setUp(self):
+        if connection.vendor == "sqlite" and connection.is_in_memory_db():
+            self.skipTest("Threads cannot write to in-memory SQLite concurrently.")
+
+    def run_in_parallel(self, task):
+        def run(index):
+            try:
+                return task(index)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return list(executor.map(run, range(self.workers)))
+
+
+class InvoiceNumberConcurrencyTests(ConcurrencyTestCase):
+    invoices_per_worker = 5
+
+    def test_parallel_creates_get_unique_numbers(self):
+        user = User.objects.create_user(
+            email="owner@example.com", username="owner", password="password"
+        )
+
+        def create_invoices(_):
+            return [
+                Invoice.objects.create(user=user, name="Acme").invoice_number
+                for _ in range(self.invoices_per_worker)
+            ]
+
+        results = self.run_in_parallel(create_invoices)
+
+        numbers = [number for result in results for number in result]
+        expected = self.workers * self.invoices_per_worker
+
+        self.assertEqual(len(set(numbers)), expected)
+        self.assertEqual(
+            sorted(numbers), [f"INV-{number:04d}" for number in range(1, expected + 1)]
+        )
+
+
+class PaymentConcurrencyTests(ConcurrencyTestCase):
+    def test_parallel_payments_are_all_counted(self):
+        user = User.objects.create_user(
+            email="owner@example.com", username="owner", password="password"
+        )
+        invoice = Invoice.objects.create(user=user, name="Acme")
+        InvoiceItem.objects.create(invoice=invoice, title="Hours", unit_price=1000)
+
+        def pay(_):
+            PaymentRecord.objects.create(
+                invoice=Invoice.objects.get(pk=invoice.pk),
+                amount=10,
+                payment_date=date.today(),
+            )
+
+        self.run_in_parallel(pay)
+
+        invoice.refresh_from_db()
+        self.assertEqual(invoice.amount_paid, Decimal(10 * self.workers))
+        self.assertEqual(invoice.status, Invoice.InvoiceStatus.PARTIALLY_PAID)
+
+
+class InvoiceFinancialsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="owner@example.com", username="owner", password="password"
+        )
+        self.invoice = Invoice.objects.create(user=self.user, name="Acme")
+        self.product = Product.objects.create(
+            user=self.user, title="Design", unit_price=Decimal("50.00")
+        )
+
+    def recompute_spy(self):
+        return mock.patch.object(
+            Invoice,
+            "update_financials",
+            autospec=True,
+            side_effect=Invoice.update_financials,
+        )
+
+    def test_deferred_block_recomputes_once(self):
+        with self.recompute_spy() as recompute:
+            with deferred_financials():
+                for _ in range(5):
+                    InvoiceItem.objects.create(
+                        invoice=self.invoice, title="Hours", unit_price=10
+                    )
+                PaymentRecord.objects.create(
+                    invoice=self.invoice, amount=20, payment_date=date.today()
+                )
+
+        self.assertEqual(recompute.call_count, 1)
+
+        self.invoice.refresh_from_db()
+        self.assertEqual(self.invoice.subtotal, Decimal("50.00"))
+        self.assertEqual(self.invoice.amount_paid, Decimal("20.00"))
+        self.assertEqual(self.invoice.status, Invoice.InvoiceStatus.PARTIALLY_PAID)
+
+    def test_recompute_runs_one_update(self):
+        InvoiceItem.objects.create(invoice=self.invoice, title="Hours", unit_price=100)
+        self.invoice.discount = Decimal("10.00")
+        self.invoice.save(update_fields=["discount"])
+        payment = PaymentRecord.objects.create(
+            invoice=self.invoice, amount=90, payment_date=date.today()
+        )
+
+        self.assertEqual(self.invoice.total_amount, Decimal("90.00"))
+        self.assertEqual(self.invoice.status, Invoice.InvoiceStatus.PAID)
+
+        with CaptureQueriesContext(connection) as context:
+            self.invoice.update_financials()
+
+        updates = [
+            query
+            for query in context.captured_queries
+            if query["sql"].startswith('UPDATE "invoices_invoice" ')
+        ]
+        self.assertEqual(len(updates), 1)
+        self.assertFalse(
+            any(
+                query["sql"].startswith('SELECT SUM("invoices_')
+                for query in context.captured_queries
+            )
+        )
+
+        payment.delete()
+        self.assertEqual(self.invoice.amount_paid, Decimal("0.00"))
+        self.assertEqual(self.invoice.status, Invoice.InvoiceStatus.UNPAID)
+
+    def test_bulk_item_endpoint(self):
+        api = APIClient()
+        api.force_authenticate(self.user)
+        items = [
+            {"product": self.product.id, "quantity": "2"},
+            *({"title": "Hours", "unit_price": "10.00"} for _ in range(29)),
+        ]
+
+        with self.recompute_spy() as recompute:
+            response = api.post(
+                f"/api/invoices/{self.invoice.id}/items/bulk/",
+                {"items": items},
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(recompute.call_count, 1)
+        self.assertEqual(len(response.data["items"]), 30)
+        self.assertEqual(response.data["items"][0]["title"], "Design")
+        self.assertEqual(response.data["subtotal"], Decimal("390.00"))
+
+    def test_bulk_item_endpoint_rejects_foreign_products(self):
+        other = User.objects.create_user(
+            email="other@example.com", username="other", password="password"
+        )
+        product = Product.objects.create(user=other, title="Theirs", unit_price=1)
+        api = APIClient()
+        api.force_authenticate(self.user)
+
+        response = api.post(
+            f"/api/invoices/{self.invoice.id}/items/bulk/",
+            {"items": [{"product": product.id}]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(self.invoice.items.exists())
+
+
+class ImmediateExecutor:
+    """Runs submitted renders inline, in place of the PDF worker pool."""
+
+    def __init__(self):
+        self.submitted = 0
+
+    def submit(self, fn, *args):
+        self.submitted += 1
+        fn(*args)
+
+
+class InvoicePdfTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        storage = override_settings(
+            STORAGES={
+                **settings.STORAGES,
+                "default": {"BACKEND": "django.core.files.storage.InMemoryStorage"},
+            }
+        )
+        storage.enable()
+        self.addCleanup(storage.disable)
+
+        self.user = User.objects.create_user(
+            email="owner@example.com", username="owner", password="password"
+        )
+        UserBusinessProfile.objects.create(
+            user=self.user, business_name="Owner Studio", phone_number="1"
+        )
+        self.invoice = Invoice.objects.create(user=self.user, name="Acme")
+        InvoiceItem.objects.create(invoice=self.invoice, title="Hours", unit_price=10)
+        # Loaded the way the view loads it, so both hash the same amounts.
+        self.invoice.refresh_from_db()
+        self.url = f"/api/invoices/{self.invoice.id}/pdf/"
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+        self.executor = ImmediateExecutor()
+        self.rendered = []
+        patches = [
+            mock.patch.object(pdf, "_get_executor", return_value=self.executor),
+            mock.patch.object(pdf, "render_invoice_pdf", side_effect=self.render),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def render(self, inputs):
+        self.rendered.append(render_to_string(pdf.PDF_TEMPLATE, inputs))
+        return b"%PDF-stub"
+
+    def test_first_request_queues_the_render(self):
+        response = self.api.get(self.url)
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response["Retry-After"], "2")
+        self.assertEqual(self.executor.submitted, 1)
+        self.assertIn("Owner Studio", self.rendered[0])
+        self.assertIn("Hours", self.rendered[0])
+
+    def test_rendered_pdf_is_served_from_storage(self):
+        self.api.get(self.url)
+
+        response = self.api.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertIn(self.invoice.invoice_number, response["Content-Disposition"])
+        self.assertEqual(b"".join(response.streaming_content), b"%PDF-stub")
+        self.assertEqual(len(self.rendered), 1)
+
+    def test_changed_invoice_renders_a_new_pdf(self):
+        self.api.get(self.url)
+        first_path, _ = pdf.get_invoice_pdf(self.invoice)
+
+        InvoiceItem.objects.create(invoice=self.invoice, title="Travel", unit_price=5)
+        self.invoice.refresh_from_db()
+
+        self.assertEqual(self.api.get(self.url).status_code, 202)
+        second_path, ready = pdf.get_invoice_pdf(self.invoice)
+        self.assertNotEqual(first_path, second_path)
+        self.assertTrue(ready)
+        self.assertEqual(len(self.rendered), 2)
+
+    def test_render_in_progress_is_queued_once(self):
+        path = pdf.get_pdf_path(pdf.get_pdf_inputs(self.invoice))
+        cache.add(pdf._render_lock_key(path), True)
+
+        self.assertEqual(pdf.get_invoice_pdf(self.invoice), (path, False))
+        self.assertEqual(self.executor.submitted, 0)
+
+    def test_failed_render_releases_the_lock(self):
+        with mock.patch.object(pdf, "render_invoice_pdf", side_effect=OSError):
+            with self.assertLogs("invoices.pdf", level="ERROR"):
+                path, ready = pdf.get_invoice_pdf(self.invoice)
+
+        self.assertFalse(ready)
+        self.assertFalse(default_storage.exists(path))
+        self.assertIsNone(cache.get(pdf._render_lock_key(path)))
+
+        self.assertEqual(self.api.get(self.url).status_code, 202)
+        self.assertTrue(default_storage.exists(path))
+
+    def test_other_users_invoice_is_not_found(self):
+        other = User.objects.create_user(email="other@example.com", username="other")
+        self.api.force_authenticate(other)
+
+        self.assertEqual(self.api.get(self.url).status_code, 404)
+        self.assertEqual(self.executor.submitted, 0)
+
+
+class InvoiceApiTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="owner@example.com", username="owner", password="password"
+        )
+        self.client_record = Client.objects.create(
+            user=self.user, name="Acme", phone="9746469319"
+        )
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def seed_invoices(self, count, **kwargs):
+        invoices = []
+        for index in range(count):
+            invoice = Invoice.objects.create(
+                user=self.user, client=self.client_record, **kwargs
+            )
+            with deferred_financials():
+                for _ in range(3):
+                    InvoiceItem.objects.create(
+                        invoice=invoice, title="Hours", unit_price=10
+                    )
+                PaymentRecord.objects.create(
+                    invoice=invoice, amount=5, payment_date=date.today()
+                )
+            invoices.append(invoice)
+
+        return invoices
+
+    def test_list_query_count_is_constant(self):
+        counts = []
+        for size in (1, 5, 20):
+            self.seed_invoices(size)
+            with CaptureQueriesContext(connection) as context:
+                response = self.api.get("/api/invoices/")
+
+            self.assertEqual(response.status_code, 200)
+            counts.append(len(context.captured_queries))
+
+        self.assertEqual(counts, [1, 1, 1])
+
+    def test_detail_query_count_is_constant(self):
+        invoice = self.seed_invoices(1)[0]
+        with deferred_financials():
+            for _ in range(20):
+                InvoiceItem.objects.create(invoice=invoice, title="Hours", unit_price=1)
+
+        with self.assertNumQueries(3):
+            response = self.api.get(f"/api/invoices/{invoice.id}/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["client"]["name"], "Acme")
+        self.assertEqual(len(response.data["items"]), 23)
+        self.assertEqual(len(response.data["payments"]), 1)
+
+    def test_list_filters(self):
+        other_client = Client.objects.create(
+            user=self.user, name="Other", phone="9746469318"
+        )
+        january = self.seed_invoices(1, issue_date=date(2026, 1, 10))[0]
+        march = self.seed_invoices(1, issue_date=date(2026, 3, 10))[0]
+        draft = Invoice.objects.create(user=self.user, client=other_client)
+
+        def ids(query):
+            response = self.api.get(f"/api/invoices/?{query}")
+            self.assertEqual(response.status_code, 200)
+            return [invoice["id"] for invoice in response.data["results"]]
+
+        self.assertEqual(ids("status=DRAFT"), [draft.id])
+        self.assertEqual(ids(f"client={other_client.id}"), [draft.id])
+        self.assertEqual(ids("issued_from=2026-02-01"), [march.id])
+        self.assertEqual(
+            ids("issued_from=2026-01-01&issued_to=2026-01-31"), [january.id]
+        )
+
+        response = self.api.get("/api/invoices/?status=LOST")
+        self.assertEqual(response.status_code, 400)
+
+    def test_other_users_invoices_are_hidden(self):
+        other = User.objects.create_user(
+            email="other@example.com", username="other", password="password"
+        )
+        invoice = Invoice.objects.create(user=other, name="Theirs")
+
+        response = self.api.get(f"/api/invoices/{invoice.id}/")
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.api.get("/api/invoices/").data["results"], [])
+
+    def export(self, query=""):
+        response = self.api.get(f"/api/invoices/export/?{query}")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+
+        return b"".join(response.streaming_content).decode().splitlines()
+
+    def test_export_csv_with_filters(self):
+        january = self.seed_invoices(1, issue_date=date(2026, 1, 10))[0]
+        self.seed_invoices(1, issue_date=date(2026, 3, 10))
+        january.refresh_from_db()
+
+        lines = self.export("issued_to=2026-01-31")
+
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].startswith("id,invoice_number,status,"))
+        self.assertIn(f"{january.id},{january.invoice_number},PARTIALLY_PAID", lines[1])
+        self.assertIn(",30.00,0.00,30.00,5.00", lines[1])
+
+    def test_export_items_as_jsonl(self):
+        invoices = self.seed_invoices(2)
+
+        lines = self.export("output=jsonl&rows=items")
+
+        self.assertEqual(len(lines), 6)
+        row = json.loads(lines[0])
+        self.assertEqual(row["invoice_id"], invoices[0].id)
+        self.assertEqual(row["invoice_number"], invoices[0].invoice_number)
+        self.assertEqual(row["unit_price"], "10.00")
+
+        response = self.api.get("/api/invoices/export/?output=xlsx")
+        self.assertEqual(response.status_code, 400)
+
+
+class InvoiceAnalyticsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="owner@example.com", username="owner", password="password"
+        )
+        self.client_record = Client.objects.create(
+            user=self.user, name="Acme", phone="9746469319"
+        )
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def create_invoice(self, days_overdue, amount):
+        today = date.today()
+        with self.captureOnCommitCallbacks(execute=True):
+            invoice = Invoice.objects.create(
+                user=self.user,
+                client=self.client_record,
+                status=Invoice.InvoiceStatus.UNPAID,
+                issue_date=today,
+                due_date=today - timedelta(days=days_overdue),
+            )
+            InvoiceItem.objects.create(invoice=invoice, title="Work", unit_price=amount)
+        return invoice
+
+    def test_aging_buckets_and_invalidation(self):
+        self.create_invoice(-5, 100)
+        self.create_invoice(10, 200)
+        overdue = self.create_invoice(120, 400)
+        Invoice.objects.create(user=self.user, name="Draft")
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.api.get("/api/invoices/analytics/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(context.captured_queries), 3)
+        self.assertEqual(
+            response.data["aging"],
+            [
+                {
+                    "currency": "INR",
+                    "total": "700.00",
+                    "current": "100.00",
+                    "days_1_30": "200.00",
+                    "days_31_60": "0.00",
+                    "days_61_90": "0.00",
+                    "days_over_90": "400.00",
+                }
+            ],
+        )
+        self.assertEqual(response.data["top_clients"][0]["billed"], "700.00")
+        self.assertEqual(response.data["monthly_revenue"][0]["invoices"], 3)
+
+        with self.assertNumQueries(0):
+            self.api.get("/api/invoices/analytics/")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            PaymentRecord.objects.create(
+                invoice=overdue, amount=400, payment_date=date.today()
+            )
+
+        response = self.api.get("/api/invoices/analytics/")
+        self.assertEqual(response.data["aging"][0]["days_over_90"], "0.00")
+
+    def test_version_is_seeded_once_and_bumped(self):
+        version = get_analytics_version(self.user.id)
+
+        with mock.patch.object(cache, "add", wraps=cache.add) as add:
+            self.assertEqual(get_analytics_version(self.user.id), version)
+        add.assert_not_called()
+
+        bump_analytics_version(self.user.id)
+        self.assertEqual(get_analytics_version(self.user.id), version + 1)
+
+        # An evicted counter is seeded again, past every earlier version.
+        cache.delete(f"invoice_analytics_version_{self.user.id}")
+        self.assertGreater(get_analytics_version(self.user.id), version + 1)
+
+
+class UserFinancialSummaryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="owner@example.com", username="owner", password="password"
+        )
+
+    def assertSummaryMatchesInvoices(self):
+        self.assertEqual(find_drifted_financial_summaries([self.user.id]), [])
+
+    def test_summary_follows_invoice_lifecycle(self):
+        invoice = Invoice.objects.create(user=self.user, name="Acme")
+        InvoiceItem.objects.create(invoice=invoice, title="Work", unit_price=100)
+        self.assertSummaryMatchesInvoices()
+
+        invoice.status = Invoice.InvoiceStatus.UNPAID
+        invoice.save()
+        payment = PaymentRecord.objects.create(
+            invoice=invoice, amount=40, payment_date=date.today()
+        )
+        self.assertSummaryMatchesInvoices()
+
+        summary = UserFinancialSummary.objects.get(user=self.user)
+        self.assertEqual(summary.total_billed, Decimal("100.00"))
+        self.assertEqual(summary.outstanding, Decimal("60.00"))
+        self.assertEqual(summary.partially_paid_count, 1)
+
+        payment.delete()
+        invoice.delete()
+        self.assertSummaryMatchesInvoices()
+
+        summary.refresh_from_db()
+        self.assertEqual(summary.total_billed, Decimal("0.00"))
+        self.assertEqual(summary.unpaid_count, 0)
+
+    def test_summary_endpoint(self):
+        invoice = Invoice.objects.create(user=self.user, name="Acme")
+        InvoiceItem.objects.create(invoice=invoice, title="Work", unit_price=100)
+        api = APIClient()
+        api.force_authenticate(self.user)
+
+        with self.assertNumQueries(1):
+            response = api.get("/api/invoices/summary/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["draft_count"], 1)
+
+    def test_reconcile_repairs_drift(self):
+        invoice = Invoice.objects.create(user=self.user, name="Acme")
+        InvoiceItem.objects.create(invoice=invoice, title="Work", unit_price=100)
+        Invoice.objects.filter(pk=invoice.pk).update(status="PAID", amount_paid=100)
+
+        with self.assertRaises(CommandError):
+            call_command("reconcile_financial_summaries", "--verify", stdout=StringIO())
+
+        call_command("reconcile_financial_summaries", stdout=StringIO())
+
+        self.assertSummaryMatchesInvoices()
+        expected = compute_financial_summaries([self.user.id])[self.user.id]
+        self.assertEqual(expected.paid_count, 1)
+
+
+class OverdueSweepTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="owner@example.com", username="owner", password="password"
+        )
+        self.today = date.today()
+
+    def create_invoice(self, due_date, paid=0, status=Invoice.InvoiceStatus.UNPAID):
+        invoice = Invoice.objects.create(
+            user=self.user, name="Acme", status=status, due_date=due_date
+        )
+        InvoiceItem.objects.create(invoice=invoice, title="Work", unit_price=100)
+        if paid:
+            PaymentRecord.objects.create(
+                invoice=invoice, amount=paid, payment_date=self.today
+            )
+
+        # Start from the pre-sweep state, as if the due date passed overnight.
+        Invoice.objects.filter(pk=invoice.pk).update(
+            status=Invoice.InvoiceStatus.PARTIALLY_PAID if paid else status
+        )
+        call_command("reconcile_financial_summaries", stdout=StringIO())
+        return invoice
+
+    def statuses(self):
+        return dict(Invoice.objects.values_list("id", "status"))
+
+    def test_sweep_marks_and_reopens_in_batches(self):
+        yesterday = self.today - timedelta(days=1)
+        late = [self.create_invoice(yesterday) for _ in range(3)]
+        late_partial = self.create_invoice(yesterday, paid=40)
+        on_time = self.create_invoice(self.today)
+        draft = self.create_invoice(yesterday, status=Invoice.InvoiceStatus.DRAFT)
+
+        with mock.patch("invoices.services.bump_analytics_version_on_commit") as bump:
+            marked, reopened = sweep_overdue_invoices(batch_size=2)
+
+        self.assertEqual((marked, reopened), (4, 0))
+        self.assertTrue(bump.called)
+        statuses = self.statuses()
+        for invoice in [*late, late_partial]:
+            self.assertEqual(statuses[invoice.id], Invoice.InvoiceStatus.OVERDUE)
+        self.assertEqual(statuses[on_time.id], Invoice.InvoiceStatus.UNPAID)
+        self.assertEqual(statuses[draft.id], Invoice.InvoiceStatus.DRAFT)
+
+        summary = UserFinancialSummary.objects.get(user=self.user)
+        self.assertEqual(summary.overdue_count, 4)
+        self.assertEqual(summary.outstanding, Decimal("460.00"))
+        self.assertEqual(find_drifted_financial_summaries([self.user.id]), [])
+
+        Invoice.objects.filter(pk=late_partial.pk).update(due_date=None)
+        self.assertEqual(sweep_overdue_invoices(), (0, 1))
+        self.assertEqual(
+            self.statuses()[late_partial.id], Invoice.InvoiceStatus.PARTIALLY_PAID
+        )
+        self.assertEqual(find_drifted_financial_summaries([self.user.id]), [])
+
+    def test_recompute_keeps_overdue_until_paid(self):
+        invoice = self.create_invoice(self.today - timedelta(days=1))
+        sweep_overdue_invoices()
+
+        PaymentRecord.objects.create(
+            invoice=invoice, amount=40, payment_date=self.today
+        )
+        invoice.refresh_from_db()
+        self.assertEqual(invoice.status, Invoice.InvoiceStatus.OVERDUE)
+
+        PaymentRecord.objects.create(
+            invoice=invoice, amount=60, payment_date=self.today
+        )
+        invoice.refresh_from_db()
+        self.assertEqual(invoice.status, Invoice.InvoiceStatus.PAID)
+        self.assertEqual(find_drifted_financial_summaries([self.user.id]), [])
+
+    def test_sweep_uses_status_due_date_index(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("Reads SQLite's query plan.")
+
+        plan = Invoice.objects.filter(
+            status__in=[
+                Invoice.InvoiceStatus.UNPAID,
+                Invoice.InvoiceStatus.PARTIALLY_PAID,
+            ],
+            due_date__lt=self.today,
+        ).explain()
+
+        self.assertIn("invoice_status_due_idx", plan)
+
+
+class RecurringInvoiceTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="owner@example.com", username="owner", password="password"
+        )
+        self.client_record = Client.objects.create(
+            user=self.user, name="Acme", email="billing@acme.test", phone="9746469319"
+        )
+        self.today = date(2026, 3, 31)
+
+    def create_template(self, **kwargs):
+        template = RecurringInvoice.objects.create(
+            user=self.user,
+            client=self.client_record,
+            start_date=date(2026, 1, 31),
+            discount=Decimal("5.00"),
+            **kwargs,
+        )
+        RecurringInvoiceItem.objects.create(
+            recurring_invoice=template, title="Retainer", unit_price=100
+        )
+        RecurringInvoiceItem.objects.create(
+            recurring_invoice=template, title="Hours", quantity=2, unit_price=25
+        )
+        return template
+
+    def test_monthly_cadence_clamps_to_month_end(self):
+        template = self.create_template()
+
+        self.assertEqual(template.run_date_after(date(2026, 1, 31)), date(2026, 2, 28))
+        self.assertEqual(template.run_date_after(date(2026, 2, 28)), date(2026, 3, 31))
+
+    def test_generates_missed_runs_once(self):
+        template = self.create_template()
+        Invoice.objects.create(user=self.user, name="Manual")
+
+        created = generate_recurring_invoices(today=self.today, batch_size=1)
+
+        self.assertEqual(created, 3)
+        invoices = list(
+            Invoice.objects.filter(recurring_invoice=template).order_by("issue_date")
+        )
+        self.assertEqual(
+            [invoice.issue_date for invoice in invoices],
+            [date(2026, 1, 31), date(2026, 2, 28), date(2026, 3, 31)],
+        )
+        self.assertEqual(
+            [invoice.invoice_number for invoice in invoices],
+            ["INV-0002", "INV-0003", "INV-0004"],
+        )
+
+        latest = invoices[-1]
+        self.assertEqual(latest.name, "Acme")
+        self.assertEqual(latest.email, "billing@acme.test")
+        self.assertEqual(latest.due_date, date(2026, 4, 15))
+        self.assertEqual(latest.status, Invoice.InvoiceStatus.UNPAID)
+        self.assertEqual(latest.items.count(), 2)
+        self.assertEqual(latest.subtotal, Decimal("150.00"))
+        self.assertEqual(latest.total_amount, Decimal("145.00"))
+        self.assertEqual(invoices[0].status, Invoice.InvoiceStatus.OVERDUE)
+        self.assertEqual(find_drifted_financial_summaries([self.user.id]), [])
+
+        template.refresh_from_db()
+        self.assertEqual(template.next_run_date, date(2026, 4, 30))
+        self.assertEqual(generate_recurring_invoices(today=self.today), 0)
+
+    def test_rerun_skips_existing_invoices(self):
+        template = self.create_template(cadence=RecurringInvoice.Cadence.QUARTERLY)
+        generate_recurring_invoices(today=date(2026, 1, 31))
+
+        RecurringInvoice.objects.filter(pk=template.pk).update(
+            next_run_date=date(2026, 1, 31)
+        )
+        self.assertEqual(generate_recurring_invoices(today=self.today), 0)
+
+        template.refresh_from_db()
+        self.assertEqual(template.next_run_date, date(2026, 4, 30))
+
+    def test_end_date_deactivates_template(self):
+        template = self.create_template(
+            cadence=RecurringInvoice.Cadence.WEEKLY, end_date=date(2026, 2, 10)
+        )
+
+        self.assertEqual(generate_recurring_invoices(today=self.today), 2)
+
+        template.refresh_from_db()
+        self.assertFalse(template.is_active)
+
+    def test_batch_query_count_does_not_grow_with_templates(self):
+        # Creates the user's number sequence and summary rows up front.
+        Invoice.objects.create(user=self.user, name="Manual")
+
+        counts = []
+        for size in (1, 10):
+            RecurringInvoice.objects.all().delete()
+            for _ in range(size):
+                self.create_template()
+
+            with CaptureQueriesContext(connection) as context:
+                created = generate_recurring_invoices(today=date(2026, 1, 31))
+
+            self.assertEqual(created, size)
+            counts.append(len(context.captured_queries))
+
+        self.assertEqual(counts[0], counts[1])
+
+
+class BankStatementTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="owner@example.com", username="owner", password="password"
+        )
+        self.acme = Client.objects.create(
+            user=self.user, name="Acme Corp", phone="9746469319"
+        )
+        self.globex = Client.objects.create(
+            user=self.user, name="Globex", phone="9746469318"
+        )
+        self.first = self.create_invoice(self.acme, 100)
+        self.second = self.create_invoice(self.acme, 250)
+        self.third = self.create_invoice(self.globex, 250)
+
+    def create_invoice(self, client, amount):
+        invoice = Invoice.objects.create(
+            user=self.user, client=client, status=Invoice.InvoiceStatus.UNPAID
+        )
+        InvoiceItem.objects.create(invoice=invoice, title="Work", unit_price=amount)
+        invoice.refresh_from_db()
+        return invoice
+
+    def reconcile(self, content, file_format="csv"):
+        return reconcile_statement(
+            self.user.id, read_statement_lines(StringIO(content), file_format)
+        )
+
+    def test_csv_lines_match_by_reference_or_amount_and_name(self):
+        statement = (
+            "Date,Amount,Description,Transaction_ID\n"
+            f"2026-03-01,40.00,NEFT {self.first.invoice_number} part,T1\n"
+            "02/03/2026,250.00,IMPS from GLOBEX PVT,T2\n"
+            "2026-03-03,250.00,UPI unknown sender,T3\n"
+            "2026-03-04,-30.00,Bank charges,T4\n"
+            "2026-03-05,abc,Broken,T5\n"
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            report = self.reconcile(statement)
+
+        self.assertEqual(report["matched"], 2)
+        self.assertEqual(report["ignored"], 1)
+        self.assertEqual(
+            report["errors"], [{"line": 6, "error": "Invalid amount: abc"}]
+        )
+        self.assertEqual(
+            [(line["line"], line["reason"]) for line in report["unmatched"]],
+            [(4, "No open invoice matches.")],
+        )
+        self.assertEqual(
+            sum(
+                query["sql"].startswith('UPDATE "invoices_invoice" ')
+                for query in context.captured_queries
+            ),
+            1,
+        )
+
+        self.first.refresh_from_db()
+        self.third.refresh_from_db()
+        self.assertEqual(self.first.amount_paid, Decimal("40.00"))
+        self.assertEqual(self.first.status, Invoice.InvoiceStatus.PARTIALLY_PAID)
+        self.assertEqual(self.third.status, Invoice.InvoiceStatus.PAID)
+        self.assertEqual(find_drifted_financial_summaries([self.user.id]), [])
+
+        # Importing the same statement again pays nothing twice.
+        report = self.reconcile(statement)
+        self.assertEqual((report["matched"], report["duplicates"]), (0, 2))
+
+    def test_ofx_and_ambiguous_or_excess_lines(self):
+        statement = f"""OFXHEADER:100
+<OFX><BANKMSGSRSV1><STMTTRS><BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>CREDIT
+<DTPOSTED>20260301120000
+<TRNAMT>100.00
+<FITID>A1
+<NAME>Acme Corp
+<MEMO>Payment {self.first.invoice_number}
+</STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20260302<TRNAMT>250.00<FITID>A2<NAME>Transfer</STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20260303<TRNAMT>500.00<FITID>A3<MEMO>{self.second.invoice_number}</STMTTRN>
+</BANKTRANLIST></STMTTRS></BANKMSGSRSV1></OFX>
+"""
+        report = self.reconcile(statement, "ofx")
+
+        self.assertEqual(report["matched"], 1)
+        self.assertEqual(
+            [(line["line"], line["reason"]) for line in report["unmatched"]],
+            [
+                (11, "No open invoice matches."),
+                (
+                    12,
+                    f"Amount exceeds the balance due on {self.second.invoice_number}.",
+                ),
+            ],
+        )
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.status, Invoice.InvoiceStatus.PAID)
+
+        # Once the first invoice is paid, two open invoices are due 250.00 but
+        # only one of them is for Acme Corp.
+        report = self.reconcile(
+            "date,amount,description\n2026-03-04,250.00,Acme Corp transfer\n"
+        )
+        self.assertEqual(report["matched"], 1)
+        self.second.refresh_from_db()
+        self.assertEqual(self.second.status, Invoice.InvoiceStatus.PAID)
+
+    def test_reconcile_endpoint(self):
+        api = APIClient()
+        api.force_authenticate(self.user)
+        upload = SimpleUploadedFile(
+            "statement.csv",
+            f"date,amount,description\n2026-03-01,100,{self.first.invoice_number}\n".encode(),
+        )
+
+        response = api.post(
+            "/api/invoices/reconcile/", {"file": upload}, format="multipart"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["matched"], 1)
+
+    def test_lines_without_transaction_id_are_not_paid_twice(self):
+        line = f"2026-03-01,20.00,NEFT {self.first.invoice_number} part\n"
+        statement = "date,amount,description\n" + line + line
+
+        report = self.reconcile(statement)
+        self.assertEqual((report["matched"], report["duplicates"]), (2, 0))
+
+        report = self.reconcile(statement)
+        self.assertEqual((report["matched"], report["duplicates"]), (0, 2))
+
+        # A statement with one more identical line pays only that one.
+        report = self.reconcile(statement + line)
+        self.assertEqual((report["matched"], report["duplicates"]), (1, 2))
+
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.amount_paid, Decimal("60.00"))
+
+    def test_unreadable_files_keep_the_lines_before_them(self):
+        # Uploads are decoded in chunks, so the bad byte has to come after
+        # the first one for any line to be read.
+        head = (
+            f"date,amount,description\n2026-03-01,100,{self.first.invoice_number}\n"
+            + "2026-03-01,-1.00,Bank charges\n" * 1000
+        )
+        api = APIClient()
+        api.force_authenticate(self.user)
+
+        for name, content, error in [
+            ("latin1.csv", b"2026-03-02,5,caf\xe9\n", "UTF-8"),
+            (
+                "broken.csv",
+                b'2026-03-02,5,"' + b"x" * 200_000 + b'"\n',
+                "Malformed CSV",
+            ),
+            ("nan.csv", b"2026-03-02,NaN,Acme\n", "Invalid amount"),
+        ]:
+            with self.subTest(name):
+                response = api.post(
+                    "/api/invoices/reconcile/",
+                    {"file": SimpleUploadedFile(name, head.encode() + content)},
+                    format="multipart",
+                )
+
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.data["errors"]), 1)
+                self.assertIn(error, response.data["errors"][0]["error"])
+
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.status, Invoice.InvoiceStatus.PAID)
+        self.assertEqual(self.first.payments.count(), 1)
+
+    def test_command_reports_unreadable_files(self):
+        stdout, stderr = StringIO(), StringIO()
+
+        with tempfile.NamedTemporaryFile(suffix=".csv") as file:
+            file.write(b"date,amount,description\n2026-03-01,1\xff,Acme\n")
+            file.flush()
+            call_command(
+                "reconcile_bank_statement",
+                file.name,
+                "--user",
+                self.user.email,
+                stdout=stdout,
+                stderr=stderr,
+            )
+
+        self.assertIn("The file must be UTF-8 encoded", stderr.getvalue())
+        self.assertIn("1 rows rejected", stdout.getvalue())
+
+
+class QueryPlanTests(TestCase):
+    """
+    Run EXPLAIN for each canonical invoice access path and fail when the plan
+    reads a whole table, or sorts rows a paged path should read in index
+    order, so dropping or reshaping an index is caught here rather than in
+    production. Sequential scans are disabled on PostgreSQL, where tiny test
+    tables would otherwise always be scanned.
+    """
+
+    FULL_SCANS = {
+        "sqlite": re.compile(r"\bSCAN (\w+)$", re.MULTILINE),
+        "postgresql": re.compile(r"Seq Scan on (\w+)"),
+    }
+    SORTS = {
+        "sqlite": re.compile(r"USE TEMP B-TREE FOR (?:RIGHT PART OF )?ORDER BY"),
+        "postgresql": re.compile(
+            r"^(?:\s*->)?\s*(?:Incremental )?Sort\b", re.MULTILINE
+        ),
+    }
+
+    def setUp(self):
+        if connection.vendor not in self.FULL_SCANS:
+            self.skipTest(f"No query plan check for {connection.vendor}.")
+
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+
+        self.user = User.objects.create_user(
+            email="owner@example.com", username="owner", password="password"
+        )
+        self.client_record = Client.objects.create(user=self.user, name="Acme")
+        self.invoice = Invoice.objects.create(
+            user=self.user, client=self.client_record, issue_date=date(2026, 1, 1)
+        )
+
+    def assertIndexed(self, queryset, ordered=False):
+        plan = queryset.explain()
+
+        scans = self.FULL_SCANS[connection.vendor].findall(plan)
+        self.assertFalse(scans, f"Full scan of {', '.join(scans)}:\n{plan}")
+
+        if ordered:
+            self.assertIsNone(
+                self.SORTS[connection.vendor].search(plan),
+                f"Rows sorted outside an index:\n{plan}",
+            )
+
+    def check_paths(self, paths):
+        for name, (queryset, ordered) in paths.items():
+            with self.subTest(name):
+                self.assertIndexed(queryset, ordered)
+
+    def test_invoice_access_paths(self):
+        invoices = Invoice.objects.filter(user=self.user)
+        self.check_paths(
+            {
+                "list": (invoices.order_by("-id")[:20], True),
+                "list by status": (
+                    invoices.filter(status=Invoice.InvoiceStatus.UNPAID).order_by(
+                        "-id"
+                    )[:20],
+                    True,
+                ),
+                "list by client": (
+                    invoices.filter(client=self.client_record).order_by("-id")[:20],
+                    True,
+                ),
+                "list by issue date": (
+                    invoices.filter(
+                        issue_date__gte=date(2026, 1, 1),
+                        issue_date__lte=date(2026, 1, 31),
+                    ),
+                    False,
+                ),
+                "open by due date": (
+                    invoices.filter(
+                        status=Invoice.InvoiceStatus.UNPAID,
+                        due_date__lt=date(2026, 2, 1),
+                    ).order_by("due_date"),
+                    True,
+                ),
+                "overdue sweep": (
+                    Invoice.objects.filter(
+                        status=Invoice.InvoiceStatus.UNPAID,
+                        due_date__lt=date(2026, 2, 1),
+                    ),
+                    False,
+                ),
+                "by recurring run": (
+                    Invoice.objects.filter(
+                        recurring_invoice_id=1, issue_date=date(2026, 1, 1)
+                    ),
+                    False,
+                ),
+            }
+        )
+
+    def test_line_item_and_payment_access_paths(self):
+        self.check_paths(
+            {
+                "items of an invoice": (
+                    InvoiceItem.objects.filter(invoice=self.invoice).order_by("id"),
+                    True,
+                ),
+                "items of exported invoices": (
+                    InvoiceItem.objects.filter(invoice_id__in=[self.invoice.id]),
+                    False,
+                ),
+                "payments of an invoice by date": (
+                    PaymentRecord.objects.filter(
+                        invoice=self.invoice, payment_date__gte=date(2026, 1, 1)
+                    ).order_by("payment_date"),
+                    True,
+                ),
+                "payments by bank reference": (
+                    PaymentRecord.objects.filter(
+                        invoice__user=self.user, bank_reference__in=["FIT-1"]
+                    ),
+                    False,
+                ),
+                "due recurring templates": (
+                    RecurringInvoice.objects.filter(
+                        is_active=True, next_run_date__lte=date(2026, 2, 1)
+                    ),
+                    False,
+                ),
+            }
+        )
@@ -0,0 +1,19 @@
+from django.urls import include, path
+from rest_framework.routers import DefaultRouter
+
+from .views import InvoiceItemBulkCreateView, InvoicePdfView, InvoiceViewSet
+
+router = DefaultRouter()
+router.register(r"invoices", InvoiceViewSet, basename="invoices")
+
+urlpatterns = [
+    path("", include(router.urls)),
+    path(
+        "invoices/<int:invoice_id>/items/bulk/",
+        InvoiceItemBulkCreateView.as_view(),
+        name="invoice_item_bulk_create",
+    ),
+    path(
+        "invoices/<int:invoice_id>/pdf/", InvoicePdfView.as_view(), name="invoice_pdf"
+    ),
+]
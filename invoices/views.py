@@ -1,3 +1,187 @@
-from django.shortcuts import render
+import io
 
-# Create your views here.
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.db.models import Prefetch
+from django.http import FileResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .analytics import get_invoice_analytics
+from .cache import get_cached_analytics
+from .exports import export_invoices
+from .models import Invoice, InvoiceItem, PaymentRecord, UserFinancialSummary
+from .pagination import InvoicePagination
+from .pdf import get_invoice_pdf
+from .schema import (
+    INVOICE_ITEM_BULK_CREATE_SCHEMA,
+    INVOICE_PDF_SCHEMA,
+    INVOICE_VIEWSET_SCHEMA,
+)
+from .serializers import (
+    BankStatementSerializer,
+    InvoiceAnalyticsSerializer,
+    InvoiceDetailSerializer,
+    InvoiceExportSerializer,
+    InvoiceFilterSerializer,
+    InvoiceItemBulkCreateSerializer,
+    InvoiceItemSerializer,
+    InvoiceListSerializer,
+    UserFinancialSummarySerializer,
+)
+from .services import add_invoice_items
+from .statements import detect_format, read_statement_lines, reconcile_statement
+
+
+@INVOICE_VIEWSET_SCHEMA
+class InvoiceViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = Invoice.objects.all()
+    permission_classes = [IsAuthenticated]
+    pagination_class = InvoicePagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset().filter(user_id=self.request.user.id)
+
+        if self.action == "retrieve":
+            return queryset.select_related("client").prefetch_related(
+                Prefetch("items", queryset=InvoiceItem.objects.order_by("id")),
+                Prefetch("payments", queryset=PaymentRecord.objects.order_by("id")),
+            )
+
+        filters = InvoiceFilterSerializer(data=self.request.query_params)
+        filters.is_valid(raise_exception=True)
+        filters = filters.validated_data
+
+        if "status" in filters:
+            queryset = queryset.filter(status=filters["status"])
+
+        if "client" in filters:
+            queryset = queryset.filter(client_id=filters["client"])
+
+        if "issued_from" in filters:
+            queryset = queryset.filter(issue_date__gte=filters["issued_from"])
+
+        if "issued_to" in filters:
+            queryset = queryset.filter(issue_date__lte=filters["issued_to"])
+
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action == "list":
+            return InvoiceListSerializer
+        return InvoiceDetailSerializer
+
+    @action(detail=False, methods=["get"])
+    def analytics(self, request):
+        data = get_cached_analytics(
+            request.user.id, timezone.localdate(), get_invoice_analytics
+        )
+        serializer = InvoiceAnalyticsSerializer(data)
+
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        serializer = InvoiceExportSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        options = serializer.validated_data
+
+        content_type, chunks = export_invoices(
+            self.get_queryset(), options["output"], options["rows"]
+        )
+        filename = f"{options['rows']}-{timezone.localdate()}.{options['output']}"
+
+        return StreamingHttpResponse(
+            chunks,
+            content_type=content_type,
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
+
+    @action(
+        detail=False, methods=["post"], parser_classes=[MultiPartParser, FormParser]
+    )
+    def reconcile(self, request):
+        serializer = BankStatementSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        upload = serializer.validated_data["file"]
+        file_format = serializer.validated_data.get("format") or detect_format(
+            upload.name
+        )
+        stream = io.TextIOWrapper(upload.file, encoding="utf-8", newline="")
+
+        report = reconcile_statement(
+            request.user.id, read_statement_lines(stream, file_format)
+        )
+
+        return Response(report, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=["get"])
+    def summary(self, request):
+        summary = UserFinancialSummary.objects.filter(user_id=request.user.id).first()
+        serializer = UserFinancialSummarySerializer(
+            summary or UserFinancialSummary(user_id=request.user.id)
+        )
+
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+@INVOICE_ITEM_BULK_CREATE_SCHEMA
+class InvoiceItemBulkCreateView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, invoice_id):
+        invoice = get_object_or_404(Invoice, id=invoice_id, user_id=request.user.id)
+
+        serializer = InvoiceItemBulkCreateSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            items = add_invoice_items(invoice, serializer.validated_data["items"])
+        except ValidationError as e:
+            return Response(
+                {"error": " ".join(e.messages)}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response(
+            {
+                "items": InvoiceItemSerializer(items, many=True).data,
+                "subtotal": invoice.subtotal,
+                "total_amount": invoice.total_amount,
+                "status": invoice.status,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+
+@INVOICE_PDF_SCHEMA
+class InvoicePdfView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, invoice_id):
+        invoice = get_object_or_404(Invoice, id=invoice_id, user_id=request.user.id)
+
+        path, ready = get_invoice_pdf(invoice)
+
+        if not ready:
+            return Response(
+                {"status": "rendering"},
+                status=status.HTTP_202_ACCEPTED,
+                headers={"Retry-After": "2"},
+            )
+
+        return FileResponse(
+            default_storage.open(path),
+            content_type="application/pdf",
+            filename=f"{invoice.invoice_number}.pdf",
+        )
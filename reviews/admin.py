@@ -1,7 +1,8 @@
 from django.contrib import admin
 
-from .models import Review, ReviewedClient, Tag
+from .models import ClientReviewStats, Review, ReviewedClient, Tag
 
 admin.site.register(Tag)
 admin.site.register(Review)
 admin.site.register(ReviewedClient)
+admin.site.register(ClientReviewStats)
@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class ReviewsConfig(AppConfig):
@@ -7,3 +8,7 @@ class ReviewsConfig(AppConfig):
 
     def ready(self):
         import reviews.signals  # noqa: F401
+
+        from .utils import warm_phone_metadata
+
+        warm_phone_metadata(settings.PHONE_METADATA_PRELOAD_REGIONS)
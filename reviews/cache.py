@@ -0,0 +1,85 @@
+from django.core.cache import cache
+from django.db import transaction
+
+from config.cache import bump_version, get_version, get_versions
+
+SUMMARY_CACHE_TIMEOUT = 60 * 60 * 24
+SUMMARY_COUNTERS = ["hits", "misses", "not_modified"]
+
+TAG_CATALOG_VERSION_KEY = "tag_catalog_version"
+
+
+def _version_key(client_id):
+    return f"review_summary_version_{client_id}"
+
+
+def _summary_key(client_id, version):
+    return f"review_summary_{client_id}_{version}"
+
+
+def _counter_key(name):
+    return f"review_summary_{name}"
+
+
+def _count(name):
+    key = _counter_key(name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+def get_summary_version(client_id):
+    """
+    Return the version a client's summary is cached under. It changes when
+    the client's reviews change or when any tag is edited, and both counters
+    are read in one round trip.
+    """
+    keys = [_version_key(client_id), TAG_CATALOG_VERSION_KEY]
+    versions = get_versions(keys)
+
+    return "-".join(str(versions[key]) for key in keys)
+
+
+def bump_summary_version(client_id):
+    bump_version(_version_key(client_id))
+
+
+def bump_summary_version_on_commit(client_id):
+    transaction.on_commit(lambda: bump_summary_version(client_id))
+
+
+def get_tag_catalog_version():
+    return get_version(TAG_CATALOG_VERSION_KEY)
+
+
+def bump_tag_catalog_version_on_commit():
+    transaction.on_commit(lambda: bump_version(TAG_CATALOG_VERSION_KEY))
+
+
+def summary_etag(client_id, version):
+    return f'"{client_id}-{version}"'
+
+
+def get_cached_summary(client_id, version, compute):
+    key = _summary_key(client_id, version)
+    data = cache.get(key)
+
+    if data is None:
+        _count("misses")
+        data = compute(client_id)
+        cache.set(key, data, timeout=SUMMARY_CACHE_TIMEOUT)
+    else:
+        _count("hits")
+
+    return data
+
+
+def record_not_modified():
+    _count("not_modified")
+
+
+def get_summary_cache_counters():
+    values = cache.get_many([_counter_key(name) for name in SUMMARY_COUNTERS])
+    return {name: values.get(_counter_key(name), 0) for name in SUMMARY_COUNTERS}
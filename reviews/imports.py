@@ -0,0 +1,293 @@
+import csv
+import json
+from collections import Counter
+
+from django.db import IntegrityError, connection, transaction
+
+from users.credits import record_credits
+from users.models import CreditTransaction, User
+
+from .models import Review, ReviewedClient
+from .services import REVIEW_CREDIT_POINTS, rebuild_client_stats
+from .tag_catalog import get_tags
+from .utils import hash_phone_numbers
+
+IMPORT_FORMATS = ["jsonl", "csv"]
+TAG_SEPARATOR = "|"
+
+
+def detect_format(filename, default="jsonl"):
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    return extension if extension in IMPORT_FORMATS else default
+
+
+def read_review_rows(stream, file_format):
+    """
+    Yield (line_number, row) pairs from a JSONL or CSV text stream. Rows carry an
+    author email, a raw phone number, an optional 1-5 rating and tag names
+    (a list, or a "|"-separated string). A file that cannot be decoded or
+    parsed past some line yields one error row for it and stops there.
+    """
+    line_number = 0
+
+    try:
+        if file_format == "csv":
+            for line_number, row in enumerate(csv.DictReader(stream), start=2):
+                yield line_number, row
+            return
+
+        for line_number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                row = {"_error": f"Invalid JSON: {e}"}
+
+            if not isinstance(row, dict):
+                row = {"_error": "Each line must be a JSON object."}
+
+            yield line_number, row
+
+    except UnicodeDecodeError:
+        error = "The file must be UTF-8 encoded; the rest of it was not read."
+        yield line_number + 1, {"_error": error}
+
+    except csv.Error as e:
+        error = f"Malformed CSV ({e}); the rest of the file was not read."
+        yield line_number + 1, {"_error": error}
+
+
+def _parse_author(value):
+    if value is None:
+        return ""
+
+    if not isinstance(value, str):
+        raise ValueError("Author must be an email address")
+
+    return value.strip()
+
+
+def _parse_rating(value):
+    if value in (None, ""):
+        return None
+
+    # bool is an int subclass, and int() would truncate a float such as 4.7.
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError("Rating must be a whole number between 1 and 5")
+
+    try:
+        rating = int(value)
+    except ValueError:
+        raise ValueError("Rating must be a whole number between 1 and 5")
+
+    if not 1 <= rating <= 5:
+        raise ValueError("Rating must be between 1 and 5")
+
+    return rating
+
+
+def _parse_tag_names(value):
+    if value is None or value == "":
+        return []
+
+    if isinstance(value, str):
+        value = value.split(TAG_SEPARATOR)
+    elif not isinstance(value, list) or not all(
+        isinstance(name, str) for name in value
+    ):
+        raise ValueError(
+            f"Tags must be a list of names or a {TAG_SEPARATOR}-separated string"
+        )
+
+    return [name.strip() for name in value if name.strip()]
+
+
+def _existing_reviews(pairs):
+    return set(
+        Review.objects.filter(
+            author_id__in={author_id for author_id, _ in pairs},
+            client_id__in={client_id for _, client_id in pairs},
+        ).values_list("author_id", "client_id")
+    )
+
+
+def _insert_reviews(pending, report, attempts=3):
+    """
+    Insert the pending reviews that do not exist yet and return
+    {(author_id, client_id): review_id} for exactly the rows inserted here.
+    Pairs that already exist are dropped from `pending` and counted as
+    duplicates. A review another request inserts between the check and the
+    INSERT fails the whole INSERT, which is then retried without it.
+    """
+    for attempt in range(attempts):
+        for key in _existing_reviews(pending) & pending.keys():
+            del pending[key]
+            report["duplicates"] += 1
+
+        if not pending:
+            return {}
+
+        try:
+            with transaction.atomic():
+                reviews = Review.objects.bulk_create(
+                    [
+                        Review(author_id=author_id, client_id=client_id, ratings=rating)
+                        for (author_id, client_id), (rating, _) in pending.items()
+                    ]
+                )
+        except IntegrityError:
+            if attempt == attempts - 1:
+                raise
+            continue
+
+        if not connection.features.can_return_rows_from_bulk_insert:
+            # Every pending pair was inserted by this INSERT, so reading them
+            # back cannot pick up another request's rows.
+            reviews = Review.objects.filter(
+                author_id__in={author_id for author_id, _ in pending},
+                client_id__in={client_id for _, client_id in pending},
+            )
+            reviews = [
+                review
+                for review in reviews
+                if (review.author_id, review.client_id) in pending
+            ]
+
+        return {(review.author_id, review.client_id): review.pk for review in reviews}
+
+
+def _import_batch(rows, tags_by_name, report):
+    valid_rows = []
+    for line_number, row in rows:
+        if "_error" in row:
+            report["errors"].append({"line": line_number, "error": row["_error"]})
+            continue
+
+        try:
+            author = _parse_author(row.get("author"))
+            rating = _parse_rating(row.get("rating"))
+            tag_names = _parse_tag_names(row.get("tags"))
+        except ValueError as e:
+            report["errors"].append({"line": line_number, "error": str(e)})
+            continue
+
+        unknown = [name for name in tag_names if name not in tags_by_name]
+        if unknown:
+            report["errors"].append(
+                {"line": line_number, "error": f"Unknown tags: {', '.join(unknown)}"}
+            )
+            continue
+
+        tags = [tags_by_name[name] for name in tag_names]
+        groups = Counter(tag.group for tag in tags)
+        duplicates = [group for group, count in groups.items() if count > 1]
+        if duplicates:
+            report["errors"].append(
+                {
+                    "line": line_number,
+                    "error": "You cannot select conflicting tags from the same "
+                    f"category: {', '.join(duplicates)}",
+                }
+            )
+            continue
+
+        valid_rows.append(
+            (
+                line_number,
+                author,
+                str(row.get("phone") or ""),
+                rating,
+                tags,
+            )
+        )
+
+    hashed_numbers, phone_errors = hash_phone_numbers(row[2] for row in valid_rows)
+    authors = dict(
+        User.objects.filter(email__in={row[1] for row in valid_rows}).values_list(
+            "email", "id"
+        )
+    )
+
+    ReviewedClient.objects.bulk_create(
+        [
+            ReviewedClient(phone_number=hashed_number)
+            for hashed_number in set(hashed_numbers.values())
+        ],
+        ignore_conflicts=True,
+    )
+    clients = dict(
+        ReviewedClient.objects.filter(
+            phone_number__in=set(hashed_numbers.values())
+        ).values_list("phone_number", "id")
+    )
+
+    pending = {}
+    for line_number, author, phone, rating, tags in valid_rows:
+        if phone in phone_errors:
+            report["errors"].append({"line": line_number, "error": phone_errors[phone]})
+            continue
+
+        author_id = authors.get(author)
+        if author_id is None:
+            report["errors"].append(
+                {"line": line_number, "error": f"Unknown author: {author}"}
+            )
+            continue
+
+        key = (author_id, clients[hashed_numbers[phone]])
+        if key in pending:
+            report["duplicates"] += 1
+            continue
+
+        pending[key] = (rating, tags)
+
+    created = _insert_reviews(pending, report)
+    if not created:
+        return
+
+    Review.tags.through.objects.bulk_create(
+        [
+            Review.tags.through(review_id=review_id, tag_id=tag.id)
+            for key, review_id in created.items()
+            for tag in pending[key][1]
+        ]
+    )
+
+    record_credits(
+        (author_id, REVIEW_CREDIT_POINTS, CreditTransaction.Reason.REVIEW_REWARD)
+        for author_id, _ in created
+    )
+
+    rebuild_client_stats(list({client_id for _, client_id in created}))
+
+    report["created"] += len(created)
+
+
+def import_reviews(rows, batch_size=5000):
+    """
+    Bulk import reviews from (line_number, row) pairs. Each batch runs in its
+    own transaction: clients are upserted, reviews and their tag links are
+    bulk inserted (skipping existing author/client pairs), author credits are
+    appended to the ledger with one INSERT and the touched clients' stats rebuilt.
+    """
+    tags_by_name = {tag.name: tag for tag in get_tags()}
+    report = {"created": 0, "duplicates": 0, "errors": []}
+
+    batch = []
+    for line_number, row in rows:
+        batch.append((line_number, row))
+
+        if len(batch) >= batch_size:
+            with transaction.atomic():
+                _import_batch(batch, tags_by_name, report)
+            batch = []
+
+    if batch:
+        with transaction.atomic():
+            _import_batch(batch, tags_by_name, report)
+
+    report["errors"].sort(key=lambda error: error["line"])
+    return report
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.imports import (
+    IMPORT_FORMATS,
+    detect_format,
+    import_reviews,
+    read_review_rows,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk import reviews from a JSONL or CSV file with author (email), "
+        "phone, rating and tags (names separated by '|') columns."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=IMPORT_FORMATS)
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["format"] or detect_format(path)
+
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be a positive number.")
+
+        try:
+            with open(path, encoding="utf-8", newline="") as stream:
+                report = import_reviews(
+                    read_review_rows(stream, file_format),
+                    batch_size=options["batch_size"],
+                )
+        except OSError as e:
+            raise CommandError(f"Could not read {path}: {e}")
+
+        for error in report["errors"]:
+            self.stderr.write(f"Line {error['line']}: {error['error']}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {report['created']} reviews "
+                f"({report['duplicates']} duplicates skipped, "
+                f"{len(report['errors'])} rows rejected)."
+            )
+        )
@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.models import ReviewedClient
+from reviews.services import find_stale_client_stats, rebuild_client_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild (or verify) the per-client review stats from the reviews table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Only report clients whose stored stats have drifted.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        verify = options["verify"]
+
+        if batch_size < 1:
+            raise CommandError("--batch-size must be a positive number.")
+
+        processed = 0
+        stale = []
+        last_id = None
+
+        while True:
+            queryset = ReviewedClient.objects.order_by("id")
+            if last_id is not None:
+                queryset = queryset.filter(id__gt=last_id)
+
+            client_ids = list(queryset.values_list("id", flat=True)[:batch_size])
+            if not client_ids:
+                break
+
+            if verify:
+                stale.extend(find_stale_client_stats(client_ids))
+            else:
+                rebuild_client_stats(client_ids)
+
+            processed += len(client_ids)
+            last_id = client_ids[-1]
+
+        if not verify:
+            self.stdout.write(
+                self.style.SUCCESS(f"Rebuilt review stats for {processed} clients.")
+            )
+            return
+
+        for client_id in stale:
+            self.stdout.write(f"Stale stats: {client_id}")
+
+        if stale:
+            raise CommandError(
+                f"{len(stale)} of {processed} clients have stale review stats."
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Review stats verified for {processed} clients.")
+        )
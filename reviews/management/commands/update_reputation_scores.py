@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.services import update_reputation_scores
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute client reputation scores for clients whose reviews changed "
+        "since the last run. Meant to be run periodically (e.g. from cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Rescore every client, e.g. after a tag's category changed.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        if batch_size < 1:
+            raise CommandError("--batch-size must be a positive number.")
+
+        updated = update_reputation_scores(full=options["all"], batch_size=batch_size)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Updated reputation scores for {updated} clients.")
+        )
@@ -0,0 +1,68 @@
+# Generated by Django 6.0.1 on 2026-10-17 17:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_review_stats(apps, schema_editor):
+    Review = apps.get_model("reviews", "Review")
+    ClientReviewStats = apps.get_model("reviews", "ClientReviewStats")
+
+    stats = {}
+    rating_rows = (
+        Review.objects.values("client_id", "ratings")
+        .annotate(count=models.Count("id"))
+        .order_by()
+    )
+    for row in rating_rows:
+        client_stats = stats.setdefault(
+            row["client_id"], ClientReviewStats(client_id=row["client_id"])
+        )
+        client_stats.total_reviews += row["count"]
+
+        if row["ratings"]:
+            client_stats.rating_count += row["count"]
+            client_stats.rating_sum += row["ratings"] * row["count"]
+            field = f"rating_{row['ratings']}"
+            setattr(client_stats, field, getattr(client_stats, field) + row["count"])
+
+    tag_rows = (
+        Review.tags.through.objects.values("review__client_id", "tag_id")
+        .annotate(count=models.Count("id"))
+        .order_by()
+    )
+    for row in tag_rows:
+        client_stats = stats[row["review__client_id"]]
+        client_stats.tag_counts[str(row["tag_id"])] = row["count"]
+
+    ClientReviewStats.objects.bulk_create(stats.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClientReviewStats',
+            fields=[
+                ('client', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='review_stats', serialize=False, to='reviews.reviewedclient')),
+                ('total_reviews', models.PositiveIntegerField(default=0)),
+                ('rating_count', models.PositiveIntegerField(default=0)),
+                ('rating_sum', models.PositiveIntegerField(default=0)),
+                ('rating_1', models.PositiveIntegerField(default=0)),
+                ('rating_2', models.PositiveIntegerField(default=0)),
+                ('rating_3', models.PositiveIntegerField(default=0)),
+                ('rating_4', models.PositiveIntegerField(default=0)),
+                ('rating_5', models.PositiveIntegerField(default=0)),
+                ('tag_counts', models.JSONField(blank=True, default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'client review stats',
+            },
+        ),
+        migrations.RunPython(backfill_review_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-17 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_clientreviewstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='clientreviewstats',
+            name='reputation_score',
+            field=models.FloatField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='clientreviewstats',
+            name='scored_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 6.0.1 on 2026-10-17 19:26
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_clientreviewstats_reputation_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reviewedclient',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='reviewedclient',
+            index=models.Index(fields=['-created_at', 'id'], name='reviewed_client_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['client', 'id'], name='review_client_id_idx'),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='client',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='reviews', to='reviews.reviewedclient'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 6.0.1 on 2026-10-17 19:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_reviewedclient_created_at_review_client_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='clientreviewstats',
+            index=models.Index(fields=['reputation_score', 'client'], name='client_stats_reputation_idx'),
+        ),
+        migrations.AlterField(
+            model_name='clientreviewstats',
+            name='reputation_score',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -11,6 +11,15 @@ from .utils import hash_phone_number
 class ReviewedClient(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     phone_number = models.CharField(max_length=100, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Backs the newest-first client list (ClientPagination).
+            models.Index(
+                fields=["-created_at", "id"], name="reviewed_client_created_idx"
+            ),
+        ]
 
     def __str__(self):
         return str(self.id)
@@ -59,8 +68,12 @@ class Review(models.Model):
         validators=[MinValueValidator(1), MaxValueValidator(5)],
         help_text="Rating must be between 1 and 5",
     )
+    # Indexed by review_client_id_idx, which also orders a client's reviews.
     client = models.ForeignKey(
-        ReviewedClient, on_delete=models.CASCADE, related_name="reviews"
+        ReviewedClient,
+        on_delete=models.CASCADE,
+        related_name="reviews",
+        db_index=False,
     )
 
     class Meta:
@@ -69,6 +82,92 @@ class Review(models.Model):
                 fields=["author", "client"], name="unique_review_per_client"
             )
         ]
+        indexes = [
+            models.Index(fields=["client", "id"], name="review_client_id_idx"),
+        ]
 
     def __str__(self):
         return f"{self.client} - {self.author}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+
+        # Remember the values the client stats were built from, so saving the
+        # review can apply the difference without reading the row again.
+        if "client_id" in instance.__dict__ and "ratings" in instance.__dict__:
+            instance._stats_state = {
+                "client_id": instance.client_id,
+                "ratings": instance.ratings,
+            }
+
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self.__dict__.pop("_stats_state", None)
+
+
+class ClientReviewStats(models.Model):
+    """Denormalized review aggregates, kept in step by reviews/signals.py."""
+
+    client = models.OneToOneField(
+        ReviewedClient,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="review_stats",
+    )
+    total_reviews = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_1 = models.PositiveIntegerField(default=0)
+    rating_2 = models.PositiveIntegerField(default=0)
+    rating_3 = models.PositiveIntegerField(default=0)
+    rating_4 = models.PositiveIntegerField(default=0)
+    rating_5 = models.PositiveIntegerField(default=0)
+    tag_counts = models.JSONField(default=dict, blank=True)
+
+    reputation_score = models.FloatField(null=True, blank=True)
+    scored_at = models.DateTimeField(null=True, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "client review stats"
+        indexes = [
+            # Backs the ranked client feed (ClientRankingPagination).
+            models.Index(
+                fields=["reputation_score", "client"],
+                name="client_stats_reputation_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.client} - {self.total_reviews} reviews"
+
+    def apply(self, reviews=0, ratings=None, tag_ids=(), sign=1):
+        self.total_reviews += sign * reviews
+
+        if ratings:
+            self.rating_count += sign
+            self.rating_sum += sign * ratings
+            field = f"rating_{ratings}"
+            setattr(self, field, getattr(self, field) + sign)
+
+        for tag_id in tag_ids:
+            key = str(tag_id)
+            count = self.tag_counts.get(key, 0) + sign
+            if count > 0:
+                self.tag_counts[key] = count
+            else:
+                self.tag_counts.pop(key, None)
+
+    @property
+    def rating_distribution(self):
+        return {star: getattr(self, f"rating_{star}") for star in (5, 4, 3, 2, 1)}
+
+    @property
+    def average_rating(self):
+        if not self.rating_count:
+            return 0
+        return round(self.rating_sum / self.rating_count, 1)
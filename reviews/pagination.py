@@ -0,0 +1,26 @@
+from config.pagination import KeysetPagination
+
+
+class ReviewPagination(KeysetPagination):
+    """Newest reviews first, which is the inherited `-id` ordering."""
+
+
+class ClientPagination(KeysetPagination):
+    """Newest clients first; the id breaks ties between equal timestamps."""
+
+    ordering = ("-created_at", "id")
+    max_page_size = 500
+
+
+class ClientRankingPagination(KeysetPagination):
+    """
+    Walks client_stats_reputation_idx, riskiest first by default or safest
+    first with `?order=safe`. The client id orders clients with equal scores.
+    """
+
+    ordering = ("reputation_score", "client_id")
+
+    def get_ordering(self, request, queryset, view):
+        if request.query_params.get("order") == "safe":
+            return ("-reputation_score", "-client_id")
+        return self.ordering
@@ -1,11 +1,17 @@
 from drf_spectacular.utils import (
+    OpenApiParameter,
     extend_schema,
     extend_schema_view,
     inline_serializer,
 )
 from rest_framework import serializers
 
-from .serializers import ClientLookupSerializer
+from .serializers import (
+    ClientBulkLookupSerializer,
+    ClientLookupSerializer,
+    ClientReputationSerializer,
+    ReviewImportSerializer,
+)
 
 TAG_VIEWSET_SCHEMA = extend_schema_view(
     list=extend_schema(
@@ -28,7 +34,7 @@ CLIENT_VIEWSET_SCHEMA = extend_schema_view(
     list=extend_schema(
         tags=["Clients"],
         summary="List all clients (Superuser only)",
-        description="Only accessible by superusers to see the full list of clients.",
+        description="Only accessible by superusers to see the full list of clients, newest first. Results are cursor-paginated; follow the `next` link for more.",
     ),
     retrieve=extend_schema(
         tags=["Clients"],
@@ -47,6 +53,22 @@ CLIENT_VIEWSET_SCHEMA = extend_schema_view(
         tags=["Clients"], summary="Partially update client details (Superuser only)"
     ),
     destroy=extend_schema(tags=["Clients"], summary="Delete a client (Superuser only)"),
+    ranked=extend_schema(
+        tags=["Clients"],
+        summary="Clients ranked by reputation",
+        description="Clients ordered by their precomputed reputation score (0 = risky, 1 = safe). "
+        "Riskiest first by default; pass `order=safe` for the safest first. Scores are refreshed by the "
+        "`update_reputation_scores` command. Results are cursor-paginated; follow the `next` link for more.",
+        parameters=[
+            OpenApiParameter(
+                "order",
+                str,
+                enum=["risk", "safe"],
+                description="Ranking direction, `risk` by default.",
+            )
+        ],
+        responses=ClientReputationSerializer(many=True),
+    ),
 )
 
 CLIENT_LOOKUP_SCHEMA = extend_schema_view(
@@ -73,16 +95,45 @@ CLIENT_LOOKUP_SCHEMA = extend_schema_view(
     )
 )
 
+CLIENT_BULK_LOOKUP_SCHEMA = extend_schema_view(
+    post=extend_schema(
+        tags=["Clients"],
+        summary="Lookup many Client IDs by Phone Number",
+        description="Resolve up to 1000 phone numbers in one request. Every submitted number maps to a `found`, `not_found` or `invalid` entry; invalid and unknown numbers carry the same error messages as the single lookup.",
+        request=ClientBulkLookupSerializer,
+        responses={
+            200: inline_serializer(
+                name="BulkLookupResponse",
+                fields={
+                    "results": serializers.DictField(
+                        child=inline_serializer(
+                            name="BulkLookupResult",
+                            fields={
+                                "status": serializers.ChoiceField(
+                                    choices=["found", "not_found", "invalid"]
+                                ),
+                                "client_id": serializers.UUIDField(required=False),
+                                "error": serializers.CharField(required=False),
+                            },
+                        )
+                    )
+                },
+            ),
+        },
+    )
+)
+
 REVIEW_VIEWSET_SCHEMA = extend_schema_view(
     list=extend_schema(
         tags=["Reviews"],
         summary="Get reviews for a client",
-        description="Retrieve all reviews associated with a specific client.",
+        description="Retrieve the reviews associated with a specific client, newest first. Results are cursor-paginated; follow the `next` link for more.",
     ),
     summary=extend_schema(
         tags=["Reviews"],
         summary="Get client review summary",
-        description="Returns average rating, total reviews, distribution, and tags summary.",
+        description="Returns average rating, total reviews, distribution, and tags summary. "
+        "The response carries an ETag; send it back in `If-None-Match` to get a 304 while the summary is unchanged.",
     ),
     create=extend_schema(
         tags=["Reviews"],
@@ -111,11 +162,58 @@ REVIEW_VIEWSET_SCHEMA = extend_schema_view(
     ),
 )
 
+REVIEW_SUMMARY_CACHE_STATS_SCHEMA = extend_schema_view(
+    get=extend_schema(
+        tags=["Reviews"],
+        summary="Review summary cache counters (Superuser only)",
+        description="Hit, miss and 304 counts for the cached client review summaries.",
+        responses={
+            200: inline_serializer(
+                name="ReviewSummaryCacheStatsResponse",
+                fields={
+                    "hits": serializers.IntegerField(),
+                    "misses": serializers.IntegerField(),
+                    "not_modified": serializers.IntegerField(),
+                },
+            )
+        },
+    )
+)
+
+REVIEW_IMPORT_SCHEMA = extend_schema_view(
+    post=extend_schema(
+        tags=["Reviews"],
+        summary="Bulk import reviews (Superuser only)",
+        description="Upload a JSONL or CSV file with `author` (email), `phone`, `rating` and `tags` (tag names separated by `|`). "
+        "Clients are created as needed, reviews that already exist for an author/client pair are skipped, and rejected rows are reported by line. "
+        "A file that is not UTF-8 or not valid CSV is read up to the offending line, which is reported as an error.",
+        request={"multipart/form-data": ReviewImportSerializer},
+        responses={
+            200: inline_serializer(
+                name="ReviewImportResponse",
+                fields={
+                    "created": serializers.IntegerField(),
+                    "duplicates": serializers.IntegerField(),
+                    "errors": serializers.ListField(
+                        child=inline_serializer(
+                            name="ReviewImportError",
+                            fields={
+                                "line": serializers.IntegerField(),
+                                "error": serializers.CharField(),
+                            },
+                        )
+                    ),
+                },
+            )
+        },
+    )
+)
+
 USER_REVIEW_VIEWSET_SCHEMA = extend_schema_view(
     list=extend_schema(
         tags=["Reviews"],
         summary="List my reviews",
-        description="Retrieve a list of all reviews written by the currently authenticated user.",
+        description="Retrieve the reviews written by the currently authenticated user, newest first. Results are cursor-paginated; follow the `next` link for more.",
     ),
     retrieve=extend_schema(
         tags=["Reviews"],
@@ -1,25 +1,76 @@
+from django.db import IntegrityError
+from django.db.models import prefetch_related_objects
 from rest_framework import serializers
 
-from .models import Review, ReviewedClient, Tag
+from .models import ClientReviewStats, Review, ReviewedClient, Tag
+from .tag_catalog import get_tag
 
 
 class ClientSerializer(serializers.ModelSerializer):
     class Meta:
         model = ReviewedClient
-        fields = ["id", "phone_number"]
+        fields = ["id", "phone_number", "created_at"]
+
+
+class ClientReputationSerializer(serializers.ModelSerializer):
+    average_rating = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = ClientReviewStats
+        fields = [
+            "client",
+            "reputation_score",
+            "total_reviews",
+            "average_rating",
+            "scored_at",
+        ]
 
 
 class ClientLookupSerializer(serializers.Serializer):
     phone_number = serializers.CharField(max_length=100, required=True)
 
 
+class ClientBulkLookupSerializer(serializers.Serializer):
+    phone_numbers = serializers.ListField(
+        child=serializers.CharField(max_length=100),
+        allow_empty=False,
+        max_length=1000,
+        required=True,
+    )
+
+
+class ReviewImportSerializer(serializers.Serializer):
+    file = serializers.FileField(required=True)
+    format = serializers.ChoiceField(choices=["jsonl", "csv"], required=False)
+
+
 class TagSerializer(serializers.ModelSerializer):
     class Meta:
         model = Tag
         fields = ["id", "name", "category", "group"]
 
 
+class CatalogTagField(serializers.PrimaryKeyRelatedField):
+    """Resolves tag PKs against the in-process tag catalog instead of the DB."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+
+        try:
+            tag = get_tag(int(data))
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+
+        if tag is None:
+            self.fail("does_not_exist", pk_value=data)
+
+        return tag
+
+
 class ReviewSerializer(serializers.ModelSerializer):
+    tags = CatalogTagField(many=True, queryset=Tag.objects.all(), allow_empty=False)
+
     class Meta:
         model = Review
         fields = ["id", "author", "tags", "ratings", "client"]
@@ -39,21 +90,30 @@ class ReviewSerializer(serializers.ModelSerializer):
 
         return tags
 
-    def validate(self, attrs):
-        request = self.context["request"]
-        view = self.context["view"]
-
-        client_id = view.kwargs["client_id"]
+    def create(self, validated_data):
+        """
+        Insert a new review in as few statements as possible. The author/client
+        pair is left to the unique_review_per_client constraint instead of an
+        exists() pre-check, and the tag links go in with one bulk INSERT whose
+        stats are folded into the review's own post_save update.
+        """
+        tags = validated_data.pop("tags")
+        review = Review(**validated_data)
+        review._initial_tag_ids = [tag.id for tag in tags]
+
+        try:
+            review.save()
+        except IntegrityError:
+            raise serializers.ValidationError(
+                {"detail": ["You have already reviewed this client!"]}
+            )
 
-        if request.method == "POST":
-            if Review.objects.filter(
-                author=request.user, client__id=client_id
-            ).exists():
-                raise serializers.ValidationError(
-                    {"detail": "You have already reviewed this client!"}
-                )
+        Review.tags.through.objects.bulk_create(
+            [Review.tags.through(review=review, tag=tag) for tag in tags]
+        )
+        prefetch_related_objects([review], "tags")
 
-        return attrs
+        return review
 
 
 class ReviewListSerializer(serializers.ModelSerializer):
@@ -0,0 +1,275 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from .cache import bump_summary_version_on_commit
+from .models import ClientReviewStats, Review, ReviewedClient, Tag
+from .tag_catalog import get_tags_by_id
+from .utils import hash_phone_numbers
+
+REVIEW_CREDIT_POINTS = 3
+
+# Every client starts from this many neutral pseudo-observations, so a single
+# review cannot push a score to either end of the ranking.
+REPUTATION_PRIOR_SCORE = 0.5
+REPUTATION_PRIOR_WEIGHT = 5
+
+STATS_FIELDS = [
+    "total_reviews",
+    "rating_count",
+    "rating_sum",
+    "rating_1",
+    "rating_2",
+    "rating_3",
+    "rating_4",
+    "rating_5",
+    "tag_counts",
+]
+
+
+def update_client_stats(client_id, changes, create=True):
+    """
+    Apply a list of `ClientReviewStats.apply` keyword sets to a client's stats
+    row while holding its row lock. With create=False a missing row is left
+    alone, which keeps cascading client deletes from re-inserting it.
+    """
+    with transaction.atomic():
+        bump_summary_version_on_commit(client_id)
+        queryset = ClientReviewStats.objects.select_for_update()
+
+        if create:
+            stats, _ = queryset.get_or_create(client_id=client_id)
+        else:
+            stats = queryset.filter(client_id=client_id).first()
+            if stats is None:
+                return None
+
+        for change in changes:
+            stats.apply(**change)
+
+        stats.save()
+        return stats
+
+
+def get_review_summary(client_id):
+    stats = ClientReviewStats.objects.filter(client_id=client_id).first()
+
+    if stats is None or not stats.total_reviews:
+        return {
+            "average_rating": 0,
+            "total_reviews": 0,
+            "rating_distribution": {5: 0, 4: 0, 3: 0, 2: 0, 1: 0},
+            "tags_summary": [],
+        }
+
+    tags = get_tags_by_id(int(tag_id) for tag_id in stats.tag_counts)
+    tags_summary = [
+        {
+            "id": tag.id,
+            "name": tag.name,
+            "category": tag.category,
+            "group": tag.group,
+            "count": stats.tag_counts[str(tag.id)],
+        }
+        for tag in tags.values()
+    ]
+    tags_summary.sort(key=lambda tag: (-tag["count"], tag["id"]))
+
+    return {
+        "avarage_rating": stats.average_rating,
+        "total_reviews": stats.total_reviews,
+        "rating_distribution": stats.rating_distribution,
+        "tags_summary": tags_summary,
+    }
+
+
+def compute_client_stats(client_ids):
+    """Build fresh, unsaved stats rows for the given clients from raw reviews."""
+    stats = {
+        client_id: ClientReviewStats(client_id=client_id) for client_id in client_ids
+    }
+
+    rating_rows = (
+        Review.objects.filter(client_id__in=client_ids)
+        .values("client_id", "ratings")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    for row in rating_rows:
+        client_stats = stats[row["client_id"]]
+        client_stats.total_reviews += row["count"]
+
+        if row["ratings"]:
+            client_stats.rating_count += row["count"]
+            client_stats.rating_sum += row["ratings"] * row["count"]
+            field = f"rating_{row['ratings']}"
+            setattr(client_stats, field, getattr(client_stats, field) + row["count"])
+
+    tag_counts = defaultdict(dict)
+    tag_rows = (
+        Review.tags.through.objects.filter(review__client_id__in=client_ids)
+        .values("review__client_id", "tag_id")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    for row in tag_rows:
+        tag_counts[row["review__client_id"]][str(row["tag_id"])] = row["count"]
+
+    for client_id, counts in tag_counts.items():
+        stats[client_id].tag_counts = counts
+
+    return stats
+
+
+def stats_snapshot(stats):
+    return tuple(getattr(stats, field) for field in STATS_FIELDS)
+
+
+def rebuild_client_stats(client_ids):
+    """
+    Recount the given clients' stats from their reviews. Their rows are
+    created if missing and locked first, in client order, so a review saved
+    or deleted meanwhile either lands before the recount or applies its
+    delta on top of it, never in between.
+    """
+    with transaction.atomic():
+        ClientReviewStats.objects.bulk_create(
+            [ClientReviewStats(client_id=client_id) for client_id in client_ids],
+            ignore_conflicts=True,
+        )
+        list(
+            ClientReviewStats.objects.select_for_update()
+            .filter(client_id__in=client_ids)
+            .order_by("client_id")
+            .values_list("client_id", flat=True)
+        )
+
+        stats = compute_client_stats(client_ids)
+
+        for client_id in client_ids:
+            bump_summary_version_on_commit(client_id)
+
+        ClientReviewStats.objects.bulk_create(
+            stats.values(),
+            update_conflicts=True,
+            unique_fields=["client"],
+            update_fields=[*STATS_FIELDS, "updated_at"],
+        )
+
+    return stats
+
+
+def find_stale_client_stats(client_ids):
+    """Return the ids of clients whose stored stats differ from a fresh rebuild."""
+    expected = compute_client_stats(client_ids)
+    stored = ClientReviewStats.objects.in_bulk(client_ids)
+
+    stale = []
+    for client_id, fresh in expected.items():
+        current = stored.get(client_id)
+
+        if current is None:
+            if fresh.total_reviews:
+                stale.append(client_id)
+        elif stats_snapshot(current) != stats_snapshot(fresh):
+            stale.append(client_id)
+
+    return stale
+
+
+def compute_reputation_score(stats):
+    """
+    Bayesian-weighted reputation between 0 (risky) and 1 (safe). Each rating
+    counts as one observation scaled from 1-5 onto 0-1, each POSITIVE tag as
+    a 1 and each NEGATIVE tag as a 0, all averaged together with the prior.
+    """
+    if not stats.total_reviews:
+        return None
+
+    total = (stats.rating_sum - stats.rating_count) / 4
+    observations = stats.rating_count
+
+    tags = get_tags_by_id(int(tag_id) for tag_id in stats.tag_counts)
+    for tag in tags.values():
+        count = stats.tag_counts[str(tag.id)]
+        observations += count
+        if tag.category == Tag.TagCategory.POSITIVE:
+            total += count
+
+    score = (REPUTATION_PRIOR_SCORE * REPUTATION_PRIOR_WEIGHT + total) / (
+        REPUTATION_PRIOR_WEIGHT + observations
+    )
+    return round(score, 4)
+
+
+def update_reputation_scores(full=False, batch_size=1000):
+    """
+    Score the clients whose stats changed since they were last scored (or
+    every client with full=True) and return how many were updated. Rows
+    touched while a batch is being scored keep an `updated_at` newer than
+    their `scored_at` and are picked up again on the next run.
+    """
+    started_at = timezone.now()
+    queryset = ClientReviewStats.objects.order_by("client_id")
+    if not full:
+        queryset = queryset.filter(
+            Q(scored_at__isnull=True) | Q(scored_at__lt=F("updated_at"))
+        )
+
+    updated = 0
+    last_id = None
+
+    while True:
+        batch = queryset
+        if last_id is not None:
+            batch = batch.filter(client_id__gt=last_id)
+
+        batch = list(batch[:batch_size])
+        if not batch:
+            break
+
+        for stats in batch:
+            stats.reputation_score = compute_reputation_score(stats)
+            stats.scored_at = started_at
+
+        ClientReviewStats.objects.bulk_update(batch, ["reputation_score", "scored_at"])
+
+        updated += len(batch)
+        last_id = batch[-1].client_id
+
+    return updated
+
+
+def lookup_clients(phone_numbers):
+    """
+    Resolve many raw phone numbers to client ids with a single query. Each
+    number maps to a found, not_found or invalid entry carrying the same
+    messages as the single client lookup.
+    """
+    hashed_numbers, errors = hash_phone_numbers(phone_numbers)
+
+    client_ids = dict(
+        ReviewedClient.objects.filter(
+            phone_number__in=set(hashed_numbers.values())
+        ).values_list("phone_number", "id")
+    )
+
+    results = {}
+    for phone_number in phone_numbers:
+        if phone_number in results:
+            continue
+
+        if phone_number in errors:
+            results[phone_number] = {"status": "invalid", "error": errors[phone_number]}
+            continue
+
+        client_id = client_ids.get(hashed_numbers[phone_number])
+
+        if client_id is None:
+            results[phone_number] = {"status": "not_found", "error": "client not found"}
+        else:
+            results[phone_number] = {"status": "found", "client_id": client_id}
+
+    return results
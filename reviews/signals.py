@@ -1,15 +1,171 @@
-from django.db.models import F
-from django.db.models.signals import post_save
+from collections import Counter, defaultdict
+
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
 from django.dispatch import receiver
 
-from .models import Review
+from users.credits import add_credits
+from users.models import CreditTransaction
+
+from .cache import bump_tag_catalog_version_on_commit
+from .models import Review, Tag
+from .services import REVIEW_CREDIT_POINTS, update_client_stats
 
 
 @receiver(post_save, sender=Review)
 def add_credit_on_review(sender, instance, created, **kwargs):
 
     if created:
-        if hasattr(instance.author, "profile"):
-            user_profile = instance.author.profile
-            user_profile.credit_points = F("credit_points") + 3
-            user_profile.save(update_fields=["credit_points"])
+        add_credits(
+            instance.author_id,
+            REVIEW_CREDIT_POINTS,
+            CreditTransaction.Reason.REVIEW_REWARD,
+        )
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_tag_catalog(sender, **kwargs):
+    bump_tag_catalog_version_on_commit()
+
+
+@receiver(pre_save, sender=Review)
+def remember_review_state(sender, instance, **kwargs):
+    # Loaded reviews already remember their state (see Review.from_db); only
+    # reviews built by hand need the stored values read back.
+    if instance._state.adding or "_stats_state" in instance.__dict__:
+        return
+
+    instance._stats_state = (
+        Review.objects.filter(pk=instance.pk).values("client_id", "ratings").first()
+    )
+
+
+def _saved_state(instance, previous, update_fields):
+    """The client and rating the row holds after a save with update_fields."""
+    state = {"client_id": instance.client_id, "ratings": instance.ratings}
+
+    if update_fields is not None and previous is not None:
+        if not {"client", "client_id"} & set(update_fields):
+            state["client_id"] = previous["client_id"]
+        if "ratings" not in update_fields:
+            state["ratings"] = previous["ratings"]
+
+    return state
+
+
+@receiver(post_save, sender=Review)
+def update_stats_on_review_save(sender, instance, created, update_fields, **kwargs):
+    previous = instance.__dict__.get("_stats_state")
+    current = _saved_state(instance, previous, update_fields)
+    instance._stats_state = current
+
+    if created:
+        tag_ids = instance.__dict__.pop("_initial_tag_ids", [])
+        update_client_stats(
+            current["client_id"],
+            [{"reviews": 1, "ratings": current["ratings"], "tag_ids": tag_ids}],
+        )
+        return
+
+    if previous is None:
+        return
+
+    if previous["client_id"] == current["client_id"]:
+        if previous["ratings"] != current["ratings"]:
+            update_client_stats(
+                current["client_id"],
+                [
+                    {"ratings": previous["ratings"], "sign": -1},
+                    {"ratings": current["ratings"]},
+                ],
+            )
+        return
+
+    tag_ids = list(instance.tags.values_list("id", flat=True))
+    update_client_stats(
+        previous["client_id"],
+        [
+            {
+                "reviews": 1,
+                "ratings": previous["ratings"],
+                "tag_ids": tag_ids,
+                "sign": -1,
+            }
+        ],
+        create=False,
+    )
+    update_client_stats(
+        current["client_id"],
+        [{"reviews": 1, "ratings": current["ratings"], "tag_ids": tag_ids}],
+    )
+
+
+@receiver(pre_delete, sender=Review)
+def remember_review_tags(sender, instance, **kwargs):
+    instance._stats_tag_ids = list(instance.tags.values_list("id", flat=True))
+
+
+@receiver(post_delete, sender=Review)
+def update_stats_on_review_delete(sender, instance, **kwargs):
+    update_client_stats(
+        instance.client_id,
+        [
+            {
+                "reviews": 1,
+                "ratings": instance.ratings,
+                "tag_ids": instance.__dict__.pop("_stats_tag_ids", []),
+                "sign": -1,
+            }
+        ],
+        create=False,
+    )
+
+
+def _tag_links(through, instance, reverse, pk_set=None):
+    """Count the (client_id, tag_id) pairs behind the m2m rows a change touches."""
+    links = through.objects.filter(**{"tag" if reverse else "review": instance})
+
+    if pk_set is not None:
+        lookup = "review_id__in" if reverse else "tag_id__in"
+        links = links.filter(**{lookup: pk_set})
+
+    return Counter(links.values_list("review__client_id", "tag_id"))
+
+
+def _apply_tag_links(links, sign):
+    by_client = defaultdict(list)
+    for (client_id, tag_id), count in links.items():
+        by_client[client_id].extend([tag_id] * count)
+
+    for client_id, tag_ids in by_client.items():
+        update_client_stats(
+            client_id, [{"tag_ids": tag_ids, "sign": sign}], create=sign > 0
+        )
+
+
+@receiver(m2m_changed, sender=Review.tags.through)
+def update_stats_on_tags_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "post_add":
+        if reverse:
+            links = _tag_links(sender, instance, reverse, pk_set)
+        else:
+            # pk_set only holds the newly linked tags here, so skip the query.
+            links = Counter((instance.client_id, tag_id) for tag_id in pk_set)
+        _apply_tag_links(links, 1)
+
+    elif action == "pre_remove":
+        instance._stats_removed_links = _tag_links(sender, instance, reverse, pk_set)
+
+    elif action == "pre_clear":
+        instance._stats_removed_links = _tag_links(sender, instance, reverse)
+
+    elif action in ("post_remove", "post_clear"):
+        links = instance.__dict__.pop("_stats_removed_links", None)
+        if links:
+            _apply_tag_links(links, -1)
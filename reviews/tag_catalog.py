@@ -0,0 +1,39 @@
+import threading
+
+from .cache import get_tag_catalog_version
+from .models import Tag
+
+_lock = threading.Lock()
+_catalog = {"version": None, "tags": {}}
+
+
+def _get_catalog():
+    """
+    Return this worker's copy of the tag table, reloading it only when the
+    shared version in Redis has moved (see reviews/signals.py).
+    """
+    global _catalog
+
+    version = get_tag_catalog_version()
+    if _catalog["version"] == version:
+        return _catalog
+
+    with _lock:
+        if _catalog["version"] != version:
+            tags = {tag.pk: tag for tag in Tag.objects.order_by("id")}
+            _catalog = {"version": version, "tags": tags}
+
+    return _catalog
+
+
+def get_tags():
+    return list(_get_catalog()["tags"].values())
+
+
+def get_tag(tag_id):
+    return _get_catalog()["tags"].get(tag_id)
+
+
+def get_tags_by_id(tag_ids):
+    tags = _get_catalog()["tags"]
+    return {tag_id: tags[tag_id] for tag_id in tag_ids if tag_id in tags}
@@ -1,3 +1,928 @@
-from django.test import TestCase
+import hashlib
+import json
+import tempfile
+import uuid
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+import phonenumbers
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from users.credits import compute_credit_balance
+from users.models import User, UserProfile
+
+from . import imports
+from .models import ClientReviewStats, Review, ReviewedClient, Tag
+from .services import find_stale_client_stats
+from .utils import hash_phone_number, hash_phone_numbers
+
+
+class QueryCountTestMixin:
+    """
+    Seed reviews at growing sizes and check that serving them costs the same
+    number of queries every time, so an N+1 cannot creep back in unnoticed.
+    """
+
+    query_count_sizes = (1, 5, 20)
+
+    def seed_reviews(self, count, client=None, author=None):
+        tags = list(Tag.objects.all()[:2]) or [
+            Tag.objects.create(name="On time", category="POSITIVE", group="payment"),
+            Tag.objects.create(name="Rude", category="NEGATIVE", group="behaviour"),
+        ]
+        start = Review.objects.count()
+
+        reviews = []
+        for index in range(start, start + count):
+            review_author = author or User.objects.create_user(
+                email=f"seed{index}@example.com", username=f"seed{index}"
+            )
+            review_client = client or ReviewedClient.objects.create(
+                phone_number=f"+9198{index:08d}"
+            )
+            review = Review.objects.create(
+                author=review_author, client=review_client, ratings=index % 5 + 1
+            )
+            review.tags.set(tags)
+            reviews.append(review)
+
+        return reviews
+
+    def count_queries(self, func):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            func()
+        return len(context.captured_queries)
+
+    def assertConstantQueries(self, seed, func, sizes=None):
+        counts = {}
+        seeded = 0
+
+        for size in sizes or self.query_count_sizes:
+            seed(size - seeded)
+            seeded = size
+            counts[size] = self.count_queries(func)
+
+        self.assertEqual(
+            len(set(counts.values())),
+            1,
+            f"Query count grows with the number of reviews: {counts}",
+        )
+        return next(iter(counts.values()))
+
+
+class CursorWalkMixin:
+    def walk(self, url, key="id"):
+        """
+        Follow `next` to the end, then `previous` back to the start, and
+        return the `key` of every item seen on the way out, as strings.
+        """
+        pages = []
+        while url:
+            response = self.api.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append([str(item[key]) for item in response.data["results"]])
+            url = response.data["next"]
+
+        url = response.data["previous"]
+        back = [pages[-1]]
+        while url:
+            response = self.api.get(url)
+            back.append([str(item[key]) for item in response.data["results"]])
+            url = response.data["previous"]
+
+        self.assertEqual(back, pages[::-1])
+        return [item for page in pages for item in page]
+
+
+class ReviewListQueryCountTests(QueryCountTestMixin, TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="owner@example.com", username="owner", password="password"
+        )
+        self.client_record = ReviewedClient.objects.create(phone_number="+919746469319")
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def test_client_review_list(self):
+        url = f"/api/client/{self.client_record.id}/reviews/"
+
+        self.assertConstantQueries(
+            lambda count: self.seed_reviews(count, client=self.client_record),
+            lambda: self.assertEqual(self.api.get(url).status_code, 200),
+        )
+
+    def test_my_review_list(self):
+        self.assertConstantQueries(
+            lambda count: self.seed_reviews(count, author=self.user),
+            lambda: self.assertEqual(self.api.get("/api/my-reviews/").status_code, 200),
+        )
+
+
+class ReviewPaginationTests(CursorWalkMixin, QueryCountTestMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="owner@example.com", username="owner", password="password"
+        )
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def test_cursor_walks_every_review_once(self):
+        reviews = self.seed_reviews(7, author=self.user)
+
+        seen = []
+        url = "/api/my-reviews/?page_size=3"
+        while url:
+            response = self.api.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data["results"]), 3)
+            seen.extend(review["id"] for review in response.data["results"])
+            url = response.data["next"]
+
+        self.assertEqual(seen, sorted((review.id for review in reviews), reverse=True))
+
+    def test_client_list_pages_through_tied_timestamps(self):
+        self.user.is_superuser = True
+        self.user.save()
+        clients = [
+            ReviewedClient.objects.create(phone_number=f"+9198{index:08d}")
+            for index in range(7)
+        ]
+        newest = clients.pop()
+        ReviewedClient.objects.exclude(pk=newest.pk).update(
+            created_at=clients[0].created_at
+        )
+
+        seen = self.walk("/api/clients/?page_size=3")
+
+        expected = [str(newest.id)] + sorted(str(client.id) for client in clients)
+        self.assertEqual(seen, expected)
+
+    def test_malformed_cursor_is_not_found(self):
+        for cursor in ["bogus", "cD0x", "cD1bIngiXQ=="]:
+            response = self.api.get(f"/api/my-reviews/?cursor={cursor}")
+            self.assertEqual(response.status_code, 404)
+
+    def test_client_review_list_reads_the_client_index_in_order(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("The plan check reads SQLite's EXPLAIN output.")
+
+        client = ReviewedClient.objects.create(phone_number="+919746469319")
+        plan = Review.objects.filter(client=client).order_by("-id")[:20].explain()
+
+        self.assertIn("review_client_id_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+
+class TagCatalogTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="owner@example.com", username="owner", password="password"
+        )
+        self.client_record = ReviewedClient.objects.create(phone_number="+919746469319")
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.on_time = Tag.objects.create(
+                name="On time", category="POSITIVE", group="payment"
+            )
+            self.late = Tag.objects.create(
+                name="Late", category="NEGATIVE", group="payment"
+            )
+
+    def test_tag_list_is_served_from_the_catalog(self):
+        self.api.get("/api/tags/")
+
+        with self.assertNumQueries(0):
+            response = self.api.get("/api/tags/")
+
+        self.assertEqual([tag["name"] for tag in response.data], ["On time", "Late"])
+
+    def test_tag_edit_invalidates_the_catalog(self):
+        self.api.get("/api/tags/")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.late.name = "Delayed"
+            self.late.save()
+
+        response = self.api.get("/api/tags/")
+        self.assertEqual([tag["name"] for tag in response.data], ["On time", "Delayed"])
+
+    def test_review_tags_are_validated_without_tag_queries(self):
+        url = f"/api/client/{self.client_record.id}/reviews/"
+        self.api.get("/api/tags/")
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.api.post(
+                url, {"ratings": 2, "tags": [self.on_time.id, self.late.id]}
+            )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("conflicting tags", str(response.data["tags"]))
+        self.assertEqual(context.captured_queries, [])
+
+        response = self.api.post(url, {"ratings": 2, "tags": [999]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["tags"][0].code, "does_not_exist")
+
+
+class ReviewCreateInTransactionTests(TestCase):
+    """Review creation inside a transaction the view does not own."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="owner@example.com", username="owner", password="password"
+        )
+        self.tag = Tag.objects.create(
+            name="On time", category="POSITIVE", group="payment"
+        )
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def test_unknown_client_is_not_found(self):
+        response = self.api.post(
+            f"/api/client/{uuid.uuid4()}/reviews/",
+            {"ratings": 4, "tags": [self.tag.id]},
+        )
+
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Review.objects.exists())
+
+    def test_created_review_lists_its_tags(self):
+        client = ReviewedClient.objects.create(phone_number="+919746469319")
+
+        response = self.api.post(
+            f"/api/client/{client.id}/reviews/", {"ratings": 4, "tags": [self.tag.id]}
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["tags"], [self.tag.id])
+
+
+class ReviewCreateTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="owner@example.com", username="owner", password="password"
+        )
+        UserProfile.objects.create(
+            user=self.user, full_name="Owner", referral_code="OWNER1"
+        )
+        self.client_record = ReviewedClient.objects.create(phone_number="+919746469319")
+        self.tag = Tag.objects.create(
+            name="On time", category="POSITIVE", group="payment"
+        )
+        self.url = f"/api/client/{self.client_record.id}/reviews/"
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def test_create_awards_credit_and_stats(self):
+        self.api.get("/api/tags/")
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.api.post(self.url, {"ratings": 4, "tags": [self.tag.id]})
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["tags"], [self.tag.id])
+        statements = [
+            query["sql"]
+            for query in context.captured_queries
+            if not query["sql"].startswith(("BEGIN", "COMMIT", "SAVEPOINT", "RELEASE"))
+        ]
+        # Client lock, review insert, credit entry, stats lock/insert/update,
+        # tag links and reading those links back for the response.
+        self.assertEqual(len(statements), 8)
+
+        self.assertEqual(compute_credit_balance(self.user.id), 3)
+
+        stats = ClientReviewStats.objects.get(client=self.client_record)
+        self.assertEqual(stats.total_reviews, 1)
+        self.assertEqual(stats.tag_counts, {str(self.tag.id): 1})
+
+    def test_duplicate_review_is_rejected_by_the_constraint(self):
+        self.api.post(self.url, {"ratings": 4, "tags": [self.tag.id]})
+        response = self.api.post(self.url, {"ratings": 2, "tags": [self.tag.id]})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data, {"detail": ["You have already reviewed this client!"]}
+        )
+        self.assertEqual(Review.objects.count(), 1)
+
+        self.assertEqual(compute_credit_balance(self.user.id), 3)
+
+    def test_unknown_client_is_not_found(self):
+        response = self.api.post(
+            f"/api/client/{uuid.uuid4()}/reviews/",
+            {"ratings": 4, "tags": [self.tag.id]},
+        )
+
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Review.objects.exists())
+
+
+class ClientReviewStatsTests(TestCase):
+    def setUp(self):
+        self.authors = [
+            User.objects.create_user(email=f"author{i}@example.com", username=f"a{i}")
+            for i in range(3)
+        ]
+        self.client_record = ReviewedClient.objects.create(phone_number="+919746469319")
+        self.other_client = ReviewedClient.objects.create(phone_number="+919746469318")
+        self.on_time = Tag.objects.create(
+            name="On time", category="POSITIVE", group="payment"
+        )
+        self.rude = Tag.objects.create(
+            name="Rude", category="NEGATIVE", group="behaviour"
+        )
+
+    def stats(self, client=None):
+        return ClientReviewStats.objects.get(client=client or self.client_record)
+
+    def assertNoStaleStats(self):
+        self.assertEqual(
+            find_stale_client_stats([self.client_record.id, self.other_client.id]), []
+        )
+
+    def test_create_and_delete_adjust_the_stats(self):
+        review = Review.objects.create(
+            author=self.authors[0], client=self.client_record, ratings=4
+        )
+        review.tags.add(self.on_time, self.rude)
+        Review.objects.create(
+            author=self.authors[1], client=self.client_record, ratings=None
+        )
+
+        stats = self.stats()
+        self.assertEqual((stats.total_reviews, stats.rating_count), (2, 1))
+        self.assertEqual(stats.rating_4, 1)
+        self.assertEqual(
+            stats.tag_counts, {str(self.on_time.id): 1, str(self.rude.id): 1}
+        )
+        self.assertNoStaleStats()
+
+        review.delete()
+
+        stats = self.stats()
+        self.assertEqual((stats.total_reviews, stats.rating_count), (1, 0))
+        self.assertEqual(stats.tag_counts, {})
+        self.assertNoStaleStats()
+
+    def test_rating_and_client_changes_move_the_stats(self):
+        review = Review.objects.create(
+            author=self.authors[0], client=self.client_record, ratings=2
+        )
+        review.tags.add(self.rude)
+
+        review.ratings = 5
+        review.save()
+        self.assertEqual((self.stats().rating_2, self.stats().rating_5), (0, 1))
+
+        review.client = self.other_client
+        review.save()
+        self.assertEqual(self.stats().total_reviews, 0)
+        self.assertEqual(
+            self.stats(self.other_client).tag_counts, {str(self.rude.id): 1}
+        )
+        self.assertNoStaleStats()
+
+    def test_loaded_review_is_updated_without_reading_it_back(self):
+        Review.objects.create(
+            author=self.authors[0], client=self.client_record, ratings=2
+        )
+        review = Review.objects.get(author=self.authors[0])
+        review.ratings = 3
+
+        with CaptureQueriesContext(connection) as context:
+            review.save()
+
+        reads = [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith("SELECT")
+            and 'FROM "reviews_review"' in query["sql"]
+        ]
+        self.assertEqual(reads, [])
+        self.assertEqual(self.stats().rating_3, 1)
+
+        # A save that leaves the rating out does not count the new value.
+        review.ratings = 1
+        review.save(update_fields=["client"])
+        self.assertEqual(self.stats().rating_1, 0)
+        self.assertNoStaleStats()
+
+    def test_tag_changes_from_either_side(self):
+        review = Review.objects.create(
+            author=self.authors[0], client=self.client_record, ratings=3
+        )
+        other = Review.objects.create(
+            author=self.authors[1], client=self.client_record, ratings=3
+        )
+
+        review.tags.set([self.on_time])
+        self.rude.reviews.add(review, other)
+        self.assertEqual(
+            self.stats().tag_counts, {str(self.on_time.id): 1, str(self.rude.id): 2}
+        )
+
+        self.rude.reviews.remove(other)
+        review.tags.clear()
+        self.assertEqual(self.stats().tag_counts, {})
+        self.assertNoStaleStats()
+
+    def test_rebuild_command_repairs_drifted_stats(self):
+        Review.objects.create(
+            author=self.authors[0], client=self.client_record, ratings=4
+        )
+        ClientReviewStats.objects.update(total_reviews=7)
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_review_stats", "--verify", stdout=StringIO())
+
+        call_command("rebuild_review_stats", "--batch-size", "1", stdout=StringIO())
+        call_command("rebuild_review_stats", "--verify", stdout=StringIO())
+
+        self.assertEqual(self.stats().total_reviews, 1)
+        self.assertEqual(self.stats(self.other_client).total_reviews, 0)
+
+
+class ReviewSummaryCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="owner@example.com", username="owner", is_superuser=True
+        )
+        self.client_record = ReviewedClient.objects.create(phone_number="+919746469319")
+        self.url = f"/api/client/{self.client_record.id}/reviews/summary/"
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def counters(self):
+        return self.api.get("/api/reviews/summary-cache-stats/").data
+
+    def test_summary_is_served_from_the_cache(self):
+        first = self.api.get(self.url)
+        self.assertEqual(first.data["total_reviews"], 0)
+
+        with CaptureQueriesContext(connection) as context:
+            second = self.api.get(self.url)
+
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second["ETag"], first["ETag"])
+        self.assertEqual(context.captured_queries, [])
+        self.assertEqual(self.counters(), {"hits": 1, "misses": 1, "not_modified": 0})
+
+    def test_matching_etag_is_not_modified(self):
+        etag = self.api.get(self.url)["ETag"]
+
+        with self.assertNumQueries(0):
+            response = self.api.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(self.counters()["not_modified"], 1)
+
+    def test_review_and_tag_changes_bump_the_version(self):
+        etag = self.api.get(self.url)["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Review.objects.create(
+                author=self.user, client=self.client_record, ratings=3
+            )
+
+        response = self.api.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["total_reviews"], 1)
+        self.assertNotEqual(response["ETag"], etag)
+
+        etag = response["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            Tag.objects.create(name="On time", category="POSITIVE", group="payment")
+
+        self.assertEqual(
+            self.api.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200
+        )
+        self.assertEqual(self.counters(), {"hits": 0, "misses": 3, "not_modified": 0})
+
+    def test_cache_stats_are_superuser_only(self):
+        self.user.is_superuser = False
+        self.user.save()
+
+        response = self.api.get("/api/reviews/summary-cache-stats/")
+        self.assertEqual(response.status_code, 403)
+
+
+class ClientBulkLookupTests(TestCase):
+    url = "/api/client-lookup/bulk/"
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="owner@example.com", username="owner", password="password"
+        )
+        self.client_record = ReviewedClient.objects.create(phone_number="+919746469319")
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def test_resolves_every_number_in_one_query(self):
+        numbers = ["+919746469319", "9746469319", "+919746469318", "abc", "123"]
+
+        with self.assertNumQueries(1):
+            response = self.api.post(
+                self.url, {"phone_numbers": numbers}, format="json"
+            )
+
+        self.assertEqual(response.status_code, 200)
+        found = {"status": "found", "client_id": self.client_record.id}
+        self.assertEqual(
+            response.data["results"],
+            {
+                "+919746469319": found,
+                "9746469319": found,
+                "+919746469318": {"status": "not_found", "error": "client not found"},
+                "abc": {"status": "invalid", "error": "Invalid phone number format"},
+                "123": {"status": "invalid", "error": "Phone number is not valid"},
+            },
+        )
+
+    def test_invalid_entries_match_the_single_lookup(self):
+        single = self.api.post("/api/client-lookup/", {"phone_number": "123"})
+        bulk = self.api.post(self.url, {"phone_numbers": ["123"]}, format="json")
+
+        self.assertEqual(single.status_code, 400)
+        self.assertEqual(bulk.data["results"]["123"]["error"], single.data["error"])
+
+    def test_rejects_empty_and_oversized_batches(self):
+        response = self.api.post(self.url, {"phone_numbers": []}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+        numbers = [f"+9198{index:08d}" for index in range(1001)]
+        response = self.api.post(self.url, {"phone_numbers": numbers}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+        response = self.api.post(
+            self.url, {"phone_numbers": numbers[:1000]}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 1000)
+
+
+def legacy_hash_phone_number(phone_number):
+    """The unmemoized hash_phone_number the memoized one must agree with."""
+    try:
+        parsed_number = phonenumbers.parse(phone_number, "IN")
+        if not phonenumbers.is_valid_number(parsed_number):
+            raise ValueError("Phone number is not valid")
+
+        clean_number = phonenumbers.format_number(
+            parsed_number, phonenumbers.PhoneNumberFormat.E164
+        )
+
+        if not hasattr(settings, "PHONE_HASH_SALT"):
+            raise ValueError("PHONE_HASH_SALT not found in settings!")
+
+        salted_number = clean_number + settings.PHONE_HASH_SALT
+
+        hashed_value = hashlib.sha256(salted_number.encode()).hexdigest()
+        return f"sha256${hashed_value}"
+
+    except phonenumbers.NumberParseException:
+        raise ValueError("Invalid phone number format")
+
+    except ValueError as ve:
+        raise ve
+
+    except Exception as e:
+        raise ValueError(f"Error processing number: {e}")
+
+
+class PhoneHashTests(SimpleTestCase):
+    inputs = [
+        "+919746469319",
+        "9746469319",
+        "0091 9746469319",
+        "+1 650 253 0000",
+        "abc",
+        "123",
+        "",
+        None,
+        12345,
+        ["9746469319"],
+    ]
+
+    def outcome(self, func, phone_number):
+        try:
+            return "ok", func(phone_number)
+        except Exception as e:
+            return type(e).__name__, str(e)
+
+    def test_memoized_hash_matches_the_legacy_hash(self):
+        # Twice over, so the second round is served from the memo.
+        for phone_number in self.inputs * 2:
+            with self.subTest(phone_number=phone_number):
+                self.assertEqual(
+                    self.outcome(hash_phone_number, phone_number),
+                    self.outcome(legacy_hash_phone_number, phone_number),
+                )
+
+    def test_salt_is_part_of_the_memo_key(self):
+        before = hash_phone_number("9746469319")
+
+        with override_settings(PHONE_HASH_SALT="rotated"):
+            rotated = hash_phone_number("9746469319")
+            self.assertEqual(rotated, legacy_hash_phone_number("9746469319"))
+
+        self.assertNotEqual(rotated, before)
+        self.assertEqual(hash_phone_number("9746469319"), before)
+
+    def test_batch_matches_single_calls(self):
+        numbers = ["+919746469319", "abc", "9746469319", "123", "+919746469319"]
+
+        hashed_numbers, errors = hash_phone_numbers(numbers)
+
+        for phone_number in numbers:
+            outcome = self.outcome(hash_phone_number, phone_number)
+            if outcome[0] == "ok":
+                self.assertEqual(hashed_numbers[phone_number], outcome[1])
+            else:
+                self.assertEqual(errors[phone_number], outcome[1])
+
+        self.assertEqual(len(hashed_numbers) + len(errors), 4)
+
+
+class ReviewImportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(
+            email="admin@example.com", username="admin", is_superuser=True
+        )
+        self.author = User.objects.create_user(
+            email="author@example.com", username="author"
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.on_time = Tag.objects.create(
+                name="On time", category="POSITIVE", group="payment"
+            )
+            self.late = Tag.objects.create(
+                name="Late", category="NEGATIVE", group="payment"
+            )
+            self.rude = Tag.objects.create(
+                name="Rude", category="NEGATIVE", group="behaviour"
+            )
+
+    def import_jsonl(self, rows, *args):
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl") as file:
+            file.write("\n".join(json.dumps(row) for row in rows) + "\nnot json\n")
+            file.flush()
+            call_command(
+                "import_reviews", file.name, *args, stdout=StringIO(), stderr=StringIO()
+            )
+
+    def upload(self, data, name="reviews.csv"):
+        file = BytesIO(data)
+        file.name = name
+        api = APIClient()
+        api.force_authenticate(self.admin)
+        return api.post("/api/reviews/import/", {"file": file}, format="multipart")
+
+    def test_imports_rows_and_rejects_bad_ones(self):
+        existing = ReviewedClient.objects.create(phone_number="+919746469317")
+        Review.objects.create(author=self.author, client=existing, ratings=2)
+        author = "author@example.com"
+
+        self.import_jsonl(
+            [
+                {
+                    "author": author,
+                    "phone": "+919746469319",
+                    "rating": 4,
+                    "tags": ["On time", "Rude"],
+                },
+                {"author": author, "phone": "9746469319", "rating": 3},
+                {"author": author, "phone": "+919746469318", "tags": "Late"},
+                {"author": author, "phone": "+919746469317", "rating": 5},
+                {"author": "admin@example.com", "phone": "+919746469319", "rating": 9},
+                {
+                    "author": "admin@example.com",
+                    "phone": "+919746469319",
+                    "tags": "On time|Late",
+                },
+                {
+                    "author": "admin@example.com",
+                    "phone": "+919746469319",
+                    "tags": "Polite",
+                },
+                {"author": "nobody@example.com", "phone": "+919746469319"},
+                {"author": "admin@example.com", "phone": "123"},
+            ],
+            "--batch-size",
+            "4",
+        )
+
+        self.assertEqual(Review.objects.filter(author=self.author).count(), 3)
+        self.assertFalse(Review.objects.filter(author=self.admin).exists())
+        review = Review.objects.get(
+            author=self.author, client__phone_number=hash_phone_number("9746469319")
+        )
+        self.assertEqual(review.ratings, 4)
+        self.assertEqual(
+            set(review.tags.values_list("name", flat=True)), {"On time", "Rude"}
+        )
+        # Only the two new reviews earn credits; the existing one was made
+        # directly, which awarded its own.
+        self.assertEqual(compute_credit_balance(self.author.id), 9)
+        self.assertEqual(
+            find_stale_client_stats(
+                ReviewedClient.objects.values_list("id", flat=True)
+            ),
+            [],
+        )
+
+    def test_report_counts_duplicates_and_errors_by_line(self):
+        response = self.upload(
+            b"author,phone,rating,tags\n"
+            b"author@example.com,+919746469319,5,On time\n"
+            b"author@example.com,9746469319,4,\n"
+            b"author@example.com,+919746469318,x,\n"
+            b"author@example.com,+919746469316,2,Ghost\n"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual(response.data["duplicates"], 1)
+        self.assertEqual([error["line"] for error in response.data["errors"]], [4, 5])
+        self.assertIn("Ghost", response.data["errors"][1]["error"])
+
+        response = self.upload(b"author,phone\nauthor@example.com,+919746469319\n")
+        self.assertEqual(
+            (response.data["created"], response.data["duplicates"]), (0, 1)
+        )
+
+    def test_malformed_jsonl_rows_are_reported_by_line(self):
+        rows = [
+            {"author": "author@example.com", "phone": "+919746469319", "rating": 5},
+            {"author": 5, "phone": "+919746469318"},
+            {"author": "author@example.com", "phone": "+919746469317", "tags": [1]},
+            {"author": "author@example.com", "phone": "+919746469316", "tags": 3},
+            {"author": "author@example.com", "phone": "+919746469315", "rating": 4.7},
+            {"author": "author@example.com", "phone": "+919746469314", "rating": "4.7"},
+            {"author": "author@example.com", "phone": "+919746469313", "rating": True},
+            {"author": "author@example.com", "phone": "+919746469312", "rating": " 4"},
+        ]
+        response = self.upload(
+            "\n".join(json.dumps(row) for row in rows).encode(), name="reviews.jsonl"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(
+            [error["line"] for error in response.data["errors"]], [2, 3, 4, 5, 6, 7]
+        )
+        self.assertIn("Author", response.data["errors"][0]["error"])
+        self.assertIn("Tags", response.data["errors"][1]["error"])
+        self.assertIn("whole number", response.data["errors"][3]["error"])
+        self.assertEqual(
+            Review.objects.get(
+                client__phone_number=hash_phone_number("9746469312")
+            ).ratings,
+            4,
+        )
+
+    def test_unreadable_file_is_reported_and_earlier_rows_kept(self):
+        huge = b"x" * 200_000
+        response = self.upload(
+            b"author,phone,rating\n"
+            b"author@example.com,+919746469319,5\n"
+            b"author@example.com,+919746469318," + huge + b"\n"
+            b"author@example.com,+919746469317,5\n"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual(response.data["errors"][0]["line"], 3)
+        self.assertIn("Malformed CSV", response.data["errors"][0]["error"])
+
+        response = self.upload(
+            b'{"author": "author@example.com", "phone": "+919746469316"}\n\xff\xfe\n',
+            name="reviews.jsonl",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("UTF-8", response.data["errors"][0]["error"])
+
+    def test_review_inserted_concurrently_is_not_credited_twice(self):
+        client = ReviewedClient.objects.create(phone_number="+919746469319")
+        real_existing_reviews = imports._existing_reviews
+        checks = []
+
+        def existing_reviews(pairs):
+            # The first check runs before another request saves its review.
+            checks.append(pairs)
+            if len(checks) == 1:
+                Review.objects.create(author=self.author, client=client, ratings=1)
+                return set()
+            return real_existing_reviews(pairs)
+
+        with mock.patch.object(imports, "_existing_reviews", existing_reviews):
+            report = imports.import_reviews(
+                [
+                    (1, {"author": "author@example.com", "phone": "+919746469319"}),
+                    (2, {"author": "admin@example.com", "phone": "+919746469319"}),
+                ]
+            )
+
+        self.assertEqual((report["created"], report["duplicates"]), (1, 1))
+        self.assertEqual(compute_credit_balance(self.author.id), 3)
+        self.assertEqual(compute_credit_balance(self.admin.id), 3)
+        self.assertEqual(find_stale_client_stats([client.id]), [])
+
+
+class ClientRankingTests(CursorWalkMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.on_time = Tag.objects.create(
+                name="On time", category="POSITIVE", group="payment"
+            )
+            self.late = Tag.objects.create(
+                name="Late", category="NEGATIVE", group="payment"
+            )
+        self.authors = [
+            User.objects.create_user(email=f"author{i}@example.com", username=f"a{i}")
+            for i in range(3)
+        ]
+        self.api = APIClient()
+        self.api.force_authenticate(self.authors[0])
+
+    def review(self, client, ratings=None, tag=None, author=0):
+        review = Review.objects.create(
+            author=self.authors[author], client=client, ratings=ratings
+        )
+        if tag:
+            review.tags.add(tag)
+        return review
+
+    def create_client(self, index):
+        return ReviewedClient.objects.create(phone_number=f"+9198{index:08d}")
+
+    def score(self, client):
+        return ClientReviewStats.objects.get(client=client).reputation_score
+
+    def test_command_scores_only_changed_clients(self):
+        safe, risky = self.create_client(1), self.create_client(2)
+        for author in range(3):
+            self.review(safe, 5, self.on_time, author)
+            self.review(risky, 1, self.late, author)
+        self.create_client(3)
+
+        out = StringIO()
+        call_command("update_reputation_scores", stdout=out)
+        self.assertIn("for 2 clients", out.getvalue())
+        self.assertEqual(self.score(safe), round((2.5 + 6) / 11, 4))
+        self.assertEqual(self.score(risky), round(2.5 / 11, 4))
+
+        out = StringIO()
+        call_command("update_reputation_scores", stdout=out)
+        self.assertIn("for 0 clients", out.getvalue())
+
+        Review.objects.filter(client=safe).first().delete()
+        out = StringIO()
+        call_command("update_reputation_scores", stdout=out)
+        self.assertIn("for 1 clients", out.getvalue())
+
+        out = StringIO()
+        call_command("update_reputation_scores", "--all", stdout=out)
+        self.assertIn("for 2 clients", out.getvalue())
+
+        with self.assertRaises(CommandError):
+            call_command("update_reputation_scores", "--batch-size", "0")
+
+    def test_ranked_feed_pages_through_tied_scores_in_both_orders(self):
+        safe, risky = self.create_client(1), self.create_client(2)
+        self.review(safe, 5, self.on_time)
+        self.review(risky, 1, self.late)
+
+        # An unrated, untagged review leaves every one of these at the prior.
+        tied = [self.create_client(index) for index in range(10, 17)]
+        for client in tied:
+            self.review(client)
+        self.create_client(3)
+
+        call_command("update_reputation_scores", "--batch-size", "2", stdout=StringIO())
+        tied_ids = sorted(str(client.id) for client in tied)
+
+        seen = self.walk("/api/clients/ranked/?page_size=3", key="client")
+        self.assertEqual(seen, [str(risky.id), *tied_ids, str(safe.id)])
+
+        seen = self.walk("/api/clients/ranked/?page_size=3&order=safe", key="client")
+        self.assertEqual(seen, [str(safe.id), *tied_ids[::-1], str(risky.id)])
@@ -2,8 +2,11 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
 from .views import (
+    ClientBulkLookupView,
     ClientLookupView,
     ClientViewSet,
+    ReviewImportView,
+    ReviewSummaryCacheStatsView,
     ReviewViewSet,
     TagViewSet,
     UserReviewViewSet,
@@ -17,6 +20,11 @@ router.register(r"my-reviews", UserReviewViewSet, basename="my-reviews")
 urlpatterns = [
     path("", include(router.urls)),
     path("client-lookup/", ClientLookupView.as_view(), name="client_lookup"),
+    path(
+        "client-lookup/bulk/",
+        ClientBulkLookupView.as_view(),
+        name="client_bulk_lookup",
+    ),
     path(
         "client/<uuid:client_id>/reviews/",
         ReviewViewSet.as_view({"get": "list", "post": "create"}, name="client_review"),
@@ -25,6 +33,12 @@ urlpatterns = [
         "client/<uuid:client_id>/reviews/summary/",
         ReviewViewSet.as_view({"get": "summary"}, name="client_review_summary"),
     ),
+    path("reviews/import/", ReviewImportView.as_view(), name="review_import"),
+    path(
+        "reviews/summary-cache-stats/",
+        ReviewSummaryCacheStatsView.as_view(),
+        name="review_summary_cache_stats",
+    ),
     path(
         "client/<uuid:client_id>/reviews/<int:pk>/",
         ReviewViewSet.as_view(
@@ -1,34 +1,95 @@
 import hashlib
+from functools import lru_cache
 
 import phonenumbers
 from django.conf import settings
 
+DEFAULT_REGION = "IN"
+PHONE_HASH_CACHE_SIZE = 65536
 
-def hash_phone_number(phone_number):
+_MISSING_SALT = object()
+
+
+def _compute_phone_hash(phone_number, salt):
+    """
+    Return ("ok", hash) or ("error", message) so that invalid input is memoized
+    just like valid input.
+    """
     try:
-        parsed_number = phonenumbers.parse(phone_number, "IN")
+        parsed_number = phonenumbers.parse(phone_number, DEFAULT_REGION)
         if not phonenumbers.is_valid_number(parsed_number):
-            raise ValueError("Phone number is not valid")
+            return "error", "Phone number is not valid"
 
         clean_number = phonenumbers.format_number(
             parsed_number, phonenumbers.PhoneNumberFormat.E164
         )
 
-        if not hasattr(settings, "PHONE_HASH_SALT"):
-            raise ValueError("PHONE_HASH_SALT not found in settings!")
+        if salt is _MISSING_SALT:
+            return "error", "PHONE_HASH_SALT not found in settings!"
 
-        salted_number = clean_number + settings.PHONE_HASH_SALT
+        salted_number = clean_number + salt
 
         hashed_value = hashlib.sha256(salted_number.encode()).hexdigest()
-        phone_number = f"sha256${hashed_value}"
-
-        return phone_number
+        return "ok", f"sha256${hashed_value}"
 
     except phonenumbers.NumberParseException:
-        raise ValueError("Invalid phone number format")
+        return "error", "Invalid phone number format"
 
-    except ValueError as ve:
-        raise ve
+    except ValueError as e:
+        return "error", str(e)
 
     except Exception as e:
-        raise ValueError(f"Error processing number: {e}")
+        return "error", f"Error processing number: {e}"
+
+
+# The salt is part of the key, which keeps override_settings and salt
+# rotation from serving stale hashes.
+_hash_phone_number = lru_cache(maxsize=PHONE_HASH_CACHE_SIZE)(_compute_phone_hash)
+
+
+def _get_salt():
+    return getattr(settings, "PHONE_HASH_SALT", _MISSING_SALT)
+
+
+def _hash_with_salt(phone_number, salt):
+    try:
+        outcome, value = _hash_phone_number(phone_number, salt)
+    except TypeError:
+        # Unhashable input cannot be memoized, so it takes the uncached path.
+        outcome, value = _compute_phone_hash(phone_number, salt)
+
+    if outcome == "error":
+        raise ValueError(value)
+
+    return value
+
+
+def hash_phone_number(phone_number):
+    return _hash_with_salt(phone_number, _get_salt())
+
+
+def hash_phone_numbers(phone_numbers):
+    """
+    Hash many raw numbers at once, returning ({number: hash}, {number: error}).
+    Duplicates are hashed once and the salt is read a single time.
+    """
+    salt = _get_salt()
+    hashed_numbers = {}
+    errors = {}
+
+    for phone_number in phone_numbers:
+        if phone_number in hashed_numbers or phone_number in errors:
+            continue
+
+        try:
+            hashed_numbers[phone_number] = _hash_with_salt(phone_number, salt)
+        except ValueError as e:
+            errors[phone_number] = str(e)
+
+    return hashed_numbers, errors
+
+
+def warm_phone_metadata(regions):
+    """Load phonenumbers region metadata up front instead of on first lookup."""
+    for region in regions:
+        phonenumbers.PhoneMetadata.metadata_for_region(region.strip().upper())
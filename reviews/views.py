@@ -1,29 +1,51 @@
-from django.db.models import Avg, Count
+import io
+
+from django.db import transaction
+from django.http import Http404
 from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
+from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from users.permissions import IsOwner, IsSuperUser
 
-from .models import Review, ReviewedClient, Tag
+from .cache import (
+    get_cached_summary,
+    get_summary_cache_counters,
+    get_summary_version,
+    record_not_modified,
+    summary_etag,
+)
+from .imports import detect_format, import_reviews, read_review_rows
+from .models import ClientReviewStats, Review, ReviewedClient, Tag
+from .pagination import ClientPagination, ClientRankingPagination, ReviewPagination
 from .schema import (
+    CLIENT_BULK_LOOKUP_SCHEMA,
     CLIENT_LOOKUP_SCHEMA,
     CLIENT_VIEWSET_SCHEMA,
+    REVIEW_IMPORT_SCHEMA,
+    REVIEW_SUMMARY_CACHE_STATS_SCHEMA,
     REVIEW_VIEWSET_SCHEMA,
     TAG_VIEWSET_SCHEMA,
     USER_REVIEW_VIEWSET_SCHEMA,
 )
 from .serializers import (
+    ClientBulkLookupSerializer,
     ClientLookupSerializer,
+    ClientReputationSerializer,
     ClientSerializer,
+    ReviewImportSerializer,
     ReviewListSerializer,
     ReviewSerializer,
     TagSerializer,
     UserReviewListSerializer,
 )
+from .services import get_review_summary, lookup_clients
+from .tag_catalog import get_tags
 from .utils import hash_phone_number
 
 
@@ -40,20 +62,35 @@ class TagViewSet(viewsets.ModelViewSet):
 
         return [permission() for permission in permission_classes]
 
+    def list(self, request, *args, **kwargs):
+        serializer = self.get_serializer(get_tags(), many=True)
+        return Response(serializer.data)
+
 
 @CLIENT_VIEWSET_SCHEMA
 class ClientViewSet(viewsets.ModelViewSet):
     queryset = ReviewedClient.objects.all()
     serializer_class = ClientSerializer
+    pagination_class = ClientPagination
 
     def get_permissions(self):
-        if self.action in ["create", "retrieve"]:
+        if self.action in ["create", "retrieve", "ranked"]:
             permission_classes = [IsAuthenticated]
         else:
             permission_classes = [IsSuperUser]
 
         return [permission() for permission in permission_classes]
 
+    @action(detail=False, methods=["get"])
+    def ranked(self, request):
+        queryset = ClientReviewStats.objects.filter(reputation_score__isnull=False)
+
+        paginator = ClientRankingPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = ClientReputationSerializer(page, many=True)
+
+        return paginator.get_paginated_response(serializer.data)
+
 
 @CLIENT_LOOKUP_SCHEMA
 class ClientLookupView(APIView):
@@ -85,11 +122,27 @@ class ClientLookupView(APIView):
             )
 
 
+@CLIENT_BULK_LOOKUP_SCHEMA
+class ClientBulkLookupView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = ClientBulkLookupSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        results = lookup_clients(serializer.validated_data["phone_numbers"])
+
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+
 @REVIEW_VIEWSET_SCHEMA
 class ReviewViewSet(viewsets.ModelViewSet):
     queryset = Review.objects.all()
     serializer_class = ReviewSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = ReviewPagination
 
     def get_permissions(self):
         if self.action in ["list", "create", "summary"]:
@@ -102,7 +155,11 @@ class ReviewViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         client_id = self.kwargs["client_id"]
-        return Review.objects.filter(client__id=client_id)
+        return (
+            Review.objects.filter(client__id=client_id)
+            .select_related("author")
+            .prefetch_related("tags")
+        )
 
     def get_serializer_class(self):
         if self.action in ["list", "retrieve"]:
@@ -111,65 +168,96 @@ class ReviewViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         client_id = self.kwargs["client_id"]
-        client = get_object_or_404(ReviewedClient, id=client_id)
 
-        return serializer.save(author=self.request.user, client=client)
+        with transaction.atomic():
+            # Locking the client keeps it from being deleted before the review
+            # commits, whatever transaction this request runs in.
+            client = ReviewedClient.objects.select_for_update().filter(pk=client_id)
+            if not client.exists():
+                raise Http404("No ReviewedClient matches the given query.")
+
+            return serializer.save(author_id=self.request.user.id, client_id=client_id)
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        return super().perform_update(serializer)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        return super().perform_destroy(instance)
 
     @action(detail=False, methods=["get"])
     def summary(self, request, client_id=None):
-        queryset = self.get_queryset()
+        version = get_summary_version(client_id)
+        etag = summary_etag(client_id, version)
 
-        if not queryset.exists():
-            return Response(
-                {
-                    "average_rating": 0,
-                    "total_reviews": 0,
-                    "rating_distribution": {5: 0, 4: 0, 3: 0, 2: 0, 1: 0},
-                    "tags_summary": [],
-                }
-            )
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            record_not_modified()
+            not_modified.headers["ETag"] = etag
+            return not_modified
+
+        data = get_cached_summary(client_id, version, get_review_summary)
+
+        return Response(data, headers={"ETag": etag})
+
+
+@REVIEW_SUMMARY_CACHE_STATS_SCHEMA
+class ReviewSummaryCacheStatsView(APIView):
+    permission_classes = [IsSuperUser]
 
-        stats = queryset.aggregate(avg_rating=Avg("ratings"), total=Count("id"))
+    def get(self, request):
+        return Response(get_summary_cache_counters())
 
-        rating_counts = queryset.values("ratings").annotate(count=Count("id"))
 
-        distribution = {5: 0, 4: 0, 3: 0, 2: 0, 1: 0}
-        for rc in rating_counts:
-            if rc["ratings"]:
-                distribution[rc["ratings"]] = rc["count"]
+@REVIEW_IMPORT_SCHEMA
+class ReviewImportView(APIView):
+    permission_classes = [IsSuperUser]
+    parser_classes = [MultiPartParser, FormParser]
 
-        tags = (
-            Tag.objects.filter(reviews__in=queryset)
-            .annotate(count=Count("reviews"))
-            .values("id", "name", "category", "group", "count")
-            .order_by("-count")
+    def post(self, request):
+        serializer = ReviewImportSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        upload = serializer.validated_data["file"]
+        file_format = serializer.validated_data.get("format") or detect_format(
+            upload.name
         )
+        stream = io.TextIOWrapper(upload.file, encoding="utf-8", newline="")
 
-        data = {
-            "avarage_rating": round(stats["avg_rating"], 1)
-            if stats["avg_rating"]
-            else 0,
-            "total_reviews": stats["total"],
-            "rating_distribution": distribution,
-            "tags_summary": list(tags),
-        }
+        report = import_reviews(read_review_rows(stream, file_format))
 
-        return Response(data)
+        return Response(report, status=status.HTTP_200_OK)
 
 
 @USER_REVIEW_VIEWSET_SCHEMA
 class UserReviewViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated, IsOwner]
     serializer_class = UserReviewListSerializer
+    pagination_class = ReviewPagination
 
     def get_queryset(self):
-        return Review.objects.filter(author=self.request.user)
+        return (
+            Review.objects.filter(author_id=self.request.user.id)
+            .select_related("author", "client")
+            .prefetch_related("tags")
+        )
 
     def get_serializer_class(self):
         if self.action in ["list", "retrieve"]:
             return UserReviewListSerializer
         return ReviewSerializer
 
+    @transaction.atomic
+    def perform_update(self, serializer):
+        return super().perform_update(serializer)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        return super().perform_destroy(instance)
+
     def create(self, request, *args, **kwargs):
         return Response(
             {"detail": "Use client endpoint to create reviews."},
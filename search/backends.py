@@ -0,0 +1,133 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import SearchDocument
+
+# Words beyond this are ignored, which bounds the cost of a single query.
+MAX_TERMS = 8
+
+# Prefix lengths the SQLite index keeps (prefix='2 3 4 5 6' in the
+# migration). A longer prefix would merge the doclists of every matching
+# word across all users, so it is cut down to the longest indexed length.
+MIN_PREFIX = 2
+MAX_PREFIX = 6
+
+# Matches the unicode61 tokenizer of the SQLite index: letters and digits.
+TERM = re.compile(r"[^\W_]+")
+
+RESULT_COLUMNS = ["kind", "object_id", "title", "body"]
+
+# Documents with every word in the title come first, then the rest, newest
+# first within each. Both halves walk the index in rowid order and stop at
+# the limit; bm25() would instead read every user's entries for each word.
+SQLITE_QUERY = """
+    SELECT d.kind, d.object_id, d.title, d.body
+    FROM (
+        SELECT * FROM (
+            SELECT rowid, 0 AS tier FROM search_searchdocument_fts
+            WHERE search_searchdocument_fts MATCH %s
+            ORDER BY rowid DESC LIMIT %s
+        )
+        UNION ALL
+        SELECT * FROM (
+            SELECT rowid, 1 AS tier FROM search_searchdocument_fts
+            WHERE search_searchdocument_fts MATCH %s
+            ORDER BY rowid DESC LIMIT %s
+        )
+    ) matches
+    JOIN search_searchdocument d ON d.id = matches.rowid
+    WHERE d.user_id = %s
+    ORDER BY matches.tier, matches.rowid DESC
+    LIMIT %s
+"""
+
+# Must match the expression of search_document_vector_idx for the index to
+# be used. Title words weigh more than body words.
+POSTGRES_VECTOR = (
+    "(setweight(to_tsvector('simple', title), 'A') || "
+    "setweight(to_tsvector('simple', body), 'B'))"
+)
+
+POSTGRES_QUERY = f"""
+    SELECT kind, object_id, title, body
+    FROM search_searchdocument, to_tsquery('simple', %s) query
+    WHERE user_id = %s AND ({POSTGRES_VECTOR} @@ query OR title %% %s)
+    ORDER BY ts_rank({POSTGRES_VECTOR}, query) + similarity(title, %s) DESC, id DESC
+    LIMIT %s
+"""
+
+
+def search_terms(query):
+    """
+    Split a query into (word, is_prefix) pairs. The last word is matched as
+    a prefix, since it is usually still being typed; the others must match
+    whole words.
+    """
+    words = TERM.findall(query.lower())[:MAX_TERMS]
+    terms = [(word, False) for word in words]
+
+    if words and len(words[-1]) >= MIN_PREFIX:
+        terms[-1] = (words[-1][:MAX_PREFIX], True)
+
+    return terms
+
+
+def _search_sqlite(user_id, query, terms, limit):
+    words = " AND ".join(
+        f'"{word}"*' if is_prefix else f'"{word}"' for word, is_prefix in terms
+    )
+    # The user_id column narrows the match inside the index, not after it.
+    in_title = f'user_id : "{user_id}" AND title : ({words})'
+    elsewhere = (
+        f'(user_id : "{user_id}" AND {{title body}} : ({words})) NOT title : ({words})'
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            SQLITE_QUERY, [in_title, limit, elsewhere, limit, user_id, limit]
+        )
+        return cursor.fetchall()
+
+
+def _search_postgres(user_id, query, terms, limit):
+    # Every word must match, or the title must be similar to the whole query
+    # so small typos still find something.
+    tsquery = " & ".join(
+        f"{word}:*" if is_prefix else word for word, is_prefix in terms
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute(POSTGRES_QUERY, [tsquery, user_id, query, query, limit])
+        return cursor.fetchall()
+
+
+def _search_other(user_id, query, terms, limit):
+    documents = SearchDocument.objects.filter(user_id=user_id)
+    for word, _ in terms:
+        documents = documents.filter(Q(title__icontains=word) | Q(body__icontains=word))
+
+    return list(documents.order_by("-id").values_list(*RESULT_COLUMNS)[:limit])
+
+
+BACKENDS = {
+    "sqlite": _search_sqlite,
+    "postgresql": _search_postgres,
+}
+
+
+def search(user_id, query, limit=20):
+    """
+    Return up to `limit` of the user's documents matching every word of the
+    query, best match first, as dicts of RESULT_COLUMNS. Other databases
+    fall back to unindexed substring matching.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return []
+
+    backend = BACKENDS.get(connection.vendor, _search_other)
+    rows = backend(user_id, query, terms, limit)
+
+    return [dict(zip(RESULT_COLUMNS, row)) for row in rows]
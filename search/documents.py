@@ -0,0 +1,81 @@
+from catalog.models import Product
+from clients.models import Client
+from invoices.models import Invoice
+
+from .models import SearchDocument
+
+
+def _join(*values):
+    return " ".join(value for value in values if value)
+
+
+def invoice_document(invoice):
+    return SearchDocument(
+        user_id=invoice.user_id,
+        kind=SearchDocument.Kind.INVOICE,
+        object_id=invoice.id,
+        title=invoice.invoice_number,
+        body=_join(invoice.name, invoice.email, invoice.phone),
+    )
+
+
+def client_document(client):
+    return SearchDocument(
+        user_id=client.user_id,
+        kind=SearchDocument.Kind.CLIENT,
+        object_id=client.id,
+        title=client.name,
+        body=_join(client.email, client.phone, client.address),
+    )
+
+
+def product_document(product):
+    return SearchDocument(
+        user_id=product.user_id,
+        kind=SearchDocument.Kind.PRODUCT,
+        object_id=product.id,
+        title=product.title,
+        body=product.description,
+    )
+
+
+# Per searchable model: its document kind, the fields the document is built
+# from, and the builder.
+SOURCES = {
+    Invoice: (
+        SearchDocument.Kind.INVOICE,
+        ["invoice_number", "name", "email", "phone"],
+        invoice_document,
+    ),
+    Client: (
+        SearchDocument.Kind.CLIENT,
+        ["name", "email", "phone", "address"],
+        client_document,
+    ),
+    Product: (
+        SearchDocument.Kind.PRODUCT,
+        ["title", "description"],
+        product_document,
+    ),
+}
+
+
+def index_objects(objects):
+    """Create or refresh the documents of saved invoices, clients or products."""
+    documents = []
+    for obj in objects:
+        _, _, build = SOURCES[type(obj)]
+        documents.append(build(obj))
+
+    if documents:
+        SearchDocument.objects.bulk_create(
+            documents,
+            update_conflicts=True,
+            unique_fields=["kind", "object_id"],
+            update_fields=["user", "title", "body", "updated_at"],
+        )
+
+
+def remove_objects(model, object_ids):
+    kind, _, _ = SOURCES[model]
+    SearchDocument.objects.filter(kind=kind, object_id__in=object_ids).delete()
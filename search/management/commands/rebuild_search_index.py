@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from search.documents import SOURCES, index_objects
+from search.models import SearchDocument
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the search documents of every invoice, client and product, "
+        "and drop documents whose record no longer exists."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        if batch_size < 1:
+            raise CommandError("--batch-size must be a positive number.")
+
+        for model, (kind, fields, _) in SOURCES.items():
+            indexed = 0
+            last_id = None
+
+            while True:
+                queryset = model.objects.only("user", *fields).order_by("id")
+                if last_id is not None:
+                    queryset = queryset.filter(id__gt=last_id)
+
+                objects = list(queryset[:batch_size])
+                if not objects:
+                    break
+
+                index_objects(objects)
+                indexed += len(objects)
+                last_id = objects[-1].id
+
+            removed, _ = (
+                SearchDocument.objects.filter(kind=kind)
+                .exclude(object_id__in=model.objects.values("id"))
+                .delete()
+            )
+
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Indexed {indexed} {model._meta.verbose_name_plural} "
+                    f"and removed {removed} stale documents."
+                )
+            )
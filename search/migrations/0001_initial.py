@@ -0,0 +1,150 @@
+# Generated by Django 6.0.1 on 2026-10-17 18:28
+
+from itertools import islice
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+SQLITE_INSTALL = [
+    """
+    CREATE VIRTUAL TABLE search_searchdocument_fts USING fts5(
+        user_id, title, body,
+        content='search_searchdocument', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3 4 5 6'
+    )
+    """,
+    """
+    CREATE TRIGGER search_searchdocument_fts_insert
+    AFTER INSERT ON search_searchdocument BEGIN
+        INSERT INTO search_searchdocument_fts (rowid, user_id, title, body)
+        VALUES (new.id, new.user_id, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER search_searchdocument_fts_delete
+    AFTER DELETE ON search_searchdocument BEGIN
+        INSERT INTO search_searchdocument_fts
+            (search_searchdocument_fts, rowid, user_id, title, body)
+        VALUES ('delete', old.id, old.user_id, old.title, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER search_searchdocument_fts_update
+    AFTER UPDATE ON search_searchdocument BEGIN
+        INSERT INTO search_searchdocument_fts
+            (search_searchdocument_fts, rowid, user_id, title, body)
+        VALUES ('delete', old.id, old.user_id, old.title, old.body);
+        INSERT INTO search_searchdocument_fts (rowid, user_id, title, body)
+        VALUES (new.id, new.user_id, new.title, new.body);
+    END
+    """,
+]
+
+SQLITE_REMOVE = [
+    "DROP TRIGGER search_searchdocument_fts_update",
+    "DROP TRIGGER search_searchdocument_fts_delete",
+    "DROP TRIGGER search_searchdocument_fts_insert",
+    "DROP TABLE search_searchdocument_fts",
+]
+
+# btree_gin lets user_id lead the GIN indexes, so a search only walks the
+# searching user's entries.
+POSTGRES_INSTALL = [
+    "CREATE EXTENSION IF NOT EXISTS btree_gin",
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    CREATE INDEX search_document_vector_idx ON search_searchdocument
+    USING gin (
+        user_id,
+        (setweight(to_tsvector('simple', title), 'A') ||
+         setweight(to_tsvector('simple', body), 'B'))
+    )
+    """,
+    """
+    CREATE INDEX search_document_title_trgm_idx ON search_searchdocument
+    USING gin (user_id, title gin_trgm_ops)
+    """,
+]
+
+POSTGRES_REMOVE = [
+    "DROP INDEX search_document_title_trgm_idx",
+    "DROP INDEX search_document_vector_idx",
+]
+
+
+def _run(schema_editor, statements):
+    for statement in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def install_search_index(apps, schema_editor):
+    _run(schema_editor, {"sqlite": SQLITE_INSTALL, "postgresql": POSTGRES_INSTALL})
+
+
+def remove_search_index(apps, schema_editor):
+    _run(schema_editor, {"sqlite": SQLITE_REMOVE, "postgresql": POSTGRES_REMOVE})
+
+
+def index_existing_records(apps, schema_editor):
+    """Build a document for every invoice, client and product."""
+    SearchDocument = apps.get_model("search", "SearchDocument")
+
+    sources = [
+        ("invoices", "Invoice", "invoice", "invoice_number", ["name", "email", "phone"]),
+        ("clients", "Client", "client", "name", ["email", "phone", "address"]),
+        ("catalog", "Product", "product", "title", ["description"]),
+    ]
+
+    for app_label, model_name, kind, title_field, body_fields in sources:
+        rows = (
+            apps.get_model(app_label, model_name)
+            .objects.order_by("id")
+            .values_list("id", "user_id", title_field, *body_fields)
+        )
+
+        documents = (
+            SearchDocument(
+                user_id=user_id,
+                kind=kind,
+                object_id=object_id,
+                title=title,
+                body=" ".join(value for value in body if value),
+            )
+            for object_id, user_id, title, *body in rows.iterator(chunk_size=1000)
+        )
+
+        while batch := list(islice(documents, 1000)):
+            SearchDocument.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('catalog', '0002_product_description'),
+        ('clients', '0001_initial'),
+        ('invoices', '0010_access_path_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('invoice', 'Invoice'), ('client', 'Client'), ('product', 'Product')], max_length=10)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('title', models.CharField(max_length=255)),
+                ('body', models.TextField(blank=True, default='')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_documents', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='search_document_object_uniq')],
+            },
+        ),
+        migrations.RunPython(install_search_index, remove_search_index),
+        migrations.RunPython(index_existing_records, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.db import models
+
+
+class SearchDocument(models.Model):
+    """
+    The searchable text of one invoice, client or product, kept in step with
+    its source row on save. The full-text index over these rows is specific
+    to the database and is created by the migrations: an FTS5 table synced
+    by triggers on SQLite, GIN indexes on PostgreSQL.
+    """
+
+    class Kind(models.TextChoices):
+        INVOICE = "invoice", "Invoice"
+        CLIENT = "client", "Client"
+        PRODUCT = "product", "Product"
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="search_documents",
+    )
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    object_id = models.PositiveBigIntegerField()
+
+    title = models.CharField(max_length=255)
+    body = models.TextField(blank=True, default="")
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["kind", "object_id"], name="search_document_object_uniq"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.object_id}: {self.title}"
@@ -0,0 +1,30 @@
+from drf_spectacular.utils import (
+    OpenApiParameter,
+    extend_schema,
+    extend_schema_view,
+    inline_serializer,
+)
+
+from .serializers import MAX_RESULTS, SearchResultSerializer
+
+SEARCH_SCHEMA = extend_schema_view(
+    get=extend_schema(
+        tags=["Search"],
+        summary="Search my invoices, clients and products",
+        description="Find your invoices (by number, client name, email or phone), clients (by name, email, phone or address) and products (by title or description). "
+        "Every word of the query must match a word in the record, except the last, which only has to start one so results follow as you type. "
+        "Records with every word in their title (an invoice's number, a client's name, a product's title) come first, newest first.",
+        parameters=[
+            OpenApiParameter("q", str, required=True, description="Search text."),
+            OpenApiParameter(
+                "limit", int, default=20, description=f"At most {MAX_RESULTS}."
+            ),
+        ],
+        responses={
+            200: inline_serializer(
+                name="SearchResponse",
+                fields={"results": SearchResultSerializer(many=True)},
+            ),
+        },
+    )
+)
@@ -0,0 +1,17 @@
+from rest_framework import serializers
+
+from .models import SearchDocument
+
+MAX_RESULTS = 50
+
+
+class SearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=200)
+    limit = serializers.IntegerField(min_value=1, max_value=MAX_RESULTS, default=20)
+
+
+class SearchResultSerializer(serializers.Serializer):
+    type = serializers.ChoiceField(choices=SearchDocument.Kind.choices, source="kind")
+    id = serializers.IntegerField(source="object_id")
+    title = serializers.CharField()
+    description = serializers.CharField(source="body")
@@ -0,0 +1,28 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from catalog.models import Product
+from clients.models import Client
+from invoices.models import Invoice
+
+from .documents import SOURCES, index_objects, remove_objects
+
+
+@receiver(post_save, sender=Invoice)
+@receiver(post_save, sender=Client)
+@receiver(post_save, sender=Product)
+def index_on_save(sender, instance, update_fields=None, **kwargs):
+    _, fields, _ = SOURCES[sender]
+
+    # Saves that only touch totals or status leave the document as it is.
+    if update_fields is not None and not set(update_fields) & set(fields):
+        return
+
+    index_objects([instance])
+
+
+@receiver(post_delete, sender=Invoice)
+@receiver(post_delete, sender=Client)
+@receiver(post_delete, sender=Product)
+def remove_on_delete(sender, instance, **kwargs):
+    remove_objects(sender, [instance.pk])
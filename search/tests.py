@@ -0,0 +1,138 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from catalog.models import Product
+from clients.models import Client
+from invoices.models import Invoice, RecurringInvoice, RecurringInvoiceItem
+from invoices.recurring import generate_recurring_invoices
+from users.models import User
+
+from .backends import search
+from .models import SearchDocument
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="owner@example.com", username="owner", password="password"
+        )
+        self.other = User.objects.create_user(
+            email="other@example.com", username="other", password="password"
+        )
+
+        self.client_record = Client.objects.create(
+            user=self.user,
+            name="Acme Traders",
+            phone="+919746469319",
+            address="12 Harbour Road, Kochi",
+        )
+        self.product = Product.objects.create(
+            user=self.user,
+            title="Logo design",
+            description="Brand identity for Acme",
+            unit_price=Decimal("5000.00"),
+        )
+        self.invoice = Invoice.objects.create(
+            user=self.user, client=self.client_record, issue_date=date(2026, 1, 1)
+        )
+
+    def found(self, query, user=None, limit=20):
+        return [
+            (result["kind"], result["object_id"])
+            for result in search((user or self.user).id, query, limit)
+        ]
+
+    def test_finds_each_kind_by_word_prefix(self):
+        self.assertEqual(self.found("harbour"), [("client", self.client_record.id)])
+        self.assertEqual(self.found("logo des"), [("product", self.product.id)])
+        self.assertEqual(self.found("identity bra"), [("product", self.product.id)])
+        # Only the last word may be unfinished.
+        self.assertEqual(self.found("ident brand"), [])
+        self.assertEqual(
+            self.found(self.invoice.invoice_number),
+            [("invoice", self.invoice.id)],
+        )
+
+    def test_title_matches_rank_first(self):
+        results = self.found("acme")
+
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0], ("client", self.client_record.id))
+        self.assertEqual(self.found("acme", limit=1), results[:1])
+
+    def test_results_are_limited_to_the_user(self):
+        other_client = Client.objects.create(
+            user=self.other, name="Acme Holdings", phone="+919746469320"
+        )
+
+        self.assertEqual(
+            self.found("acme", user=self.other), [("client", other_client.id)]
+        )
+        self.assertNotIn(("client", other_client.id), self.found("acme"))
+
+    def test_documents_follow_saves_and_deletes(self):
+        self.client_record.name = "Zenith Exports"
+        self.client_record.save()
+
+        self.assertEqual(self.found("zenith"), [("client", self.client_record.id)])
+        self.assertNotIn(("client", self.client_record.id), self.found("acme"))
+
+        self.product.delete()
+
+        self.assertEqual(self.found("logo"), [])
+        self.assertFalse(
+            SearchDocument.objects.filter(kind="product", object_id=self.product.id)
+        )
+
+    def test_generated_invoices_are_indexed(self):
+        template = RecurringInvoice.objects.create(
+            user=self.user,
+            name="Retainer Client",
+            cadence=RecurringInvoice.Cadence.MONTHLY,
+            start_date=date(2026, 1, 1),
+        )
+        RecurringInvoiceItem.objects.create(
+            recurring_invoice=template, title="Retainer", unit_price=100
+        )
+
+        generate_recurring_invoices(today=date(2026, 1, 1))
+
+        invoice = Invoice.objects.get(recurring_invoice=template)
+        self.assertEqual(self.found("retainer"), [("invoice", invoice.id)])
+
+    def test_rebuild_restores_missing_and_drops_stale_documents(self):
+        SearchDocument.objects.filter(kind="client").delete()
+        SearchDocument.objects.create(
+            user=self.user, kind="product", object_id=999, title="Ghost"
+        )
+
+        call_command("rebuild_search_index", stdout=StringIO())
+
+        self.assertEqual(self.found("harbour"), [("client", self.client_record.id)])
+        self.assertEqual(self.found("ghost"), [])
+
+    def test_api_searches_and_validates(self):
+        api = APIClient()
+        api.force_authenticate(self.user)
+
+        response = api.get("/api/search/", {"q": "acme", "limit": 2})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertEqual(
+            response.data["results"][0],
+            {
+                "type": "client",
+                "id": self.client_record.id,
+                "title": "Acme Traders",
+                "description": "+919746469319 12 Harbour Road, Kochi",
+            },
+        )
+
+        self.assertEqual(api.get("/api/search/").status_code, 400)
+        self.assertEqual(api.get("/api/search/", {"q": "--"}).data, {"results": []})
@@ -0,0 +1,30 @@
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .backends import search
+from .schema import SEARCH_SCHEMA
+from .serializers import SearchQuerySerializer, SearchResultSerializer
+
+
+@SEARCH_SCHEMA
+class SearchView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        serializer = SearchQuerySerializer(data=request.query_params)
+
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        results = search(
+            request.user.id,
+            serializer.validated_data["q"],
+            serializer.validated_data["limit"],
+        )
+
+        return Response(
+            {"results": SearchResultSerializer(results, many=True).data},
+            status=status.HTTP_200_OK,
+        )
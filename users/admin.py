@@ -1,8 +1,48 @@
 from django.contrib import admin
 
-from .models import User, UserBusinessProfile, UserProfile, UserSubscription
+from .models import (
+    CreditBalance,
+    CreditTransaction,
+    User,
+    UserBusinessProfile,
+    UserProfile,
+    UserSubscription,
+)
 
 admin.site.register(User)
 admin.site.register(UserProfile)
 admin.site.register(UserBusinessProfile)
 admin.site.register(UserSubscription)
+
+
+class ReadOnlyAdmin(admin.ModelAdmin):
+    """
+    The credit ledger is append-only and its snapshots are written only by
+    compaction, so the admin can browse them but not change them. Corrections
+    go in as ADJUSTMENT entries through users.credits.add_credits.
+    """
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(CreditTransaction)
+class CreditTransactionAdmin(ReadOnlyAdmin):
+    list_display = ("user", "amount", "reason", "compacted", "created_at")
+
+    list_filter = ("reason", "compacted")
+
+    search_fields = ("user__email",)
+
+
+@admin.register(CreditBalance)
+class CreditBalanceAdmin(ReadOnlyAdmin):
+    list_display = ("user", "balance", "updated_at")
+
+    search_fields = ("user__email",)
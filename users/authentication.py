@@ -1,5 +1,58 @@
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils.functional import SimpleLazyObject
+from django_redis.exceptions import ConnectionInterrupted
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+logger = logging.getLogger(__name__)
+
+# Left out of the cached row; the few views that need them load them on access.
+UNCACHED_USER_FIELDS = {"password"}
+
+
+def _user_cache_key(user_id):
+    return f"auth_user_fields_{user_id}"
+
+
+def _drop_cached_user(user_id):
+    try:
+        cache.delete(_user_cache_key(user_id))
+    except ConnectionInterrupted as e:
+        logger.warning(f"Could not drop cached user {user_id}: {e}")
+
+
+def invalidate_cached_user(user_id):
+    """Drop a user's cached row once the current transaction commits."""
+    transaction.on_commit(lambda: _drop_cached_user(user_id))
+
+
+class TokenClaimsUser(SimpleLazyObject):
+    """
+    The request user when JWT_STATELESS_USER is on. Its id and authentication
+    state come from the token; the user row is loaded, through the user
+    cache, only the first time anything else is used.
+    """
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, user_id, load):
+        super().__init__(load)
+        object.__setattr__(self, "_user_id", user_id)
+
+    @property
+    def id(self):
+        return self._user_id
+
+    pk = id
+
+    def __bool__(self):
+        return True
 
 
 class MultiPlatformJWTAuthentication(JWTAuthentication):
@@ -23,3 +76,53 @@ class MultiPlatformJWTAuthentication(JWTAuthentication):
             return user, validated_token
         except AuthenticationFailed as e:
             raise AuthenticationFailed(f"error retrieving user: {str(e)}")
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        if settings.JWT_STATELESS_USER:
+            return TokenClaimsUser(
+                self.user_model._meta.pk.to_python(user_id),
+                lambda: self.get_cached_user(validated_token),
+            )
+
+        return self.get_cached_user(validated_token)
+
+    def get_cached_user(self, validated_token):
+        """
+        The token's user, read from the cache when possible. Only users that
+        passed the active and revocation checks are cached, and saving or
+        deleting a user drops its entry, so a password change or a flip of
+        is_active takes effect on the next request. The cache holds the row's
+        field values without the password hash, and a cache outage falls
+        back to reading the row.
+        """
+        key = _user_cache_key(validated_token[api_settings.USER_ID_CLAIM])
+
+        try:
+            values = cache.get(key)
+        except ConnectionInterrupted as e:
+            logger.warning(f"User cache unavailable: {e}")
+            return super().get_user(validated_token)
+
+        if values is not None:
+            return self.user_model.from_db(
+                DEFAULT_DB_ALIAS, list(values), list(values.values())
+            )
+
+        user = super().get_user(validated_token)
+        values = {
+            field.attname: getattr(user, field.attname)
+            for field in user._meta.concrete_fields
+            if field.name not in UNCACHED_USER_FIELDS
+        }
+
+        try:
+            cache.set(key, values, timeout=settings.JWT_USER_CACHE_TIMEOUT)
+        except ConnectionInterrupted as e:
+            logger.warning(f"User cache unavailable: {e}")
+
+        return user
@@ -0,0 +1,141 @@
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from config.cache import bump_version, get_version
+
+from .models import CreditBalance, CreditTransaction, User
+
+CREDIT_BALANCE_CACHE_TIMEOUT = 60 * 60
+
+
+def _version_key(user_id):
+    return f"credit_balance_version_{user_id}"
+
+
+def record_credits(entries):
+    """
+    Append (user_id, amount, reason) entries to the ledger with one INSERT.
+    Cached balances of the users involved are dropped once the surrounding
+    transaction commits.
+    """
+    entries = [entry for entry in entries if entry[1]]
+    if not entries:
+        return
+
+    CreditTransaction.objects.bulk_create(
+        [
+            CreditTransaction(user_id=user_id, amount=amount, reason=reason)
+            for user_id, amount, reason in entries
+        ]
+    )
+
+    for user_id in {user_id for user_id, _, _ in entries}:
+        transaction.on_commit(
+            lambda user_id=user_id: bump_version(_version_key(user_id))
+        )
+
+
+def add_credits(user_id, amount, reason):
+    record_credits([(user_id, amount, reason)])
+
+
+def compute_credit_balance(user_id):
+    """
+    The snapshot balance plus every entry not compacted into it, read in one
+    statement so a compaction committing meanwhile is never seen halfway.
+    """
+    snapshot = CreditBalance.objects.filter(user_id=OuterRef("pk")).values("balance")
+    pending = (
+        CreditTransaction.objects.filter(user_id=OuterRef("pk"), compacted=False)
+        .values("user_id")
+        .annotate(total=Sum("amount"))
+        .values("total")
+    )
+
+    balance = (
+        User.objects.filter(pk=user_id)
+        .values_list(
+            Coalesce(Subquery(snapshot), Value(0))
+            + Coalesce(Subquery(pending), Value(0)),
+            flat=True,
+        )
+        .first()
+    )
+
+    return balance or 0
+
+
+def get_credit_balance(user_id):
+    key = f"credit_balance_{user_id}_{get_version(_version_key(user_id))}"
+    balance = cache.get(key)
+
+    if balance is None:
+        balance = compute_credit_balance(user_id)
+        cache.set(key, balance, timeout=CREDIT_BALANCE_CACHE_TIMEOUT)
+
+    return balance
+
+
+def compact_credit_balances(batch_size=1000):
+    """
+    Fold entries not compacted yet into each user's snapshot and return how
+    many snapshots moved. Each batch flags exactly the entries it summed in
+    the same transaction that writes the new snapshots, so an entry whose
+    transaction commits late is left for the next run rather than skipped.
+    Balances are unchanged by compaction, so cached values stay valid.
+    """
+    pending = CreditTransaction.objects.filter(compacted=False).order_by("user_id")
+
+    compacted = 0
+    last_user_id = None
+
+    while True:
+        batch = pending
+        if last_user_id is not None:
+            batch = batch.filter(user_id__gt=last_user_id)
+
+        user_ids = list(batch.values_list("user_id", flat=True).distinct()[:batch_size])
+        if not user_ids:
+            return compacted
+
+        with transaction.atomic():
+            snapshots = CreditBalance.objects.select_for_update().in_bulk(user_ids)
+
+            totals = defaultdict(int)
+            entry_ids = []
+            entries = pending.filter(user_id__in=user_ids).values_list(
+                "id", "user_id", "amount"
+            )
+            for entry_id, user_id, amount in entries:
+                totals[user_id] += amount
+                entry_ids.append(entry_id)
+
+            balances = []
+            for user_id, total in totals.items():
+                snapshot = snapshots.get(user_id)
+                balances.append(
+                    CreditBalance(
+                        user_id=user_id,
+                        balance=(snapshot.balance if snapshot else 0) + total,
+                        updated_at=timezone.now(),
+                    )
+                )
+
+            CreditBalance.objects.bulk_create(
+                balances,
+                update_conflicts=True,
+                unique_fields=["user"],
+                update_fields=["balance", "updated_at"],
+            )
+            for start in range(0, len(entry_ids), batch_size):
+                CreditTransaction.objects.filter(
+                    id__in=entry_ids[start : start + batch_size]
+                ).update(compacted=True)
+
+        compacted += len(balances)
+        last_user_id = user_ids[-1]
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from users.credits import compact_credit_balances
+
+
+class Command(BaseCommand):
+    help = (
+        "Fold new credit ledger entries into per-user balance snapshots. "
+        "Meant to be run periodically (e.g. from cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        if batch_size < 1:
+            raise CommandError("--batch-size must be a positive number.")
+
+        compacted = compact_credit_balances(batch_size=batch_size)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Compacted credit balances for {compacted} users.")
+        )
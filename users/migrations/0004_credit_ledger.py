@@ -0,0 +1,85 @@
+# Generated by Django 6.0.1 on 2026-10-17 18:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+
+
+def open_credit_ledgers(apps, schema_editor):
+    """Carry each profile's credit_points over as an opening ledger entry."""
+    UserProfile = apps.get_model("users", "UserProfile")
+    CreditTransaction = apps.get_model("users", "CreditTransaction")
+
+    balances = (
+        UserProfile.objects.exclude(credit_points=0)
+        .values_list("user_id", "credit_points")
+        .order_by("user_id")
+    )
+
+    CreditTransaction.objects.bulk_create(
+        (
+            CreditTransaction(
+                user_id=user_id, amount=credit_points, reason="OPENING_BALANCE"
+            )
+            for user_id, credit_points in balances.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+def restore_credit_points(apps, schema_editor):
+    """
+    Set each profile's credit_points back to its ledger balance. The column
+    cannot hold a negative balance, so those come back as 0.
+    """
+    UserProfile = apps.get_model("users", "UserProfile")
+    CreditTransaction = apps.get_model("users", "CreditTransaction")
+
+    balance = (
+        CreditTransaction.objects.filter(user_id=OuterRef("user_id"))
+        .values("user_id")
+        .annotate(total=Sum("amount"))
+        .values("total")
+    )
+    UserProfile.objects.update(
+        credit_points=Greatest(Coalesce(Subquery(balance), Value(0)), Value(0))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_usersubscription'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CreditBalance',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='credit_balance', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('balance', models.IntegerField(default=0)),
+                ('last_transaction_id', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CreditTransaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.IntegerField()),
+                ('reason', models.CharField(choices=[('OPENING_BALANCE', 'Opening balance'), ('SIGNUP_BONUS', 'Signup bonus'), ('REFEREE_BONUS', 'Referee bonus'), ('REFERRER_BONUS', 'Referrer bonus'), ('REVIEW_REWARD', 'Review reward'), ('INVOICE_CREATED', 'Invoice created'), ('ADJUSTMENT', 'Adjustment')], max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='credit_transactions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'id'], name='credit_txn_user_id_idx')],
+            },
+        ),
+        migrations.RunPython(open_credit_ledgers, restore_credit_points),
+        migrations.RemoveField(
+            model_name='userprofile',
+            name='credit_points',
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 6.0.1 on 2026-10-17 23:40
+
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def mark_compacted_entries(apps, schema_editor):
+    """Flag the entries each snapshot already folded in."""
+    CreditBalance = apps.get_model("users", "CreditBalance")
+    CreditTransaction = apps.get_model("users", "CreditTransaction")
+
+    CreditTransaction.objects.filter(
+        id__lte=Subquery(
+            CreditBalance.objects.filter(user_id=OuterRef("user_id")).values(
+                "last_transaction_id"
+            )
+        )
+    ).update(compacted=True)
+
+
+def restore_last_transaction_ids(apps, schema_editor):
+    CreditBalance = apps.get_model("users", "CreditBalance")
+    CreditTransaction = apps.get_model("users", "CreditTransaction")
+
+    CreditBalance.objects.update(
+        last_transaction_id=Coalesce(
+            Subquery(
+                CreditTransaction.objects.filter(
+                    user_id=OuterRef("user_id"), compacted=True
+                )
+                .values("user_id")
+                .annotate(last_id=Max("id"))
+                .values("last_id")
+            ),
+            Value(0),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_credit_ledger'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='credittransaction',
+            name='compacted',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(mark_compacted_entries, restore_last_transaction_ids),
+        migrations.RemoveField(
+            model_name='creditbalance',
+            name='last_transaction_id',
+        ),
+        migrations.AddIndex(
+            model_name='credittransaction',
+            index=models.Index(condition=models.Q(('compacted', False)), fields=['user'], name='credit_txn_pending_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='credittransaction',
+            name='credit_txn_user_id_idx',
+        ),
+    ]
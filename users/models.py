@@ -31,12 +31,72 @@ class UserProfile(models.Model):
         null=True,
         related_name="referrals",
     )
-    credit_points = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return self.user.email
 
 
+class CreditTransaction(models.Model):
+    """
+    One change to a user's credit balance. Rows are only ever inserted, and
+    later only marked once folded into the user's CreditBalance, so
+    concurrent grants and charges never wait on each other.
+    """
+
+    class Reason(models.TextChoices):
+        OPENING_BALANCE = "OPENING_BALANCE", "Opening balance"
+        SIGNUP_BONUS = "SIGNUP_BONUS", "Signup bonus"
+        REFEREE_BONUS = "REFEREE_BONUS", "Referee bonus"
+        REFERRER_BONUS = "REFERRER_BONUS", "Referrer bonus"
+        REVIEW_REWARD = "REVIEW_REWARD", "Review reward"
+        INVOICE_CREATED = "INVOICE_CREATED", "Invoice created"
+        ADJUSTMENT = "ADJUSTMENT", "Adjustment"
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="credit_transactions",
+    )
+    amount = models.IntegerField()
+    reason = models.CharField(max_length=20, choices=Reason.choices)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    compacted = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            # Balance reads and compaction: a user's entries not yet folded
+            # into their snapshot.
+            models.Index(
+                fields=["user"],
+                condition=models.Q(compacted=False),
+                name="credit_txn_pending_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.amount:+d} ({self.reason})"
+
+
+class CreditBalance(models.Model):
+    """
+    The sum of a user's compacted ledger entries, folded forward by the
+    compact_credit_balances command. The live balance adds the entries not
+    compacted yet.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="credit_balance",
+    )
+    balance = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user_id} - {self.balance}"
+
+
 class UserBusinessProfile(models.Model):
     user = models.OneToOneField(
         settings.AUTH_USER_MODEL,
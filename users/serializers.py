@@ -4,6 +4,7 @@ from django.core.cache import cache
 from django.shortcuts import get_object_or_404
 from rest_framework import serializers
 
+from .credits import get_credit_balance
 from .models import User, UserBusinessProfile, UserProfile
 from .services import create_user_account
 
@@ -113,6 +114,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
     email = serializers.EmailField(source="user.email", read_only=True)
     username = serializers.CharField(source="user.username", read_only=True)
     user_id = serializers.IntegerField(source="user.id", read_only=True)
+    credit_points = serializers.SerializerMethodField()
 
     class Meta:
         model = UserProfile
@@ -131,9 +133,11 @@ class UserProfileSerializer(serializers.ModelSerializer):
         read_only_fields = [
             "referral_code",
             "referred_by",
-            "credit_points",
         ]
 
+    def get_credit_points(self, obj) -> int:
+        return get_credit_balance(obj.user_id)
+
 
 class UserBusinessProfileSerializer(serializers.ModelSerializer):
     user_id = serializers.IntegerField(source="user.id", read_only=True)
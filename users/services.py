@@ -1,8 +1,14 @@
 from django.core.cache import cache
 from django.db import transaction
-from django.db.models import F
 
-from .models import User, UserBusinessProfile, UserProfile, UserSubscription
+from .credits import record_credits
+from .models import (
+    CreditTransaction,
+    User,
+    UserBusinessProfile,
+    UserProfile,
+    UserSubscription,
+)
 from .utils import generate_unique_referral_code
 
 SIGNUP_BONUS_CREDITS = 20
@@ -21,16 +27,24 @@ def create_user_account(validated_data, referrer_profile=None):
 
     user = User.objects.create_user(**validated_data)
 
-    initial_credits = SIGNUP_BONUS_CREDITS
+    credits = [
+        (user.id, SIGNUP_BONUS_CREDITS, CreditTransaction.Reason.SIGNUP_BONUS),
+        (user.id, REFEREE_BONUS_CREDITS, CreditTransaction.Reason.REFEREE_BONUS),
+    ]
     referred_by_user = None
 
-    initial_credits += REFEREE_BONUS_CREDITS
-
     if referrer_profile:
-        referrer_profile.credit_points = F("credit_points") + REFERRER_BONUS_CREDITS
-        referrer_profile.save(update_fields=["credit_points"])
+        credits.append(
+            (
+                referrer_profile.user_id,
+                REFERRER_BONUS_CREDITS,
+                CreditTransaction.Reason.REFERRER_BONUS,
+            )
+        )
         referred_by_user = referrer_profile.user
 
+    record_credits(credits)
+
     referral_code = generate_unique_referral_code()
 
     UserProfile.objects.create(
@@ -38,7 +52,6 @@ def create_user_account(validated_data, referrer_profile=None):
         full_name=full_name,
         referral_code=referral_code,
         referred_by=referred_by_user,
-        credit_points=initial_credits,
     )
 
     UserBusinessProfile.objects.create(user=user)
@@ -1,3 +1,225 @@
-from django.test import TestCase
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django_redis.exceptions import ConnectionInterrupted
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .credits import (
+    add_credits,
+    compact_credit_balances,
+    compute_credit_balance,
+    get_credit_balance,
+)
+from .models import CreditBalance, CreditTransaction, User, UserProfile
+from .serializers import UserProfileSerializer
+from .services import (
+    REFEREE_BONUS_CREDITS,
+    REFERRER_BONUS_CREDITS,
+    SIGNUP_BONUS_CREDITS,
+    create_user_account,
+)
+
+
+class CreditLedgerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="owner@example.com", username="owner", password="password"
+        )
+        self.profile = UserProfile.objects.create(
+            user=self.user, full_name="Owner", referral_code="OWNER1"
+        )
+
+    def test_signup_credits_both_sides_of_a_referral(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            referred = create_user_account(
+                {
+                    "email": "new@example.com",
+                    "username": "new",
+                    "password": "password",
+                    "full_name": "New",
+                },
+                referrer_profile=self.profile,
+            )
+
+        self.assertEqual(
+            get_credit_balance(referred.id),
+            SIGNUP_BONUS_CREDITS + REFEREE_BONUS_CREDITS,
+        )
+        self.assertEqual(get_credit_balance(self.user.id), REFERRER_BONUS_CREDITS)
+
+    def test_cached_balance_is_dropped_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            add_credits(self.user.id, 5, CreditTransaction.Reason.ADJUSTMENT)
+        self.assertEqual(get_credit_balance(self.user.id), 5)
+
+        with self.assertNumQueries(0):
+            get_credit_balance(self.user.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            add_credits(self.user.id, -7, CreditTransaction.Reason.INVOICE_CREATED)
+        self.assertEqual(get_credit_balance(self.user.id), -2)
+
+    def test_compaction_folds_entries_into_the_snapshot(self):
+        for amount in (10, -1, 4):
+            add_credits(self.user.id, amount, CreditTransaction.Reason.ADJUSTMENT)
+
+        self.assertEqual(compact_credit_balances(batch_size=1), 1)
+
+        snapshot = CreditBalance.objects.get(user=self.user)
+        self.assertEqual(snapshot.balance, 13)
+        self.assertEqual(compute_credit_balance(self.user.id), 13)
+
+        # Nothing recorded since, so a second run has nothing to fold.
+        self.assertEqual(compact_credit_balances(), 0)
+
+        add_credits(self.user.id, 2, CreditTransaction.Reason.REVIEW_REWARD)
+        self.assertEqual(compute_credit_balance(self.user.id), 15)
+        call_command("compact_credit_balances", "--batch-size", "1", stdout=StringIO())
+
+        snapshot.refresh_from_db()
+        self.assertEqual(snapshot.balance, 15)
+        self.assertEqual(compute_credit_balance(self.user.id), 15)
+
+    def test_entries_committed_after_a_later_one_are_still_folded(self):
+        add_credits(self.user.id, 10, CreditTransaction.Reason.ADJUSTMENT)
+        in_flight = CreditTransaction.objects.get()
+        in_flight.delete()
+        add_credits(self.user.id, 4, CreditTransaction.Reason.ADJUSTMENT)
+
+        # The first entry's transaction commits only after compaction ran.
+        compact_credit_balances()
+        CreditTransaction.objects.create(
+            id=in_flight.id, user=self.user, amount=10, reason=in_flight.reason
+        )
+
+        self.assertEqual(compute_credit_balance(self.user.id), 14)
+        self.assertEqual(compact_credit_balances(), 1)
+        self.assertEqual(CreditBalance.objects.get(user=self.user).balance, 14)
+        self.assertEqual(compute_credit_balance(self.user.id), 14)
+
+    def test_profile_serializer_reads_the_ledger(self):
+        add_credits(self.user.id, 9, CreditTransaction.Reason.ADJUSTMENT)
+
+        data = UserProfileSerializer(self.profile).data
+
+        self.assertEqual(data["credit_points"], 9)
+
+    def test_admin_cannot_edit_the_ledger(self):
+        add_credits(self.user.id, 9, CreditTransaction.Reason.ADJUSTMENT)
+        compact_credit_balances()
+        entry = CreditTransaction.objects.get()
+        admin_user = User.objects.create_superuser(
+            email="admin@example.com", username="admin", password="password"
+        )
+        self.client.force_login(admin_user)
+
+        for model, pk in (
+            ("credittransaction", entry.pk),
+            ("creditbalance", self.user.pk),
+        ):
+            with self.subTest(model):
+                url = reverse(f"admin:users_{model}_changelist")
+                self.assertEqual(self.client.get(url).status_code, 200)
+                for view, args in (("add", []), ("delete", [pk])):
+                    response = self.client.get(
+                        reverse(f"admin:users_{model}_{view}", args=args)
+                    )
+                    self.assertEqual(response.status_code, 403)
+
+                self.client.post(
+                    reverse(f"admin:users_{model}_change", args=[pk]),
+                    {"amount": 1000, "balance": 1000},
+                )
+
+        self.assertEqual(compute_credit_balance(self.user.id), 9)
+
+
+class JWTUserResolutionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="owner@example.com", username="owner", password="old-password"
+        )
+        UserProfile.objects.create(
+            user=self.user, full_name="Owner", referral_code="OWNER1"
+        )
+        self.api = APIClient()
+        self.api.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.user).access_token}"
+        )
+
+    def get(self, url="/api/invoices/"):
+        with CaptureQueriesContext(connection) as context:
+            response = self.api.get(url)
+
+        user_queries = [
+            query
+            for query in context.captured_queries
+            if '"users_user"' in query["sql"]
+        ]
+        return response, len(user_queries)
+
+    def test_user_row_is_cached_between_requests(self):
+        response, first = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(first, 1)
+
+        response, second = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(second, 0)
+
+    def test_deactivating_the_user_takes_effect_on_the_next_request(self):
+        self.get()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+
+        response, _ = self.get()
+        self.assertEqual(response.status_code, 401)
+
+    def test_password_change_drops_the_cached_user(self):
+        self.get()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.api.post(
+                "/api/users/change-password/",
+                {"current_password": "old-password", "new_password": "N3w-passw0rd!"},
+            )
+        self.assertEqual(response.status_code, 200)
+
+        _, user_queries = self.get()
+        self.assertEqual(user_queries, 1)
+
+    def test_cached_user_leaves_out_the_password_hash(self):
+        self.get()
+
+        values = cache.get(f"auth_user_fields_{self.user.id}")
+        self.assertEqual(values["email"], "owner@example.com")
+        self.assertNotIn("password", values)
+
+    def test_cache_outage_falls_back_to_the_database(self):
+        with mock.patch("users.authentication.cache") as user_cache:
+            user_cache.get.side_effect = ConnectionInterrupted(connection=None)
+            response, user_queries = self.get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(user_queries, 1)
+
+    @override_settings(JWT_STATELESS_USER=True)
+    def test_stateless_mode_only_loads_the_user_when_needed(self):
+        response, user_queries = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(user_queries, 0)
+
+        response, _ = self.get("/api/users/profile/me/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["email"], "owner@example.com")